@@ -0,0 +1,348 @@
+# api/benchmarking.py
+# 부하 테스트/마이크로 벤치마크 관리 명령이 함께 쓰는 도구 모음 (운영 코드에서는 사용하지 않음)
+
+import json
+import os
+import platform
+import statistics
+import subprocess
+import threading
+import time
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+from django.conf import settings
+from django.db import connection
+from django.test.utils import setup_test_environment, teardown_test_environment
+from django.utils import timezone
+
+
+# ----------------------------------------------------
+# 통계
+# ----------------------------------------------------
+
+def percentile(samples, pct):
+    """정렬된 표본에서 선형 보간으로 백분위수를 구합니다. (표본이 없으면 None)"""
+    if not samples:
+        return None
+    ordered = sorted(samples)
+    rank = (len(ordered) - 1) * pct / 100
+    lower = int(rank)
+    upper = min(lower + 1, len(ordered) - 1)
+    return ordered[lower] + (ordered[upper] - ordered[lower]) * (rank - lower)
+
+
+def summarize(samples_ms):
+    """밀리초 단위 표본의 요약 통계 (p50/p95/p99 포함)"""
+    if not samples_ms:
+        return {'count': 0}
+    return {
+        'count': len(samples_ms),
+        'mean_ms': round(statistics.fmean(samples_ms), 3),
+        'min_ms': round(min(samples_ms), 3),
+        'p50_ms': round(percentile(samples_ms, 50), 3),
+        'p95_ms': round(percentile(samples_ms, 95), 3),
+        'p99_ms': round(percentile(samples_ms, 99), 3),
+        'max_ms': round(max(samples_ms), 3),
+    }
+
+
+def time_call(func, *args, repeat=20, warmup=2, **kwargs):
+    """func를 반복 호출하여 1회당 소요 시간(ms) 표본을 반환합니다."""
+    for _ in range(warmup):
+        func(*args, **kwargs)
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func(*args, **kwargs)
+        samples.append((time.perf_counter() - started) * 1000)
+    return samples
+
+
+# ----------------------------------------------------
+# 결과 저장
+# ----------------------------------------------------
+
+def _git_commit():
+    try:
+        return subprocess.check_output(
+            ['git', 'rev-parse', '--short', 'HEAD'], cwd=settings.BASE_DIR, stderr=subprocess.DEVNULL
+        ).decode().strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def write_results(path, suite, parameters, results):
+    """커밋 간 비교할 수 있도록 실행 환경과 함께 결과를 JSON으로 저장합니다."""
+    document = {
+        'suite': suite,
+        'commit': _git_commit(),
+        'created_at': timezone.now().isoformat(),
+        'python': platform.python_version(),
+        'database': connection.vendor,
+        'parameters': parameters,
+        'results': results,
+    }
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(document, f, ensure_ascii=False, indent=2)
+    return document
+
+
+# ----------------------------------------------------
+# 격리된 테스트 DB
+# ----------------------------------------------------
+
+def _benchmark_redis_url():
+    """BENCHMARK_REDIS_URL이 없으면 REDIS_URL과 같은 서버의 다른 DB 번호(BENCHMARK_REDIS_DB)를 사용합니다."""
+    if settings.BENCHMARK_REDIS_URL:
+        return settings.BENCHMARK_REDIS_URL
+    parts = urlsplit(settings.REDIS_URL)
+    if parts.scheme == 'unix':
+        query = [(key, value) for key, value in parse_qsl(parts.query) if key != 'db']
+        query.append(('db', str(settings.BENCHMARK_REDIS_DB)))
+        return urlunsplit(parts._replace(query=urlencode(query)))
+    return urlunsplit(parts._replace(path=f"/{settings.BENCHMARK_REDIS_DB}"))
+
+
+@contextmanager
+def benchmark_redis():
+    """
+    벤치마크 동안 Redis 클라이언트를 별도 DB로 바꿉니다. 테스트 DB의 사용자/일정 id는 1부터 다시 시작하므로,
+    실제 Redis를 쓰면 실사용자의 대화 링 버퍼, 메모리 버전, 접속 상태, 일정 알림 키를 덮어쓰게 됩니다.
+    벤치마크용 DB는 시작과 끝에 비웁니다. REDIS_URL이 없으면(Redis 미사용) 아무 것도 하지 않습니다.
+    """
+    from services import redis_service
+
+    if not settings.REDIS_URL:
+        yield
+        return
+
+    benchmark_url = _benchmark_redis_url()
+    if benchmark_url == settings.REDIS_URL:
+        raise RuntimeError("벤치마크용 Redis가 운영 REDIS_URL과 같습니다. BENCHMARK_REDIS_URL 또는 BENCHMARK_REDIS_DB를 확인하세요.")
+
+    old_url = settings.REDIS_URL
+    settings.REDIS_URL = benchmark_url
+    redis_service._client = None
+    client = redis_service.get_redis_client()
+    client.flushdb()
+    try:
+        yield
+    finally:
+        client.flushdb()
+        settings.REDIS_URL = old_url
+        redis_service._client = None
+
+
+@contextmanager
+def benchmark_side_channels():
+    """
+    테스트 DB의 id로 실행된 작업이 운영 쪽으로 새지 않도록 막습니다.
+    - Celery 태스크(시그널이 요청하는 요약/알림/파생본 생성 등)는 브로커로 보내지 않고 즉시 실행
+    - 웹소켓 그룹 메시지(프로필 변경 알림 등)는 프로세스 안의 메모리 채널 레이어로 전달
+    """
+    from app_server.celery import app as celery_app
+    from channels.layers import channel_layers
+
+    old_eager = celery_app.conf.task_always_eager
+    old_channel_layers = settings.CHANNEL_LAYERS
+    celery_app.conf.task_always_eager = True
+    settings.CHANNEL_LAYERS = {"default": {"BACKEND": "channels.layers.InMemoryChannelLayer"}}
+    channel_layers.backends = {}
+    try:
+        yield
+    finally:
+        celery_app.conf.task_always_eager = old_eager
+        settings.CHANNEL_LAYERS = old_channel_layers
+        channel_layers.backends = {}
+
+
+@contextmanager
+def benchmark_database(keepdb=False):
+    """
+    실제 DB를 건드리지 않도록 Django 테스트 DB를 만들어 사용하고, 끝나면 삭제합니다.
+    Redis, Celery, 채널 레이어도 함께 격리합니다. (benchmark_redis, benchmark_side_channels 참고)
+    """
+    setup_test_environment()
+    old_name = connection.settings_dict['NAME']
+    connection.creation.create_test_db(verbosity=0, autoclobber=True, keepdb=keepdb)
+    try:
+        with benchmark_redis(), benchmark_side_channels():
+            yield
+    finally:
+        connection.creation.destroy_test_db(old_name, verbosity=0, keepdb=keepdb)
+        teardown_test_environment()
+
+
+# ----------------------------------------------------
+# 가짜 OpenAI / Kakao 서버
+# ----------------------------------------------------
+
+FAKE_ANSWER = "응, 오늘은 날씨가 좋아서 산책하기 딱 좋은 날이야! 너는 뭐 하고 있었어?"
+
+
+class FakeUpstreamServer:
+    """
+    OpenAI Chat Completions(스트리밍 SSE / JSON)와 Kakao 로컬 API를 흉내 내는 로컬 HTTP 서버.
+    first_token_ms 후 첫 토큰을, 이후 token_ms 간격으로 tokens개의 토큰을 보냅니다.
+    네트워크 없이 재현 가능한 지연 시간으로 채팅 경로 전체를 실행하기 위해 사용합니다.
+    """
+
+    def __init__(self, first_token_ms=300, token_ms=20, tokens=40, json_ms=50):
+        self.first_token_ms = first_token_ms
+        self.token_ms = token_ms
+        self.tokens = tokens
+        self.json_ms = json_ms
+        self.request_counts = {}
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer(('127.0.0.1', 0), self._build_handler())
+        self._server.daemon_threads = True
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+
+    @property
+    def base_url(self):
+        host, port = self._server.server_address
+        return f"http://{host}:{port}"
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def _count(self, key):
+        with self._lock:
+            self.request_counts[key] = self.request_counts.get(key, 0) + 1
+
+    def _build_handler(self):
+        fake = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+
+            def log_message(self, format, *args):
+                pass # 요청마다 stderr에 쓰지 않음
+
+            def _send_json(self, payload):
+                body = json.dumps(payload, ensure_ascii=False).encode('utf-8')
+                self.send_response(200)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def do_POST(self):
+                length = int(self.headers.get('Content-Length') or 0)
+                request = json.loads(self.rfile.read(length) or b'{}')
+                if not self.path.endswith('/chat/completions'):
+                    self.send_error(404)
+                    return
+                if request.get('stream'):
+                    fake._count('openai.stream')
+                    self._stream(request)
+                else:
+                    fake._count('openai.json')
+                    self._complete(request)
+
+            def _complete(self, request):
+                time.sleep(fake.json_ms / 1000)
+                # 채팅/능동 메시지(answer), 감정 분석(emotion_scores), 메모리 추출(빈 객체 취급)에 모두 맞는 응답
+                content = json.dumps({
+                    'answer': FAKE_ANSWER,
+                    'explanation': 'benchmark',
+                    'emotion_scores': [{'label': '5', 'score': 0.8}, {'label': '4', 'score': 0.2}],
+                    'summary': '벤치마크용 대화 요약',
+                }, ensure_ascii=False)
+                self._send_json({
+                    'id': 'chatcmpl-fake',
+                    'object': 'chat.completion',
+                    'created': int(time.time()),
+                    'model': request.get('model', 'fake'),
+                    'choices': [{'index': 0, 'finish_reason': 'stop', 'message': {'role': 'assistant', 'content': content}}],
+                    'usage': {'prompt_tokens': 0, 'completion_tokens': 0, 'total_tokens': 0},
+                })
+
+            def _stream(self, request):
+                self.send_response(200)
+                self.send_header('Content-Type', 'text/event-stream')
+                self.send_header('Cache-Control', 'no-cache')
+                self.send_header('Connection', 'close')
+                self.end_headers()
+                self.close_connection = True
+
+                words = (FAKE_ANSWER.split(' ') * fake.tokens)[:fake.tokens]
+                time.sleep(fake.first_token_ms / 1000)
+                for index, word in enumerate(words):
+                    if index:
+                        time.sleep(fake.token_ms / 1000)
+                    self._write_event({
+                        'id': 'chatcmpl-fake',
+                        'object': 'chat.completion.chunk',
+                        'created': int(time.time()),
+                        'model': request.get('model', 'fake'),
+                        'choices': [{'index': 0, 'delta': {'content': word + ' '}, 'finish_reason': None}],
+                    })
+                self._write_event({
+                    'id': 'chatcmpl-fake',
+                    'object': 'chat.completion.chunk',
+                    'created': int(time.time()),
+                    'model': request.get('model', 'fake'),
+                    'choices': [{'index': 0, 'delta': {}, 'finish_reason': 'stop'}],
+                })
+                self.wfile.write(b'data: [DONE]\n\n')
+                self.wfile.flush()
+
+            def _write_event(self, payload):
+                self.wfile.write(b'data: ' + json.dumps(payload, ensure_ascii=False).encode('utf-8') + b'\n\n')
+                self.wfile.flush()
+
+            def do_GET(self):
+                # Kakao 로컬 API: 좌표→주소, 키워드/카테고리 검색
+                fake._count('kakao')
+                time.sleep(fake.json_ms / 1000)
+                self._send_json({
+                    'meta': {'total_count': 1},
+                    'documents': [{
+                        'place_name': '벤치마크 카페',
+                        'address': {'address_name': '서울 강남구 역삼동 1'},
+                        'road_address': None,
+                    }],
+                })
+
+        return Handler
+
+
+@contextmanager
+def fake_upstream(**options):
+    """
+    가짜 서버를 띄우고 OpenAI/Kakao 호출이 그 서버로 향하도록 설정과 환경 변수를 바꿉니다.
+    OpenAI SDK 클라이언트는 생성 시점의 OPENAI_BASE_URL을 읽으므로, 서비스 모듈을 임포트하기 전에 진입해야 합니다.
+    """
+    setting_keys = ('OPENAI_API_BASE_URL', 'KAKAO_API_BASE_URL', 'OPENAI_API_KEY')
+    env_keys = ('OPENAI_BASE_URL', 'OPENAI_API_KEY', 'KAKAO_API_KEY')
+    old_settings = {key: getattr(settings, key) for key in setting_keys}
+    old_env = {key: os.environ.get(key) for key in env_keys}
+
+    with FakeUpstreamServer(**options) as server:
+        settings.OPENAI_API_BASE_URL = f"{server.base_url}/v1"
+        settings.KAKAO_API_BASE_URL = server.base_url
+        settings.OPENAI_API_KEY = settings.OPENAI_API_KEY or 'sk-benchmark'
+        os.environ['OPENAI_BASE_URL'] = settings.OPENAI_API_BASE_URL
+        os.environ['OPENAI_API_KEY'] = settings.OPENAI_API_KEY
+        os.environ['KAKAO_API_KEY'] = os.environ.get('KAKAO_API_KEY') or 'kakao-benchmark'
+        try:
+            yield server
+        finally:
+            for key, value in old_settings.items():
+                setattr(settings, key, value)
+            for key, value in old_env.items():
+                if value is None:
+                    os.environ.pop(key, None)
+                else:
+                    os.environ[key] = value
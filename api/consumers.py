@@ -1,8 +1,8 @@
 # app_server/api/consumers.py
 
-import json
 import asyncio
-import sys
+import logging
+import time
 from channels.generic.websocket import AsyncWebsocketConsumer
 from channels.db import database_sync_to_async
 from django.utils import timezone
@@ -29,8 +29,16 @@ from services import emoticon_service
 from services import proactive_service
 from services import location_service
 from services import vector_service
+from services import summary_service
+from services import history_service
+from services import presence_service
+from services import telemetry_service
+from services import profile_service
+from services import json_service
+from services.timer_wheel_service import get_timer_wheel
 
 User = get_user_model()
+logger = logging.getLogger(__name__)
 
 # ----------------------------------------------------
 # 헬퍼 함수: 동기 \ 비동기로 실행
@@ -43,9 +51,11 @@ def get_inactivity_message_sync(user):
 
 @database_sync_to_async
 def get_user_chat_history(user, limit=10):
-    """DB에서 동기적으로 채팅 기록을 가져옵니다."""
-    # return list(ChatMessage.objects.filter(user=user).order_by('-timestamp')[:limit])
-    return ChatMessage.objects.filter(user=user).order_by('-timestamp')[:limit]
+    """
+    최근 대화 링 버퍼(Redis)에서 이번 턴의 불변 히스토리 스냅샷을 만듭니다. 링 버퍼가 없으면 DB에서 읽어 재구성합니다.
+    반환된 스냅샷은 이미 평가된 값이므로 다른 스레드에서 반복/슬라이스해도 DB를 다시 조회하지 않습니다.
+    """
+    return history_service.get_history_snapshot(user.id, limit)
 
 @database_sync_to_async
 def assemble_context_data_sync(user, user_message_for_llm, latitude, longitude):
@@ -58,25 +68,37 @@ def assemble_context_data_sync(user, user_message_for_llm, latitude, longitude):
 def finalize_and_save_messages_sync(user, user_message_text, bot_message_text, history):
     """최종 메시지를 DB에 저장하고 메모리 추출 로직을 실행합니다."""
     
-    # 1. 사용자 메시지 저장
-    user_message_obj = ChatMessage.objects.create(
-        user=user, message=user_message_text, is_user=True
-    )
-    
-    # 2. 봇 메시지 저장
-    bot_message_obj = ChatMessage.objects.create(
-        user=user, message=bot_message_text, is_user=False
-    )
+    with telemetry_service.span("chat.persist", user):
+        # 1. 사용자 메시지 저장
+        user_message_obj = ChatMessage.objects.create(
+            user=user, message=user_message_text, is_user=True
+        )
+        
+        # 2. 봇 메시지 저장
+        bot_message_obj = ChatMessage.objects.create(
+            user=user, message=bot_message_text, is_user=False
+        )
     
     # 3. 메모리 추출 및 저장 (API 키 필요)
     api_key = settings.OPENAI_API_KEY # settings에서 직접 키를 사용합니다.
-    recent_history_for_extraction = history[:10]
-    extract_and_save_user_context_data(
-        user, user_message_text, bot_message_text, recent_history_for_extraction, api_key
-    )
+    recent_history_for_extraction = history[:summary_service.get_raw_tail_turns(user, history)]
+    with telemetry_service.span("chat.memory_extraction", user) as span:
+        telemetry_service.record_tokens(span, "llm.input_tokens", f"{user_message_text}\n{bot_message_text}")
+        extract_and_save_user_context_data(
+            user, user_message_text, bot_message_text, recent_history_for_extraction, api_key
+        )
+
+    # 4. N턴마다 롤링 대화 요약 갱신을 비동기로 요청
+    summary_service.schedule_summary_update_if_needed(user, history)
     
     return user_message_obj, bot_message_obj
 
+@database_sync_to_async
+def prepare_llm_messages_sync(user, final_system_prompt, history, user_message_for_llm):
+    """대화 요약 유무에 따라 원문 히스토리 길이를 정해 LLM 메시지 리스트를 준비합니다."""
+    max_turns = summary_service.get_raw_tail_turns(user, history)
+    return _prepare_llm_messages(final_system_prompt, history, user_message_for_llm, max_turns)
+
 @database_sync_to_async
 def get_location_recommendation_sync(user, message, latitude, longitude):
     """location_service의 동기 함수를 비동기로 호출합니다."""
@@ -91,44 +113,56 @@ def get_location_recommendation_sync(user, message, latitude, longitude):
 class ChatConsumer(AsyncWebsocketConsumer):
 
 
-    INACTIVITY_TIMEOUT = 30 
-    inactivity_task = None
+    INACTIVITY_TIMEOUT = 30 # 첫 능동 메시지까지의 대기 시간(초)
+    INACTIVITY_BACKOFF_FACTOR = 2 # 답이 없을 때마다 다음 대기 시간을 이 배수로 늘림
+    MAX_IDLE_NUDGES = 3 # 사용자가 답하지 않는 동안 보낼 수 있는 최대 능동 메시지 수
+    idle_nudges = 0
+    nudge_task = None
+    _closed = False # disconnect 이후 True
 
 
     async def start_inactivity_timer(self):
-        """지정된 시간 후 AI가 말을 걸도록 타이머를 시작합니다."""
-        # 기존 타이머가 있다면 확실히 취소
-        await self.cancel_inactivity_timer() 
-        print(f"--- [DEBUG] 비활성 타이머 시작 ({self.INACTIVITY_TIMEOUT}초 후 능동형 메시지) ---")
-        self.inactivity_task = asyncio.create_task(
-            self._inactivity_countdown()
-        )
+        """
+        지정된 시간 후 AI가 말을 걸도록 워커 공유 타이밍 휠에 마감 시각을 등록합니다.
+        소켓마다 태스크를 만들지 않으며, 연속 능동 메시지 횟수에 따라 대기 시간이 지수적으로 늘어나고
+        MAX_IDLE_NUDGES에 도달하면 사용자가 다시 말할 때까지 더 이상 등록하지 않습니다.
+        """
+        await self.cancel_inactivity_timer()
+        if self._closed:
+            return # 연결이 끊긴 뒤에는 재등록하지 않음 (소켓 누수 방지)
+        if self.idle_nudges >= self.MAX_IDLE_NUDGES:
+            logger.debug("연속 능동 메시지 %d회 도달, 비활성 타이머 중단", self.idle_nudges, extra={"user_id": self.user.id})
+            return
+
+        timeout = self.INACTIVITY_TIMEOUT * (self.INACTIVITY_BACKOFF_FACTOR ** self.idle_nudges)
+        logger.debug("비활성 타이머 시작 (%s초 후 능동형 메시지)", timeout, extra={"user_id": self.user.id})
+        get_timer_wheel().schedule(self.channel_name, timeout, self._on_inactivity_timeout)
 
     async def cancel_inactivity_timer(self):
-        """현재 실행 중인 타이머를 취소합니다."""
-        if self.inactivity_task:
-            self.inactivity_task.cancel()
+        """등록된 타이머와, 이미 만료되어 생성 중인 능동 메시지를 취소합니다."""
+        get_timer_wheel().cancel(self.channel_name)
+        if self.nudge_task and self.nudge_task is not asyncio.current_task():
+            self.nudge_task.cancel()
             try:
                 # 취소 작업 완료를 기다림
-                await self.inactivity_task
+                await self.nudge_task
             except asyncio.CancelledError:
                 pass
-            self.inactivity_task = None
-            print("--- [DEBUG] 비활성 타이머 취소됨 ---")
+            self.nudge_task = None
+            logger.debug("진행 중인 능동 메시지 생성 취소됨", extra={"user_id": self.user.id})
 
 # ----------------------------------------------------
-    async def _inactivity_countdown(self):
-        """타이머가 만료되면 동적인 능동형 메시지를 생성하고 보냅니다."""
+    async def _on_inactivity_timeout(self):
+        """타이머가 만료되면 동적인 능동형 메시지를 생성하고 보냅니다. (타이밍 휠이 호출)"""
+        self.nudge_task = asyncio.current_task()
         try:
-            await asyncio.sleep(self.INACTIVITY_TIMEOUT) 
-
-            print(f"--- [DEBUG] 타이머 만료, 동적 능동형 메시지 생성 요청 ---")
+            logger.info("타이머 만료, 동적 능동형 메시지 생성 요청 (%d/%d)", self.idle_nudges + 1, self.MAX_IDLE_NUDGES, extra={"user_id": self.user.id})
             
             COLLECTION_NAME = f"user_{self.user.id}_chat_history"
             try:
                 await database_sync_to_async(vector_service.get_or_create_collection)(COLLECTION_NAME)
             except Exception as e:
-                print(f"--- [오류] 벡터 컬렉션 준비 중 예외 발생: {e} ---") 
+                logger.warning("벡터 컬렉션 준비 중 예외 발생: %s", e, extra={"user_id": self.user.id})
             
             # 🚨 1. LLM을 호출하여 동적 메시지와 감정 획득 (get_inactivity_message_sync 사용)
             message_text, emotion_label = await get_inactivity_message_sync(self.user)
@@ -137,46 +171,44 @@ class ChatConsumer(AsyncWebsocketConsumer):
                 message_text = "혹시 무슨 생각 하고 있었어?"
                 emotion_label = "생각"
             
-            print(f"--- [DEBUG] 동적 메시지 생성 완료: {message_text[:10]}... ({emotion_label}) ---")
+            logger.debug("동적 메시지 생성 완료 (%s)", emotion_label, extra={"user_id": self.user.id})
 
             # 2. 감정 상태 전송 (동적 값 사용)
-            await self.send(text_data=json.dumps({
+            await self.send_json_frame({
                 'type': 'emotion_analysis_result',
                 'emotion': emotion_label, 
                 'status': 'emotion_ready_passive' 
-            }))
+            })
 
             # 3. 메시지 스트리밍 (동적 값 사용)
-            await self.send(text_data=json.dumps({
+            await self.send_json_frame({
                 'type': 'chat_stream',
                 'message_chunk': message_text, 
-            }))
+            })
             
             # 4. 완료 신호 전송
-            await self.send(text_data=json.dumps({
+            await self.send_json_frame({
                 'type': 'stream_end',
                 'status': 'success_passive',
-            }))
+            })
             
-            # 5. DB에 메시지 저장 (ChatMessage에 기록)
-            # 🚨 AI 메시지만 저장하는 별도의 헬퍼가 필요하지만, 
-            # 현재 구조에서 `finalize_and_save_messages_sync`를 재활용하여 AI 메시지만 저장하도록 수정합니다.
-            # user_message_text를 빈 문자열로 넘기면 (finalize... 내부에서 is_user=True로 저장되므로) 
-            # 대신 ChatMessage.objects.create를 직접 호출하여 AI 메시지만 저장하도록 변경하는 것이 가장 깔끔합니다.
+            # 5. DB에 메시지 저장 (AI 메시지만 저장)
             await self._save_proactive_message_to_db(self.user, message_text, emotion_label)
                        
-            print(f"--- [DEBUG] 능동형 메시지 전송 완료: {message_text[:10]}... ---")
-            
-            # 6. 타이머 재시작
-            await self.start_inactivity_timer()
+            logger.info("능동형 메시지 전송 완료", extra={"user_id": self.user.id})
                 
         except asyncio.CancelledError:
-            pass
+            # 사용자가 말을 걸거나 연결이 끊겨 취소됨. 재등록하지 않음
+            self.nudge_task = None
+            raise
         except Exception as e:
             # LLM 호출 실패 등의 오류 처리
-            print(f"--- [오류] _inactivity_countdown 중 예외 발생: {e} ---")
-            # 사용자에게 메시지는 보내지 못했지만, 타이머는 다시 시작
-            await self.start_inactivity_timer()
+            logger.exception("능동형 메시지 생성 중 예외 발생", extra={"user_id": self.user.id})
+
+        # 6. 답이 없으면 대기 시간을 늘려 재등록 (실패한 시도도 1회로 계산하여 무한 재시도를 막음)
+        self.nudge_task = None
+        self.idle_nudges += 1
+        await self.start_inactivity_timer()
 
     @database_sync_to_async
     def _save_proactive_message_to_db(self, user, message_text, emotion_label):
@@ -190,6 +222,24 @@ class ChatConsumer(AsyncWebsocketConsumer):
 
 
 
+    def _presence_timer_key(self):
+        return f"{self.channel_name}:presence"
+
+    async def _presence_heartbeat(self):
+        """
+        접속 상태를 갱신하고, 다음 하트비트를 공유 타이밍 휠에 등록합니다.
+        mark_online을 기다리는 동안 연결이 끊겼다면 재등록하지 않고, disconnect의 mark_offline보다 늦게 기록됐을 수 있으므로 다시 오프라인 처리합니다.
+        """
+        if self._closed:
+            return
+        await database_sync_to_async(presence_service.mark_online)(self.user.id, self.channel_name)
+        if self._closed:
+            await database_sync_to_async(presence_service.mark_offline)(self.user.id, self.channel_name)
+            return
+        get_timer_wheel().schedule(
+            self._presence_timer_key(), settings.PRESENCE_HEARTBEAT_INTERVAL, self._presence_heartbeat
+        )
+
 # ----------------------------------------------------
     async def connect(self):
         if "user" in self.scope:
@@ -210,14 +260,37 @@ class ChatConsumer(AsyncWebsocketConsumer):
                 self.channel_name
             )
             await self.accept()
+            if not User.profile.related.is_cached(self.user):
+                await self._refresh_profile() # 인증 단계에서 프로필을 함께 가져오지 못한 경우에만 1회 조회
+            await self._presence_heartbeat()
 
         else:
             await self.close(code=4003)
 
 
+    async def send_json_frame(self, payload):
+        """웹소켓 JSON 프레임 전송. orjson으로 직렬화하며 한국어를 이스케이프하지 않습니다."""
+        await self.send(text_data=json_service.dumps(payload))
+
+    async def _refresh_profile(self):
+        """
+        프로필 스냅샷을 DB에서 다시 읽어 self.user에 붙입니다.
+        매 턴의 프롬프트 생성(각기 다른 동기 스레드)은 이 스냅샷을 사용하므로 user.profile 지연 조회가 발생하지 않습니다.
+        """
+        profile = await database_sync_to_async(profile_service.load_profile)(self.user.id)
+        profile_service.attach_profile(self.user, profile)
+
+    async def profile_changed(self, event):
+        """프로필(호감도, 챗봇 이름, 대화 요약 등)이 저장되었다는 알림을 받으면 스냅샷을 갱신합니다."""
+        await self._refresh_profile()
+        logger.debug("프로필 스냅샷 갱신", extra={"user_id": self.user.id})
+
     async def disconnect(self, close_code):
+        self._closed = True # 실행 중인 타이머 콜백이 다시 등록하지 않도록 먼저 표시
         if self.user.is_authenticated:
+            get_timer_wheel().cancel(self._presence_timer_key())
             await self.cancel_inactivity_timer()
+            await database_sync_to_async(presence_service.mark_offline)(self.user.id, self.channel_name)
 
             await self.channel_layer.group_discard(
                 self.room_group_name,
@@ -226,18 +299,23 @@ class ChatConsumer(AsyncWebsocketConsumer):
 
     async def _run_stream_chat(self, user_message_text, latitude, longitude):
         """AI 컨텍스트 수집부터 GPT 스트리밍 및 응답 전송까지 처리합니다."""
-        
+        with telemetry_service.span("chat.turn", self.user, {"chat.transport": "websocket"}):
+            await self._run_stream_chat_stages(user_message_text, latitude, longitude)
+
+    async def _run_stream_chat_stages(self, user_message_text, latitude, longitude):
         # 0. 이모티콘 파싱 및 컨텍스트/히스토리 수집
-        history = await get_user_chat_history(self.user)
+        with telemetry_service.span("chat.history", self.user) as span:
+            history = await get_user_chat_history(self.user, summary_service.get_history_window())
+            span.set_attribute("chat.history_messages", len(history))
 
         COLLECTION_NAME = f"user_{self.user.id}_chat_history"
 
         try:
             await database_sync_to_async(vector_service.get_or_create_collection)(COLLECTION_NAME)
-            print(f"--- [DEBUG] 벡터 컬렉션 이름 확보: {COLLECTION_NAME} ---")
+            logger.debug("벡터 컬렉션 이름 확보: %s", COLLECTION_NAME)
             
         except Exception as e:
-            print(f"--- [오류] 벡터 컬렉션 준비 중 예외 발생: {e} ---")
+            logger.warning("벡터 컬렉션 준비 중 예외 발생: %s", e, extra={"user_id": self.user.id})
         
         # ✅ 0-1. 이모티콘 파싱을 동기적으로 처리
         user_message_for_llm = await database_sync_to_async(
@@ -245,79 +323,98 @@ class ChatConsumer(AsyncWebsocketConsumer):
             )(user_message_text)
         
         # 0-2. 컨텍스트 수집
-        time_contexts = await database_sync_to_async(_get_time_contexts)(history)
+        # 히스토리는 이미 평가된 스냅샷이므로 DB 접근 없이 바로 계산
+        time_contexts = _get_time_contexts(history)
 
-        assembled_contexts = await assemble_context_data_sync(
-          self.user, user_message_for_llm, latitude, longitude
-        )
+        with telemetry_service.span("chat.context", self.user) as span:
+            assembled_contexts = await assemble_context_data_sync(
+              self.user, user_message_for_llm, latitude, longitude
+            )
+            span.set_attribute("chat.context_sections", len(assembled_contexts))
 
         # 🎯 1. 위치 기반 추천 정보 검색 및 클라이언트 전송
         # LLM 호출 전에 선호 장소 추천 또는 주변 장소 정보를 검색합니다.
         if latitude is not None and longitude is not None:
 
             # LLM에게 컨텍스트가 주어졌는지와 별개로, 클라이언트에 추천 UI를 띄워야 하므로 여기서 전송
-            recommendation_message = await get_location_recommendation_sync(
-                self.user, user_message_text, latitude, longitude
-            )
+            with telemetry_service.span("chat.location_recommendation", self.user):
+                recommendation_message = await get_location_recommendation_sync(
+                    self.user, user_message_text, latitude, longitude
+                )
             if recommendation_message:
                 assembled_contexts['location_recommendation'] = recommendation_message
-                print(f"✅ 위치 기반 추천 텍스트를 컨텍스트에 추가: {recommendation_message}")
+                logger.debug("위치 기반 추천 텍스트를 컨텍스트에 추가", extra={"user_id": self.user.id})
             else:
-                print(f"❌ 위치 기반 추천 검색 실패: 관련 키워드 없음 또는 검색 결과 없음")
+                logger.debug("위치 기반 추천 검색 실패: 관련 키워드 없음 또는 검색 결과 없음", extra={"user_id": self.user.id})
         # ---------------------------------------------------------
         
         # 2. LLM 호출 준비 및 스트리밍
-        final_system_prompt = await database_sync_to_async(
-            prompt_service.build_final_system_prompt)(
-            self.user, time_contexts, assembled_contexts, image_analysis_context=None
-        )
-        messages = await database_sync_to_async(
-            _prepare_llm_messages)(final_system_prompt, history, user_message_for_llm
-        )
+        with telemetry_service.span("chat.prompt_build", self.user) as span:
+            final_system_prompt = await database_sync_to_async(
+                prompt_service.build_final_system_prompt)(
+                self.user, time_contexts, assembled_contexts, image_analysis_context=None
+            )
+            messages = await prepare_llm_messages_sync(
+                self.user, final_system_prompt, history, user_message_for_llm
+            )
+            telemetry_service.record_tokens(span, "llm.system_prompt_tokens", final_system_prompt)
+            telemetry_service.record_message_tokens(span, messages)
 
         model_to_use = settings.FINETUNED_MODEL_ID or "gpt-4o-mini"
-        print(f"--- [디버그 4.5] GPT API 호출 시작 (모델: {model_to_use}) ---")
+        logger.debug("GPT API 호출 시작 (모델: %s)", model_to_use, extra={"user_id": self.user.id})
         
         full_ai_response = ""
         
         try:
             # GPT 스트리밍 호출 (Async)
-            response_stream = await async_stream_openai_api(model_to_use, messages)
-            print(f"--- [디버그 5] 응답 스트림 객체 타입: {type(response_stream)} ---")
-
-            # 비동기 Generator를 순회하며 실시간 전송
-            async for chunk in response_stream:
-                content = chunk.choices[0].delta.content
-                if content:
-                    full_ai_response += content
-                    
-                    # 개행 없이 한 줄에 이어서 디버그 출력
-                    sys.stdout.write(content.strip())
-                    sys.stdout.flush()
-
-                    await self.send(text_data=json.dumps({
-                        'type': 'chat_stream',
-                        'message_chunk': content,
-                    }))
+            with telemetry_service.span("chat.llm_stream", self.user, {"llm.model": model_to_use}) as stream_span:
+                telemetry_service.record_message_tokens(stream_span, messages)
+                stream_started = time.perf_counter()
+                first_token_at = None
+
+                response_stream = await async_stream_openai_api(model_to_use, messages)
+
+                # 비동기 Generator를 순회하며 실시간 전송
+                async for chunk in response_stream:
+                    content = chunk.choices[0].delta.content
+                    if content:
+                        if first_token_at is None:
+                            first_token_at = time.perf_counter()
+                            stream_span.set_attribute("llm.time_to_first_token_ms", round((first_token_at - stream_started) * 1000, 1))
+                            stream_span.add_event("first_token")
+                        full_ai_response += content
+                        
+                        # 토큰 단위 로그는 샘플링되어 일부만 기록됨
+                        logger.debug("stream chunk: %r", content, extra={"sampled": True, "user_id": self.user.id})
+
+                        await self.send_json_frame({
+                            'type': 'chat_stream',
+                            'message_chunk': content,
+                        })
+
+                if first_token_at is not None:
+                    stream_span.set_attribute("llm.stream_duration_ms", round((time.perf_counter() - first_token_at) * 1000, 1))
+                telemetry_service.record_tokens(stream_span, "llm.completion_tokens", full_ai_response)
             
             # 3. 감정 분석 및 완료 신호 전송
-            emotion_label = await database_sync_to_async(emotion_service.analyze_emotion)(full_ai_response)
-            print(f"--- 감정 분석 결과: {emotion_label} ---")
+            with telemetry_service.span("chat.emotion", self.user):
+                emotion_label = await database_sync_to_async(emotion_service.analyze_emotion)(full_ai_response)
+            logger.debug("감정 분석 결과: %s", emotion_label, extra={"user_id": self.user.id})
             
-            await self.send(text_data=json.dumps({
+            await self.send_json_frame({
                 'type': 'stream_end',
                 'status': 'success',
                 'emotion': emotion_label,
-            }))
+            })
 
         except APIError as e:
             full_ai_response = f"AI 연결 오류가 발생했습니다. 잠시 후 다시 시도해 주세요."
-            print(f"--- [오류] GPT API 오류: {e} ---")
-            await self.send(text_data=json.dumps({"type": "error", "message": full_ai_response}))
+            logger.error("GPT API 오류: %s", e, extra={"user_id": self.user.id})
+            await self.send_json_frame({"type": "error", "message": full_ai_response})
 
         except Exception as e: # 👈 이 부분을 추가합니다.
             full_ai_response = None
-            print(f"--- [치명적 오류] 스트리밍 후처리(감정 분석/저장) 중 예외 발생: {e} ---")
+            logger.exception("스트리밍 후처리(감정 분석/저장) 중 예외 발생", extra={"user_id": self.user.id})
             # 예외가 발생해도 메시지 저장은 시도하지 않음
             return # 함수를 종료하고 receive로 돌아감
                 
@@ -326,36 +423,36 @@ class ChatConsumer(AsyncWebsocketConsumer):
             await finalize_and_save_messages_sync(
                 self.user, user_message_text, full_ai_response, history
             )
-            print("--- [디버그] 메시지 저장 및 메모리 추출 완료 ---")        
+            logger.debug("메시지 저장 및 메모리 추출 완료", extra={"user_id": self.user.id})
 
 
     async def receive(self, text_data=None, bytes_data=None):
         """클라이언트로부터 메시지를 수신했을 때 호출됩니다."""
-        print("--- [디버그 1] receive 함수 시작 ---") 
         try:
             await self.cancel_inactivity_timer()
 
-            text_data_json = json.loads(text_data)
+            text_data_json = json_service.loads(text_data)
             message = text_data_json.get('message', '').strip()
             latitude = text_data_json.get('latitude')
             longitude = text_data_json.get('longitude')
             
-            print(f"--- [디버그 2] 메시지 파싱 완료: {message} ---") 
+            logger.debug("메시지 수신 (%d자)", len(message), extra={"user_id": self.user.id})
 
             if not message:
                 return
             
+            # 사용자가 답했으므로 연속 능동 메시지 횟수와 대기 시간을 초기화
+            self.idle_nudges = 0
             await self._run_stream_chat(message, latitude, longitude)
-            print("--- [디버그] _run_stream_chat 호출 완료 ---") 
             
             await self.start_inactivity_timer()
 
-        except json.JSONDecodeError:
-            print("--- [오류] 잘못된 JSON 형식 ---")
-            await self.send(text_data=json.dumps({"type": "error", "message": "잘못된 JSON 형식입니다."}))
+        except json_service.JSONDecodeError:
+            logger.warning("잘못된 JSON 형식", extra={"user_id": self.user.id})
+            await self.send_json_frame({"type": "error", "message": "잘못된 JSON 형식입니다."})
         except Exception as e:
-            print(f"--- [오류] 채팅 처리 중 일반 예외 발생: {e} ---") 
-            await self.send(text_data=json.dumps({"type": "error", "message": "서버 내부 오류 발생."}))
+            logger.exception("채팅 처리 중 일반 예외 발생", extra={"user_id": self.user.id})
+            await self.send_json_frame({"type": "error", "message": "서버 내부 오류 발생."})
     # ----------------------------------------------------
     # 핵심 비즈니스 로직 (스트리밍 처리)
     # ----------------------------------------------------
@@ -369,13 +466,13 @@ class ChatConsumer(AsyncWebsocketConsumer):
         
         # 클라이언트에게 메시지를 읽어오도록 지시하는 알림을 보냅니다.
         # 클라이언트(프론트엔드)는 이 신호를 받고 별도의 API를 호출하여 메시지를 가져가게 됩니다.
-        await self.send(text_data=json.dumps({
+        await self.send_json_frame({
             'type': 'proactive.message.notification',
             'status': message_type, 
             'detail': '서버에 새로운 능동 메시지가 대기 중입니다.'
-        }))
+        })
         
-        print(f"--- [정보] 웹소켓으로 능동 메시지 알림 전송: {message_type} ---")
+        logger.info("웹소켓으로 능동 메시지 알림 전송: %s", message_type, extra={"user_id": self.user.id})
 
 
 
@@ -0,0 +1,82 @@
+# api/management/commands/anonymize_finetuning_dataset.py
+
+import os
+from multiprocessing import Pool
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+from services import json_service
+from services.anonymizer_service import Anonymizer, load_anonymizer_args
+
+# 워커 프로세스 전역: user_id -> Anonymizer (initializer에서 한 번 컴파일)
+_anonymizers = {}
+_roles = ()
+_strip_meta = False
+
+
+def _init_worker(anonymizer_args, roles, strip_meta):
+    global _anonymizers, _roles, _strip_meta
+    _anonymizers = {user_id: Anonymizer(*args) for user_id, args in anonymizer_args.items()}
+    _roles = roles
+    _strip_meta = strip_meta
+
+
+def _anonymize_line(line):
+    """JSONL 한 줄을 익명화합니다. 워커는 DB에 접근하지 않고 미리 받은 이름 목록만 사용합니다."""
+    if not line.strip():
+        return None, False
+    record = json_service.loads(line)
+    meta = record.pop('_meta', None) if _strip_meta else record.get('_meta')
+    anonymizer = _anonymizers.get((meta or {}).get('user_id'))
+    if anonymizer is not None:
+        for message in record.get('messages', []):
+            if message.get('role') in _roles and isinstance(message.get('content'), str):
+                message['content'] = anonymizer.anonymize(message['content'])
+    return json_service.dumps_bytes(record), anonymizer is not None
+
+
+class Command(BaseCommand):
+    help = (
+        "병합된 파인튜닝 데이터셋(JSONL)을 사용자별 최신 이름/관계 기준으로 다시 익명화합니다. "
+        "레코드의 _meta.user_id가 필요하므로 merge_finetuning_dataset --keep-meta로 만든 파일을 사용하세요."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('input', help="입력 JSONL 경로")
+        parser.add_argument('output', help="출력 JSONL 경로")
+        parser.add_argument('--processes', type=int, default=os.cpu_count(), help="익명화 워커 프로세스 수")
+        parser.add_argument('--chunksize', type=int, default=500, help="워커에 한 번에 넘길 줄 수")
+        parser.add_argument('--roles', default='system,user,assistant', help="익명화할 메시지 role (쉼표 구분)")
+        parser.add_argument('--strip-meta', action='store_true', help="출력에서 _meta 필드를 제거 (바로 업로드할 때)")
+
+    def handle(self, *args, **options):
+        if os.path.abspath(options['input']) == os.path.abspath(options['output']):
+            raise CommandError("입력과 출력 경로가 같을 수 없습니다.")
+
+        # 1차: 필요한 사용자 id만 모아 이름/관계를 한 번에 조회 (워커는 fork 후 DB 연결을 공유하지 않도록 DB를 쓰지 않음)
+        user_ids = set()
+        with open(options['input'], 'rb') as f:
+            for line in f:
+                if line.strip():
+                    user_id = (json_service.loads(line).get('_meta') or {}).get('user_id')
+                    if user_id is not None:
+                        user_ids.add(user_id)
+        anonymizer_args = load_anonymizer_args(user_ids)
+        roles = tuple(role.strip() for role in options['roles'].split(',') if role.strip())
+        connections.close_all() # fork된 워커가 부모의 DB 연결을 물려받지 않도록
+
+        # 2차: 줄 단위로 워커에 나눠 익명화 (imap은 입력 순서를 유지)
+        total = anonymized = 0
+        with open(options['input'], 'rb') as source, open(options['output'], 'wb') as target, \
+                Pool(options['processes'], initializer=_init_worker, initargs=(anonymizer_args, roles, options['strip_meta'])) as pool:
+            for output, changed in pool.imap(_anonymize_line, source, chunksize=options['chunksize']):
+                if output is None:
+                    continue
+                target.write(output + b"\n")
+                total += 1
+                anonymized += changed
+
+        missing = len(user_ids) - len(anonymizer_args)
+        self.stdout.write(self.style.SUCCESS(
+            f"예제 {total}건 중 {anonymized}건을 익명화했습니다. (사용자 {len(anonymizer_args)}명, 삭제되었거나 없는 사용자 {missing}명)"
+        ))
@@ -0,0 +1,177 @@
+# api/management/commands/bench_services.py
+
+import random
+from datetime import timedelta
+from itertools import count
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+from rest_framework.renderers import JSONRenderer
+
+from api import benchmarking
+from api.renderers import ORJSONRenderer
+from api.serializers import ChatMessageSerializer
+from api.models import ChatMessage, UserAttribute, UserActivity, ActivityAnalytics, UserRelationship, UserSchedule
+
+User = get_user_model()
+
+PLACES = ['스타벅스 강남점', '동네 카페', '한강공원', '회사', '헬스장', 'CGV 용산', '이마트', '국밥집', '도서관', '성수동 카페']
+COMPANIONS = [None, '석민', '엄마', '회사 동료', '여자친구', '대학 동기']
+RELATION_TYPES = ['친구', '가족', '직장 동료', '연인', '선후배']
+MESSAGES = [
+    "오늘 회사에서 회의가 너무 길어서 피곤했어",
+    "주말에 석민이랑 한강공원 가서 치킨 먹었어",
+    "요즘 헬스장 다니는데 생각보다 재밌다",
+    "내일 엄마 생신이라 케이크 사야 해",
+    "근처에 갈 만한 카페 추천해줄래?",
+]
+BENCH_MESSAGE = "주말에 석민이랑 성수동 카페 갔던 거 기억나? 근처에 갈만한 카페 추천해줘"
+SEOUL_LATITUDE, SEOUL_LONGITUDE = 37.4979, 127.0276
+
+
+class Command(BaseCommand):
+    help = (
+        "서비스 계층의 핫 함수들을 시드된 테스트 DB(사용자당 메시지/활동/관계 수 지정)에서 반복 측정하고 "
+        "결과를 JSON으로 저장합니다. OpenAI/Kakao 호출은 지연 없는 로컬 가짜 서버로 대체되고, "
+        "Redis/Celery/채널 레이어는 운영 데이터와 격리됩니다."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--messages', type=int, default=10000, help="사용자당 채팅 메시지 수")
+        parser.add_argument('--activities', type=int, default=1000, help="사용자당 활동 기록 수")
+        parser.add_argument('--relationships', type=int, default=200, help="사용자당 인간관계 수")
+        parser.add_argument('--attributes', type=int, default=50, help="사용자당 속성 수")
+        parser.add_argument('--repeat', type=int, default=20, help="함수당 측정 반복 횟수")
+        parser.add_argument('--warmup', type=int, default=2)
+        parser.add_argument('--only', nargs='*', default=None, help="지정한 벤치마크만 실행 (이름 목록)")
+        parser.add_argument('--output', default='benchmarks/services.json', help="결과 JSON 저장 경로")
+        parser.add_argument('--keepdb', action='store_true', help="테스트 DB를 삭제하지 않고 재사용")
+
+    def handle(self, *args, **options):
+        random.seed(42) # 커밋 간 비교를 위해 같은 데이터로 시드
+
+        with benchmarking.fake_upstream(first_token_ms=0, token_ms=0, json_ms=0), benchmarking.benchmark_database(options['keepdb']):
+            user = self._seed(options)
+            results = {}
+            for name, func in self._benchmarks(user).items():
+                if options['only'] and name not in options['only']:
+                    continue
+                samples = benchmarking.time_call(func, repeat=options['repeat'], warmup=options['warmup'])
+                results[name] = benchmarking.summarize(samples)
+                stats = results[name]
+                self.stdout.write(f"{name:<40} p50 {stats['p50_ms']:>9}ms  p95 {stats['p95_ms']:>9}ms  p99 {stats['p99_ms']:>9}ms")
+
+            parameters = {key: options[key] for key in ('messages', 'activities', 'relationships', 'attributes', 'repeat', 'warmup')}
+            benchmarking.write_results(options['output'], 'bench_services', parameters, results)
+
+        self.stdout.write(self.style.SUCCESS(f"결과 저장: {options['output']}"))
+
+    # ----------------------------------------------------
+    # 데이터 시드 (bulk_create는 시그널을 보내지 않으므로 Redis/타이머 휠 등 부수 효과 없음)
+    # ----------------------------------------------------
+
+    def _seed(self, options):
+        user = User.objects.create_user(username='bench_user', password='bench-password')
+        today = timezone.now().date()
+
+        ChatMessage.objects.bulk_create([
+            ChatMessage(user=user, message=random.choice(MESSAGES), is_user=index % 2 == 0)
+            for index in range(options['messages'])
+        ], batch_size=1000)
+
+        UserActivity.objects.bulk_create([
+            UserActivity(
+                user=user,
+                activity_date=today - timedelta(days=random.randint(0, 365)),
+                place=random.choice(PLACES),
+                companion=random.choice(COMPANIONS),
+                memo=f"{random.choice(MESSAGES)} #{index}",
+            )
+            for index in range(options['activities'])
+        ], batch_size=1000)
+
+        UserRelationship.objects.bulk_create([
+            UserRelationship(
+                user=user,
+                name=f"지인{index}",
+                relationship_type=random.choice(RELATION_TYPES),
+                traits="착함, 유머러스함",
+            )
+            for index in range(options['relationships'])
+        ], batch_size=1000)
+
+        UserAttribute.objects.bulk_create([
+            UserAttribute(user=user, fact_type=f"속성{index}", content=f"내용{index}")
+            for index in range(options['attributes'])
+        ], batch_size=1000)
+
+        ActivityAnalytics.objects.bulk_create([
+            ActivityAnalytics(
+                user=user, period_type='weekly', period_start_date=today - timedelta(weeks=index),
+                place=random.choice(PLACES), companion=random.choice(COMPANIONS), count=random.randint(1, 10),
+            )
+            for index in range(12)
+        ])
+
+        UserSchedule.objects.bulk_create([
+            UserSchedule(user=user, date=today, content=f"오늘 일정 {index}") for index in range(3)
+        ])
+        return User.objects.select_related('profile').get(id=user.id)
+
+    # ----------------------------------------------------
+    # 측정 대상
+    # ----------------------------------------------------
+
+    def _benchmarks(self, user):
+        # 외부 API를 가짜 서버로 돌린 뒤에 서비스 모듈을 임포트 (OpenAI 클라이언트가 생성 시점 주소를 사용)
+        from services import chat_service, context_service, emoticon_service, location_service, memory_service, prompt_service
+        from services.history_service import get_history_snapshot
+
+        history = get_history_snapshot(user.id, limit=10)
+        time_contexts = chat_service._get_time_contexts(history)
+        assembled_contexts = chat_service._assemble_context_data(user, BENCH_MESSAGE)
+        final_system_prompt = prompt_service.build_final_system_prompt(user, time_contexts, assembled_contexts)
+        # 채팅 기록 API의 최대 페이지(100개)를 직렬화한 데이터. 렌더러 비용만 비교
+        chat_page = {
+            'count': ChatMessage.objects.filter(user=user).count(),
+            'next': None,
+            'previous': None,
+            'results': ChatMessageSerializer(ChatMessage.objects.filter(user=user).order_by('-timestamp')[:100], many=True).data,
+        }
+        json_renderer, orjson_renderer = JSONRenderer(), ORJSONRenderer()
+        emoticon_message = '<img src="assets/img/happy.png" class="chat-emoticon"> 오늘 기분 최고야!'
+
+        today_str = timezone.now().date().strftime('%Y-%m-%d')
+        tomorrow_str = (timezone.now().date() + timedelta(days=1)).strftime('%Y-%m-%d')
+        sequence = count()
+
+        def save_attributes():
+            memory_service._save_user_attributes(user, [{'action': 'update', 'fact_type': '성격', 'content': f"꼼꼼함 {next(sequence)}"}])
+
+        def save_activity():
+            # 매번 다른 메모로 중복 검사를 통과시켜 실제 저장 경로를 측정
+            memory_service._save_activity(user, {'place': '성수동 카페', 'companion': '석민', 'memo': f"벤치마크 활동 {next(sequence)}", 'activity_time': '15:00'}, today_str)
+
+        def save_relationships():
+            memory_service._save_relationships(user, [{'name': '지인1', 'relationship_type': '친구', 'traits': f"특징{next(sequence)}"}])
+
+        def save_schedule():
+            memory_service._save_schedule(user, {'schedule_date': tomorrow_str, 'schedule_time': '09:00', 'content': f"벤치마크 일정 {next(sequence)}"}, today_str)
+
+        return {
+            'chat_service._assemble_context_data': lambda: chat_service._assemble_context_data(user, BENCH_MESSAGE),
+            'context_service.search_activities_for_context': lambda: context_service.search_activities_for_context(user, BENCH_MESSAGE),
+            'prompt_service.build_final_system_prompt': lambda: prompt_service.build_final_system_prompt(user, time_contexts, assembled_contexts),
+            'chat_service._prepare_llm_messages': lambda: chat_service._prepare_llm_messages(final_system_prompt, history, BENCH_MESSAGE),
+            'emoticon_service.parse_emoticon': lambda: emoticon_service.parse_emoticon(emoticon_message),
+            'memory_service._save_user_attributes': save_attributes,
+            'memory_service._save_activity': save_activity,
+            'memory_service._save_relationships': save_relationships,
+            'memory_service._save_schedule': save_schedule,
+            'renderers.JSONRenderer(chat_page_100)': lambda: json_renderer.render(chat_page),
+            'renderers.ORJSONRenderer(chat_page_100)': lambda: orjson_renderer.render(chat_page),
+            'location_service.get_location_based_recommendation': lambda: location_service.get_location_based_recommendation(
+                user, BENCH_MESSAGE, SEOUL_LATITUDE, SEOUL_LONGITUDE
+            ),
+        }
@@ -0,0 +1,22 @@
+# api/management/commands/caption_cache_stats.py
+
+from django.core.management.base import BaseCommand
+from services import caption_cache_service
+
+
+class Command(BaseCommand):
+    help = "이미지 캡션 캐시(dHash 근사 중복 포함)의 누적 적중/실패 횟수와 적중률을 출력합니다."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--reset', action='store_true', help="출력 후 카운터를 초기화")
+
+    def handle(self, *args, **options):
+        stats = caption_cache_service.get_stats()
+        hit_rate = f"{stats['hit_rate'] * 100:.1f}%" if stats['hit_rate'] is not None else "-"
+        self.stdout.write(
+            f"조회 {stats['lookups']}회: 정확히 일치 {stats['exact_hits']}, 근사 일치 {stats['near_hits']}, "
+            f"실패 {stats['misses']} (적중률 {hit_rate})"
+        )
+        if options['reset']:
+            caption_cache_service.reset_stats()
+            self.stdout.write(self.style.SUCCESS("카운터를 초기화했습니다."))
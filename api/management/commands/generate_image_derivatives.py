@@ -0,0 +1,23 @@
+# api/management/commands/generate_image_derivatives.py
+
+from django.core.management.base import BaseCommand
+from api.models import ChatMessage
+from api.tasks import generate_chat_image_derivatives
+
+
+class Command(BaseCommand):
+    help = "WebP 파생본이 없는 기존 채팅 이미지에 대해 파생본 생성 태스크를 등록합니다. (--all이면 모두 다시 생성)"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--all', action='store_true', help="이미 파생본이 있는 이미지도 다시 생성 (크기/품질 설정 변경 후)")
+
+    def handle(self, *args, **options):
+        messages = ChatMessage.objects.exclude(image='').exclude(image__isnull=True)
+        if not options['all']:
+            messages = messages.filter(image_variants={})
+
+        count = 0
+        for message_id in messages.values_list('id', flat=True).iterator():
+            generate_chat_image_derivatives.delay(message_id)
+            count += 1
+        self.stdout.write(self.style.SUCCESS(f"이미지 {count}건의 파생본 생성 태스크를 등록했습니다."))
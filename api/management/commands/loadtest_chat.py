@@ -0,0 +1,153 @@
+# api/management/commands/loadtest_chat.py
+
+import asyncio
+import json
+import time
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from rest_framework_simplejwt.tokens import AccessToken
+
+from api import benchmarking
+
+User = get_user_model()
+
+TURN_MESSAGES = [
+    "안녕! 오늘 하루 어땠어?",
+    "요즘 회사 일이 너무 바빠서 힘들어",
+    "주말에 친구랑 강남역에서 저녁 먹기로 했어",
+    "근처에 갈 만한 카페 있을까?",
+    "내일 오후 3시에 팀 회의 있는 거 기억해줘",
+]
+
+
+class Command(BaseCommand):
+    help = (
+        "ASGI 앱을 프로세스 안에서 띄우고, 로컬 가짜 OpenAI/Kakao 서버를 상대로 N개의 인증된 웹소켓 클라이언트가 "
+        "ws/chat/ 턴을 실행하여 처리량, 첫 토큰까지의 시간(TTFT), 턴 지연 시간 p50/p95/p99를 측정합니다. (네트워크 불필요)"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--clients', type=int, default=20, help="동시 웹소켓 클라이언트 수")
+        parser.add_argument('--turns', type=int, default=5, help="클라이언트당 채팅 턴 수")
+        parser.add_argument('--first-token-ms', type=int, default=300, help="가짜 LLM의 첫 토큰 지연")
+        parser.add_argument('--token-ms', type=int, default=20, help="가짜 LLM의 토큰 간 지연")
+        parser.add_argument('--tokens', type=int, default=40, help="응답당 스트리밍 토큰 수")
+        parser.add_argument('--json-ms', type=int, default=50, help="비스트리밍 호출(감정 분석, 메모리 추출, Kakao) 지연")
+        parser.add_argument('--latitude', type=float, default=None, help="지정하면 위치 컨텍스트 경로도 실행")
+        parser.add_argument('--longitude', type=float, default=None)
+        parser.add_argument('--timeout', type=float, default=60.0, help="턴 하나의 최대 대기 시간(초)")
+        parser.add_argument('--output', default=None, help="결과 JSON 저장 경로 (예: benchmarks/loadtest.json)")
+        parser.add_argument('--keepdb', action='store_true', help="테스트 DB를 삭제하지 않고 재사용")
+
+    def handle(self, *args, **options):
+        fake_options = {
+            'first_token_ms': options['first_token_ms'],
+            'token_ms': options['token_ms'],
+            'tokens': options['tokens'],
+            'json_ms': options['json_ms'],
+        }
+        # 테스트 DB와 함께 Redis(별도 DB), Celery(즉시 실행), 채널 레이어(메모리)도 격리됨
+        with benchmarking.fake_upstream(**fake_options) as upstream, benchmarking.benchmark_database(options['keepdb']):
+            # OpenAI 클라이언트가 가짜 서버 주소를 읽도록 환경을 바꾼 뒤에 ASGI 앱(과 서비스 모듈)을 임포트
+            from app_server.asgi import application
+
+            tokens = self._create_users(options['clients'])
+            results = asyncio.run(self._run(application, tokens, options))
+            results['upstream_requests'] = dict(upstream.request_counts)
+
+        self._report(results)
+        if options['output']:
+            parameters = {key: options[key] for key in (
+                'clients', 'turns', 'first_token_ms', 'token_ms', 'tokens', 'json_ms', 'latitude', 'longitude'
+            )}
+            benchmarking.write_results(options['output'], 'loadtest_chat', parameters, results)
+            self.stdout.write(self.style.SUCCESS(f"결과 저장: {options['output']}"))
+
+    def _create_users(self, count):
+        tokens = []
+        for index in range(count):
+            user, _ = User.objects.get_or_create(username=f"loadtest_{index}")
+            tokens.append(str(AccessToken.for_user(user)))
+        return tokens
+
+    async def _run(self, application, tokens, options):
+        started = time.perf_counter()
+        client_results = await asyncio.gather(
+            *(self._run_client(application, token, options) for token in tokens)
+        )
+        wall_seconds = time.perf_counter() - started
+
+        turn_ms = [sample for result in client_results for sample in result['turn_ms']]
+        ttft_ms = [sample for result in client_results for sample in result['ttft_ms']]
+        connect_ms = [result['connect_ms'] for result in client_results if result['connect_ms'] is not None]
+        errors = sum(result['errors'] for result in client_results)
+
+        return {
+            'wall_seconds': round(wall_seconds, 3),
+            'completed_turns': len(turn_ms),
+            'errors': errors,
+            'turns_per_second': round(len(turn_ms) / wall_seconds, 3) if wall_seconds else None,
+            'connect': benchmarking.summarize(connect_ms),
+            'time_to_first_token': benchmarking.summarize(ttft_ms),
+            'turn_latency': benchmarking.summarize(turn_ms),
+        }
+
+    async def _run_client(self, application, token, options):
+        from channels.testing import WebsocketCommunicator
+
+        result = {'connect_ms': None, 'turn_ms': [], 'ttft_ms': [], 'errors': 0}
+        communicator = WebsocketCommunicator(
+            application, "/ws/chat/", headers=[(b"authorization", f"Bearer {token}".encode())]
+        )
+        connect_started = time.perf_counter()
+        connected, _ = await communicator.connect(timeout=options['timeout'])
+        if not connected:
+            result['errors'] += options['turns']
+            return result
+        result['connect_ms'] = (time.perf_counter() - connect_started) * 1000
+
+        try:
+            for turn in range(options['turns']):
+                payload = {'message': TURN_MESSAGES[turn % len(TURN_MESSAGES)]}
+                if options['latitude'] is not None and options['longitude'] is not None:
+                    payload.update(latitude=options['latitude'], longitude=options['longitude'])
+
+                turn_started = time.perf_counter()
+                first_token_at = None
+                await communicator.send_to(text_data=json.dumps(payload, ensure_ascii=False))
+                while True:
+                    try:
+                        event = json.loads(await communicator.receive_from(timeout=options['timeout']))
+                    except asyncio.TimeoutError:
+                        result['errors'] += 1
+                        break
+                    if event.get('type') == 'chat_stream' and first_token_at is None:
+                        first_token_at = time.perf_counter()
+                    elif event.get('type') == 'stream_end':
+                        result['turn_ms'].append((time.perf_counter() - turn_started) * 1000)
+                        if first_token_at is not None:
+                            result['ttft_ms'].append((first_token_at - turn_started) * 1000)
+                        break
+                    elif event.get('type') == 'error':
+                        result['errors'] += 1
+                        break
+        finally:
+            await communicator.disconnect()
+        return result
+
+    def _report(self, results):
+        self.stdout.write(
+            f"완료 턴: {results['completed_turns']}  오류: {results['errors']}  "
+            f"처리량: {results['turns_per_second']} turns/s  총 소요: {results['wall_seconds']}s"
+        )
+        for label, key in (("연결", 'connect'), ("TTFT", 'time_to_first_token'), ("턴 지연", 'turn_latency')):
+            stats = results[key]
+            if not stats.get('count'):
+                self.stdout.write(f"{label}: 표본 없음")
+                continue
+            self.stdout.write(
+                f"{label}: p50 {stats['p50_ms']}ms  p95 {stats['p95_ms']}ms  p99 {stats['p99_ms']}ms  "
+                f"(mean {stats['mean_ms']}ms, max {stats['max_ms']}ms, n={stats['count']})"
+            )
+        self.stdout.write(f"가짜 서버 요청 수: {results['upstream_requests']}")
@@ -0,0 +1,43 @@
+# api/management/commands/merge_finetuning_dataset.py
+
+import os
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from services import dataset_writer_service, json_service
+
+
+class Command(BaseCommand):
+    help = "워커별 파인튜닝 데이터셋 샤드(gzip)를 하나의 OpenAI 파인튜닝용 JSONL 파일로 병합합니다."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--output', default='finetuning_dataset.jsonl', help="병합 결과 JSONL 경로")
+        parser.add_argument('--append', action='store_true', help="결과 파일을 덮어쓰지 않고 이어 씀")
+        parser.add_argument('--include-open', action='store_true', help="비정상 종료로 닫히지 않은(.open) 샤드도 포함 (실행 중인 워커의 샤드는 포함하지 말 것)")
+        parser.add_argument('--keep-meta', action='store_true', help="_meta(user_id 등) 필드를 남김 (일괄 익명화 등 후처리용)")
+        parser.add_argument('--delete', action='store_true', help="병합이 끝난 샤드를 삭제")
+
+    def handle(self, *args, **options):
+        shards = dataset_writer_service.list_shards(settings.FINETUNING_DATASET_DIR, include_open=options['include_open'])
+        if not shards:
+            self.stdout.write("병합할 샤드가 없습니다.")
+            return
+
+        output = options['output']
+        # 덮어쓰기는 임시 파일에 쓴 뒤 교체하여, 도중에 실패해도 기존 결과 파일이 깨지지 않게 함
+        target = output if options['append'] else f"{output}.tmp"
+        count = 0
+        with open(target, 'ab' if options['append'] else 'wb') as f:
+            for path in shards:
+                for record in dataset_writer_service.iter_shard_records(path):
+                    if not options['keep_meta']:
+                        record.pop('_meta', None)
+                    f.write(json_service.dumps_bytes(record) + b"\n")
+                    count += 1
+        if not options['append']:
+            os.replace(target, output)
+
+        if options['delete']:
+            for path in shards:
+                os.remove(path)
+        self.stdout.write(self.style.SUCCESS(f"샤드 {len(shards)}개에서 예제 {count}건을 {output}에 병합했습니다."))
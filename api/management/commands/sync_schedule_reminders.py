@@ -0,0 +1,12 @@
+# api/management/commands/sync_schedule_reminders.py
+
+from django.core.management.base import BaseCommand
+from services import schedule_reminder_service
+
+
+class Command(BaseCommand):
+    help = "앞으로 다가올 모든 일정의 알림을 Redis 타이머 휠에 다시 등록합니다. (배포 직후 또는 Redis 초기화 후 실행)"
+
+    def handle(self, *args, **options):
+        count = schedule_reminder_service.sync_all_reminders()
+        self.stdout.write(self.style.SUCCESS(f"일정 {count}건의 알림 등록 상태를 동기화했습니다."))
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.7 on 2026-10-19 10:12
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0004_proactivemessage'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='chatmessage',
+            name='image_variants',
+            field=models.JSONField(blank=True, default=dict, help_text="이미지 파생본(WebP) 정보 {'thumb': {'path', 'width', 'height'}, ...}"),
+        ),
+    ]
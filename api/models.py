@@ -2,8 +2,10 @@
 from django.db import models
 from django.conf import settings
 from django.contrib.auth import get_user_model
-from django.db.models.signals import post_save
+from django.db import transaction
+from django.db.models.signals import post_save, post_delete
 from django.dispatch import receiver
+import copy
 import uuid
 
 User = get_user_model()
@@ -22,6 +24,37 @@ class UserProfile(models.Model):
     def __str__(self):
         return f"{self.user.username}의 프로필"
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._remember_saved_state()
+        return instance
+
+    def save(self, *args, **kwargs):
+        super().save(*args, **kwargs)
+        self._remember_saved_state()
+
+    def _remember_saved_state(self):
+        # memory(JSONField)는 제자리에서 수정되는 경우가 많으므로 깊은 복사로 비교 기준을 남김
+        self._saved_state = {
+            field.attname: copy.deepcopy(getattr(self, field.attname))
+            for field in self._meta.concrete_fields if field.attname in self.__dict__
+        }
+
+    def get_changed_fields(self):
+        """DB에서 읽거나 저장한 이후 바뀐 필드 이름 목록. 비교 기준이 없으면 None."""
+        saved_state = getattr(self, '_saved_state', None)
+        if saved_state is None:
+            return None
+        return [
+            field.name for field in self._meta.concrete_fields
+            if field.attname in saved_state and getattr(self, field.attname) != saved_state[field.attname]
+        ]
+
+    def get_saved_value(self, field_name, default=None):
+        """DB에서 읽거나 마지막으로 저장했을 때의 필드 값. 비교 기준이 없으면 default."""
+        return getattr(self, '_saved_state', {}).get(field_name, default)
+
 @receiver(post_save, sender=User)
 def create_user_profile(sender, instance, created, **kwargs):
     """User가 생성될 때 자동으로 UserProfile을 생성합니다."""
@@ -30,11 +63,39 @@ def create_user_profile(sender, instance, created, **kwargs):
 
 @receiver(post_save, sender=User)
 def save_user_profile(sender, instance, **kwargs):
-    """User가 저장될 때 UserProfile도 함께 저장합니다."""
-    try:
-        instance.profile.save()
-    except UserProfile.DoesNotExist:
+    """User가 저장될 때, 같은 User 객체로 불러온 UserProfile에 바뀐 필드가 있으면 그 필드만 저장합니다."""
+    profile_relation = User.profile.related
+    if not profile_relation.is_cached(instance):
+        return # 이 User 객체로 프로필을 읽지 않았으면 바뀐 내용도 없으므로 쿼리/저장하지 않음
+    profile = profile_relation.get_cached_value(instance)
+    if profile is None:
         UserProfile.objects.create(user=instance)
+        return
+    changed_fields = profile.get_changed_fields()
+    if changed_fields is None:
+        profile.save()
+    elif changed_fields:
+        profile.save(update_fields=changed_fields)
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+@receiver(post_save, sender=UserProfile)
+@receiver(post_delete, sender=UserProfile)
+def invalidate_auth_cache(sender, instance, **kwargs):
+    """사용자/프로필이 바뀌거나 삭제되면 웹소켓 인증 캐시에서 해당 사용자의 스냅샷을 지웁니다."""
+    from services import auth_cache_service # 순환 임포트 방지
+    user_id = instance.pk if sender is User else instance.user_id
+    transaction.on_commit(lambda: auth_cache_service.invalidate_user(user_id))
+
+@receiver(post_save, sender=UserProfile)
+def notify_profile_changed(sender, instance, **kwargs):
+    """프로필의 프롬프트 관련 필드가 바뀌면 접속 중인 Consumer가 캐시한 프로필 스냅샷을 다시 읽도록 알립니다."""
+    from services import profile_service # 순환 임포트 방지
+    # post_save는 save() 안에서 실행되므로 get_changed_fields()는 아직 이번 저장 전 기준과 비교한 값
+    if not profile_service.is_prompt_relevant_change(instance, instance.get_changed_fields()):
+        return
+    user_id = instance.user_id
+    transaction.on_commit(lambda: profile_service.notify_profile_changed(user_id))
 #---------------------------------------------------------------------------------------------------------------
 class ChatMessage(models.Model):
     user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE)
@@ -42,10 +103,34 @@ class ChatMessage(models.Model):
     image = models.ImageField(upload_to='chat_images/', null=True, blank=True, help_text="메시지에 첨부된 이미지 파일")
     is_user = models.BooleanField(default=True)  # True면 사용자 메시지, False면 AI 메시지
     character_emotion = models.CharField(max_length=50, null=True, blank=True, help_text="AI 캐릭터의 감정 상태") # New field
+    image_variants = models.JSONField(default=dict, blank=True, help_text="이미지 파생본(WebP) 정보 {'thumb': {'path', 'width', 'height'}, ...}")
     timestamp = models.DateTimeField(auto_now_add=True)
 
     def __str__(self):
         return f'{self.user.username}: {self.message[:50]}'
+
+@receiver(post_save, sender=ChatMessage)
+def write_through_chat_history(sender, instance, created, **kwargs):
+    """ChatMessage가 생성되면 사용자별 최근 대화 링 버퍼에 기록하고, 수정되면 무효화합니다."""
+    from services import history_service # 순환 임포트 방지
+    if created:
+        transaction.on_commit(lambda: history_service.push_message(instance))
+    else:
+        transaction.on_commit(lambda: history_service.invalidate(instance.user_id))
+
+@receiver(post_save, sender=ChatMessage)
+def schedule_image_derivatives(sender, instance, created, **kwargs):
+    """이미지가 첨부된 메시지가 생성되면 썸네일/중간 크기 WebP 파생본 생성을 Celery로 요청합니다."""
+    if created and instance.image:
+        from api.tasks import generate_chat_image_derivatives # 순환 임포트 방지
+        message_id = instance.id
+        transaction.on_commit(lambda: generate_chat_image_derivatives.delay(message_id))
+
+@receiver(post_delete, sender=ChatMessage)
+def invalidate_chat_history(sender, instance, **kwargs):
+    """ChatMessage가 삭제되면 링 버퍼를 무효화합니다."""
+    from services import history_service
+    transaction.on_commit(lambda: history_service.invalidate(instance.user_id))
 #---------------------------------------------------------------------------------------------------------------
 class UserAttribute(models.Model):
     """
@@ -132,6 +217,19 @@ class UserSchedule(models.Model):
 
     def __str__(self):
         return f"[{self.date}] {self.user.username}'s schedule"
+
+@receiver(post_save, sender=UserSchedule)
+def schedule_upcoming_reminder(sender, instance, **kwargs):
+    """일정이 생성/수정되면 일정 10분 전 알림을 타이머 휠에 등록(재등록)합니다."""
+    from services import schedule_reminder_service # 순환 임포트 방지
+    transaction.on_commit(lambda: schedule_reminder_service.schedule_reminder(instance))
+
+@receiver(post_delete, sender=UserSchedule)
+def cancel_upcoming_reminder(sender, instance, **kwargs):
+    """일정이 삭제되면 등록된 알림을 취소합니다."""
+    from services import schedule_reminder_service
+    schedule_id = instance.id
+    transaction.on_commit(lambda: schedule_reminder_service.cancel_reminder(schedule_id))
 #---------------------------------------------------------------------------------------------------------------
 class ProactiveMessage(models.Model):
     """AI가 사용자에게 능동적으로 보낸 메시지(알림)를 저장하는 모델"""
@@ -182,3 +280,30 @@ class QuizResult(models.Model):
 
     def __str__(self):
         return f"{self.user.username} - {self.genre} 퀴즈 ({self.score}/{self.num_questions}) on {self.date_completed.strftime('%Y-%m-%d')}"
+#---------------------------------------------------------------------------------------------------------------
+@receiver(post_save, sender=UserProfile)
+@receiver(post_delete, sender=UserProfile)
+@receiver(post_save, sender=UserAttribute)
+@receiver(post_delete, sender=UserAttribute)
+@receiver(post_save, sender=UserRelationship)
+@receiver(post_delete, sender=UserRelationship)
+@receiver(post_save, sender=UserSchedule)
+@receiver(post_delete, sender=UserSchedule)
+@receiver(post_save, sender=UserActivity)
+@receiver(post_delete, sender=UserActivity)
+def bump_memory_version(sender, instance, update_fields=None, **kwargs):
+    """메모리(프로필/속성/관계/일정/활동)가 바뀌면 조건부 GET(ETag)에 쓰는 사용자별 버전을 올립니다."""
+    from services import memory_version_service # 순환 임포트 방지
+    if sender is UserProfile and update_fields is not None and set(update_fields) <= {'memory'}:
+        return # 대화 요약 등 memory 갱신은 상태 응답에 포함되지 않음
+    transaction.on_commit(lambda: memory_version_service.bump_for_instance(instance))
+
+@receiver(post_save, sender=UserAttribute)
+@receiver(post_delete, sender=UserAttribute)
+@receiver(post_save, sender=UserRelationship)
+@receiver(post_delete, sender=UserRelationship)
+def invalidate_anonymizer(sender, instance, **kwargs):
+    """관계/속성이 바뀌면 이 프로세스에 캐시된 파인튜닝 익명화 정규식을 지웁니다. (다른 프로세스는 메모리 버전으로 감지)"""
+    from services import anonymizer_service # 순환 임포트 방지
+    user_id = instance.user_id
+    transaction.on_commit(lambda: anonymizer_service.invalidate_user(user_id))
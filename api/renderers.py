@@ -0,0 +1,40 @@
+# api/renderers.py
+
+import orjson
+from django.conf import settings
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import BaseParser
+from rest_framework.renderers import BaseRenderer
+from rest_framework.utils.encoders import JSONEncoder
+
+# orjson이 직접 처리하지 못하는 타입(Decimal, 지연 번역 문자열, QuerySet 등)은 DRF 기본 인코더 규칙을 그대로 따름
+_drf_encoder = JSONEncoder()
+
+
+class ORJSONRenderer(BaseRenderer):
+    """
+    DRF 기본 JSONRenderer를 대체하는 orjson 렌더러.
+    한국어를 \\uXXXX로 이스케이프하지 않고 UTF-8 그대로 출력하므로 응답 크기와 직렬화 CPU가 모두 줄어듭니다.
+    """
+    media_type = 'application/json'
+    format = 'json'
+    charset = None # orjson은 항상 UTF-8 바이트를 반환
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        option = orjson.OPT_NON_STR_KEYS
+        if settings.DEBUG:
+            option |= orjson.OPT_INDENT_2
+        return orjson.dumps(data, default=_drf_encoder.default, option=option)
+
+
+class ORJSONParser(BaseParser):
+    """application/json 요청 본문을 orjson으로 파싱합니다."""
+    media_type = 'application/json'
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        try:
+            return orjson.loads(stream.read())
+        except orjson.JSONDecodeError as e:
+            raise ParseError(f'JSON parse error - {e}')
@@ -2,6 +2,7 @@
 from rest_framework import serializers
 from django.contrib.auth import get_user_model
 from django.contrib.auth.password_validation import validate_password
+from services import image_derivative_service
 from api.models import UserAttribute, UserRelationship, UserSchedule, UserProfile, UserActivity, ActivityAnalytics, QuizResult, ProactiveMessage, ChatMessage
 
 ########
@@ -80,8 +81,8 @@ class UserRelationshipSerializer(serializers.ModelSerializer):
 class UserStatusSerializer(serializers.Serializer):
     """AI 상태 페이지에 필요한 데이터를 하나로 묶어 직렬화"""
     # UserProfile 모델에서 가져올 필드
-    chatbot_name = serializers.CharField(source='userprofile.chatbot_name')
-    affinity_score = serializers.IntegerField(source='userprofile.affinity_score', allow_null=True)
+    chatbot_name = serializers.CharField(source='profile.chatbot_name')
+    affinity_score = serializers.IntegerField(source='profile.affinity_score', allow_null=True)
     
     # UserAttribute 모델에서 가져올 속성
     core_facts = UserAttributeSerializer(many=True, source='attributes') 
@@ -191,10 +192,16 @@ class ChatMessageSerializer(serializers.ModelSerializer):
     사용자의 채팅 메시지를 직렬화합니다.
     사용자 필드는 읽기 전용으로 설정하여 현재 인증된 사용자로 자동 설정되도록 합니다.
     """
+    # 목록에서는 원본 대신 파생본을 쓰도록 WebP 썸네일/중간 크기 URL과 srcset 문자열을 제공 (생성 전이면 null)
+    image_sources = serializers.SerializerMethodField()
+
     class Meta:
         model = ChatMessage
         fields = [
-            'id', 'user', 'message', 'image', 'is_user', 
+            'id', 'user', 'message', 'image', 'image_sources', 'is_user', 
             'character_emotion', 'timestamp'
         ]
-        read_only_fields = ['user', 'timestamp'] # User and timestamp are set automatically    
+        read_only_fields = ['user', 'timestamp'] # User and timestamp are set automatically
+
+    def get_image_sources(self, obj):
+        return image_derivative_service.build_image_sources(obj, self.context.get('request'))
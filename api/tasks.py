@@ -1,34 +1,107 @@
 # api/tasks.py
 
-from celery import shared_task
+import logging
+
+from celery import shared_task, chord, group
 from django.contrib.auth import get_user_model
-from services import proactive_service # proactive_service 임포트
+from django.utils import timezone
+from services import proactive_scheduler_service, schedule_reminder_service, image_derivative_service
 
 User = get_user_model()
+logger = logging.getLogger(__name__)
 
 @shared_task(bind=True)
 def check_and_send_proactive_messages(self):
     """
     모든 활성 사용자들에 대해 능동 메시지 트리거를 확인하고 생성합니다.
+    사용자를 샤드로 나누어 Celery chord로 병렬 처리하며, 실행 락으로 이전 비트와 겹치지 않게 합니다.
+    """
+    run_id = proactive_scheduler_service.acquire_run_lock()
+    if run_id is None:
+        logger.info("이전 능동 메시지 실행이 아직 진행 중입니다. 이번 비트는 스킵합니다.")
+        return
+
+    logger.info("능동 메시지 확인 태스크 시작", extra={"run_id": run_id})
+    started_at = timezone.now().isoformat()
+
+    # 트리거 조건(대화 공백, 시간대, 임박한 일정, 대기 중인 메시지 여부)은 SQL에서 평가
+    candidates = proactive_scheduler_service.get_candidates()
+    shards = proactive_scheduler_service.split_into_shards(candidates)
+
+    if not shards:
+        proactive_scheduler_service.record_run_metrics(run_id, [], started_at, 0)
+        proactive_scheduler_service.release_run_lock(run_id)
+        return
+
+    chord(
+        group(process_proactive_shard.s(shard) for shard in shards)
+    )(finalize_proactive_run.s(run_id, started_at, len(candidates)))
+
+    logger.info("사용자 %d명을 %d개 샤드로 분배 완료", len(candidates), len(shards), extra={"run_id": run_id})
+
+
+@shared_task
+def process_proactive_shard(candidates):
+    """샤드 하나([user_id, trigger_type, schedule_content] 목록)의 능동 메시지를 생성하고 샤드 지표를 반환합니다."""
+    return proactive_scheduler_service.process_shard(candidates)
+
+
+@shared_task
+def finalize_proactive_run(shard_results, run_id, started_at, total_users):
+    """모든 샤드가 끝나면 실행 지표를 기록하고 실행 락을 해제합니다."""
+    try:
+        proactive_scheduler_service.record_run_metrics(run_id, shard_results, started_at, total_users)
+    finally:
+        proactive_scheduler_service.release_run_lock(run_id)
+    logger.info("능동 메시지 확인 태스크 종료", extra={"run_id": run_id})
+
+
+@shared_task(ignore_result=True)
+def dispatch_due_schedule_reminders():
     """
-    print("--- [Scheduler] 능동 메시지 확인 태스크 시작 ---")
-    
-    # 🚨 능동 메시지 생성 로직을 반복 실행
-    active_users = User.objects.filter(is_active=True) # 활성 사용자 필터링
-    
-    for user in active_users:
-        # 이미 읽지 않은 능동 메시지가 대기 중이라면 새로 생성하지 않습니다. (선택적 최적화)
-        from api.models import PendingProactiveMessage
-        if PendingProactiveMessage.objects.filter(user=user).exists():
-            print(f"--- [Scheduler] {user.username}님에게 이미 대기 중인 메시지가 있습니다. 스킵합니다. ---")
-            continue
-            
-        proactive_message_obj = proactive_service.generate_proactive_message(user)
-        
-        if proactive_message_obj:
-            print(f"--- [Scheduler] {user.username}님에게 능동 메시지 '{proactive_message_obj.message[:20]}...' 생성 완료 ---")
-        else:
-            # 트리거 조건에 맞지 않아 메시지 생성이 안 된 경우
-            print(f"--- [Scheduler] {user.username}님에게 보낼 능동 메시지 트리거에 해당하지 않아 메시지를 생성하지 않았습니다. ---")
-            
-    print("--- [Scheduler] 능동 메시지 확인 태스크 종료 ---")
+    타이머 휠(Redis sorted set)에서 알림 시각이 된 일정만 꺼내 발송 태스크로 넘깁니다.
+    매 분 모든 사용자의 일정을 훑지 않고, 만기된 항목 수만큼만 일합니다.
+    """
+    for schedule_id in schedule_reminder_service.pop_due_reminders():
+        send_schedule_reminder.delay(schedule_id)
+
+
+@shared_task(ignore_result=True)
+def send_schedule_reminder(schedule_id):
+    """일정 10분 전 알림 능동 메시지를 생성합니다."""
+    from api.models import UserSchedule
+    from services import proactive_service
+
+    try:
+        schedule = UserSchedule.objects.select_related('user', 'user__profile').get(id=schedule_id)
+    except UserSchedule.DoesNotExist:
+        return
+
+    # 휠에 등록된 뒤 일정이 수정되었을 수 있으므로 최신 상태로 다시 확인
+    if not schedule_reminder_service.is_reminder_due(schedule):
+        return
+
+    proactive_service.generate_proactive_message(schedule.user, "upcoming_schedule", schedule.content)
+
+
+@shared_task(ignore_result=True)
+def update_conversation_summary(user_id):
+    """
+    사용자의 롤링 대화 요약을 갱신합니다. (채팅 N턴마다 summary_service가 요청)
+    """
+    from services import summary_service
+
+    try:
+        user = User.objects.select_related('profile').get(id=user_id)
+        summary_service.update_conversation_summary(user)
+    except User.DoesNotExist:
+        return
+    finally:
+        summary_service.clear_pending_flag(user_id)
+
+
+@shared_task(ignore_result=True)
+def generate_chat_image_derivatives(message_id):
+    """채팅 이미지의 썸네일/중간 크기 WebP 파생본을 생성합니다. (ChatMessage 생성 시 요청됨)"""
+    count = image_derivative_service.generate_derivatives(message_id)
+    logger.debug("메시지 %s의 이미지 파생본 %d개 생성", message_id, count)
@@ -2,11 +2,13 @@
 from rest_framework import generics, permissions
 from ..models import UserActivity, ActivityAnalytics , QuizResult
 from ..serializers import ActivitySerializer, ActivityAnalyticsSerializer, QuizResultSerializer
+from .conditional import MemoryVersionConditionalMixin
 
-class ActivityListCreateView(generics.ListCreateAPIView):
-    """GET: 활동 목록 조회, POST: 새 활동 기록 생성 (인증 필요)"""
+class ActivityListCreateView(MemoryVersionConditionalMixin, generics.ListCreateAPIView):
+    """GET: 활동 목록 조회, POST: 새 활동 기록 생성 (인증 필요, 변경이 없으면 304)"""
     permission_classes = (permissions.IsAuthenticated,)
     serializer_class = ActivitySerializer
+    memory_scope = 'activity'
 
     def get_queryset(self):
         # 현재 로그인된 사용자의 활동만 반환하도록 필터링
@@ -0,0 +1,34 @@
+# api/views/conditional.py
+
+from django.utils.cache import get_conditional_response
+
+from services import memory_version_service
+
+
+class MemoryVersionConditionalMixin:
+    """
+    사용자별 메모리 버전으로 ETag를 붙이고, 바뀐 것이 없으면 304 Not Modified로 응답하는 GET 믹스인.
+    Last-Modified는 초 단위라 같은 초 안의 두 번째 변경을 구분하지 못하므로(If-Modified-Since만 보내는 클라이언트에 잘못된 304)
+    보내지 않고, 나노초 버전이 들어간 ETag로만 재검증합니다.
+    버전 확인은 Redis 조회 1회뿐이므로 304 경로에서는 관련 행을 조회하거나 직렬화하지 않습니다.
+    memory_scope에는 memory_version_service.SCOPES_BY_MODEL의 scope 이름을 지정합니다.
+    """
+    memory_scope = None
+    memory_version = None # 이번 요청에서 확인한 버전 (뷰가 다시 조회하지 않고 사용할 수 있음)
+
+    def get(self, request, *args, **kwargs):
+        version = self.memory_version = memory_version_service.get_version(request.user.id, self.memory_scope)
+        if version is None:
+            return super().get(request, *args, **kwargs)
+
+        etag = f'W/"{self.memory_scope}-{request.user.id}-{version}"'
+
+        not_modified = get_conditional_response(request, etag=etag)
+        if not_modified is None:
+            response = super().get(request, *args, **kwargs)
+        else:
+            response = not_modified
+        response['ETag'] = etag
+        # 사용자별 응답이므로 공유 캐시에는 저장하지 않고, 클라이언트는 매번 재검증
+        response['Cache-Control'] = 'private, no-cache'
+        return response
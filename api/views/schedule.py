@@ -3,12 +3,14 @@
 from rest_framework import generics, permissions
 from ..models import UserSchedule # Schedule 모델이 있다고 가정
 from ..serializers import ScheduleSerializer
+from .conditional import MemoryVersionConditionalMixin
 
-class ScheduleListCreateView(generics.ListCreateAPIView):
-    """GET: 일정 목록 조회, POST: 새 일정 생성 (인증 필요)"""
+class ScheduleListCreateView(MemoryVersionConditionalMixin, generics.ListCreateAPIView):
+    """GET: 일정 목록 조회, POST: 새 일정 생성 (인증 필요, 변경이 없으면 304)"""
     # 🔑 JWT 인증 필요
     permission_classes = (permissions.IsAuthenticated,)
     serializer_class = ScheduleSerializer
+    memory_scope = 'schedule'
 
     def get_queryset(self):
         # 현재 로그인된 사용자의 일정만 반환
@@ -1,20 +1,24 @@
 # api/views/user.py
 
 from rest_framework import generics, permissions
+from rest_framework.response import Response
 from ..models import UserProfile, UserAttribute, UserRelationship
 from ..serializers import UserStatusSerializer, UserProfileSerializer, UserRelationshipSerializer, UserAttributeSerializer
+from .conditional import MemoryVersionConditionalMixin
+from services import status_service
 from django.contrib.auth import get_user_model
 
 User = get_user_model()
 
-class UserStatusView(generics.RetrieveAPIView):
-    """GET: AI와의 호감도, 기억 등 상태 정보를 조회합니다. (인증 필요)"""
+class UserStatusView(MemoryVersionConditionalMixin, generics.RetrieveAPIView):
+    """GET: AI와의 호감도, 기억 등 상태 정보를 조회합니다. (인증 필요, 변경이 없으면 304)"""
     permission_classes = (permissions.IsAuthenticated,)
     serializer_class = UserStatusSerializer
+    memory_scope = 'status'
 
-    def get_object(self):
-        # 현재 인증된 사용자 객체를 반환합니다. Serializer가 이 객체(User)를 기반으로 모든 정보를 가져옵니다.
-        return self.request.user
+    def retrieve(self, request, *args, **kwargs):
+        # 같은 메모리 버전이면 미리 만들어 둔 상태 문서를 그대로 응답 (버전은 믹스인이 이미 조회한 값을 사용)
+        return Response(status_service.get_status_document(request.user.id, self.memory_version))
     
 
 class UserProfileView(generics.RetrieveUpdateAPIView):
@@ -29,10 +33,11 @@ class UserProfileView(generics.RetrieveUpdateAPIView):
         return self.request.user.profile
     
 
-class RelationshipListCreateView(generics.ListCreateAPIView):
-    """GET: 관계 목록 조회, POST: 새 관계 정보 생성 (인증 필요)"""
+class RelationshipListCreateView(MemoryVersionConditionalMixin, generics.ListCreateAPIView):
+    """GET: 관계 목록 조회, POST: 새 관계 정보 생성 (인증 필요, 변경이 없으면 304)"""
     permission_classes = (permissions.IsAuthenticated,)
     serializer_class = UserRelationshipSerializer
+    memory_scope = 'relationship'
 
     def get_queryset(self):
         return UserRelationship.objects.filter(user=self.request.user).order_by('name')
@@ -50,10 +55,11 @@ class RelationshipRetrieveUpdateDestroyView(generics.RetrieveUpdateDestroyAPIVie
         return UserRelationship.objects.filter(user=self.request.user)
     
 
-class UserAttributeListCreateView(generics.ListCreateAPIView):
-    """GET: 속성 목록 조회, POST: 새 속성 생성 (인증 필요)"""
+class UserAttributeListCreateView(MemoryVersionConditionalMixin, generics.ListCreateAPIView):
+    """GET: 속성 목록 조회, POST: 새 속성 생성 (인증 필요, 변경이 없으면 304)"""
     permission_classes = (permissions.IsAuthenticated,)
     serializer_class = UserAttributeSerializer
+    memory_scope = 'attribute'
 
     def get_queryset(self):
         return UserAttribute.objects.filter(user=self.request.user).order_by('fact_type')
@@ -12,14 +12,40 @@ load_dotenv()
 import dj_database_url
 
 REDIS_URL = os.environ.get("REDIS_URL")
+# 부하 테스트/벤치마크 관리 명령이 쓰는 격리된 Redis (없으면 REDIS_URL 서버의 BENCHMARK_REDIS_DB번 DB). 시작/종료 시 비워짐
+BENCHMARK_REDIS_URL = os.environ.get("BENCHMARK_REDIS_URL")
+BENCHMARK_REDIS_DB = int(os.environ.get("BENCHMARK_REDIS_DB", 15))
 
 OPENAI_API_KEY = os.environ.get("OPENAI_API_KEY", None)
 
+# 외부 API 주소 (부하 테스트 등에서 로컬 가짜 서버로 바꿔 끼울 수 있도록 설정으로 분리)
+# OPENAI_BASE_URL은 OpenAI SDK 클라이언트도 같은 이름의 환경 변수를 읽음
+OPENAI_API_BASE_URL = os.environ.get("OPENAI_BASE_URL", "https://api.openai.com/v1")
+KAKAO_API_BASE_URL = os.environ.get("KAKAO_API_BASE_URL", "https://dapi.kakao.com")
+
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
 
 FINETUNED_MODEL_ID = None
+
+# 프롬프트 토큰 예산: 기억 컨텍스트 / 대화 히스토리 (로컬 토크나이저로 계산)
+CONTEXT_TOKEN_BUDGET = int(os.environ.get("CONTEXT_TOKEN_BUDGET", 1500))
+HISTORY_TOKEN_BUDGET = int(os.environ.get("HISTORY_TOKEN_BUDGET", 1200))
+# tiktoken 호환 BPE tokenizer.json 경로 (없으면 문자 수 기반 추정치 사용)
+CONTEXT_TOKENIZER_FILE = os.environ.get("CONTEXT_TOKENIZER_FILE")
+
+# 롤링 대화 요약: N개의 메시지마다 비동기로 갱신, 프롬프트에는 요약 + 최근 원문 꼬리만 포함
+SUMMARY_MODEL = os.environ.get("SUMMARY_MODEL", "gpt-4o-mini")
+SUMMARY_UPDATE_EVERY_N_MESSAGES = int(os.environ.get("SUMMARY_UPDATE_EVERY_N_MESSAGES", 10))
+SUMMARY_RAW_TAIL_TURNS = int(os.environ.get("SUMMARY_RAW_TAIL_TURNS", 4))
+# 요약 갱신 요청 중복 방지 플래그의 최대 유지 시간(초). 태스크가 비정상 종료해도 이 시간 후 다시 요청 가능
+SUMMARY_PENDING_TTL = int(os.environ.get("SUMMARY_PENDING_TTL", 5 * 60))
+
+# 사용자별 최근 대화 링 버퍼 (Redis): 보관 메시지 수 / 비활성 사용자 키 만료 시간(초)
+HISTORY_RING_SIZE = int(os.environ.get("HISTORY_RING_SIZE", 20))
+HISTORY_RING_TTL = int(os.environ.get("HISTORY_RING_TTL", 60 * 60 * 24))
+
 # Quick-start development settings - unsuitable for production
 # See https://docs.djangoproject.com/en/5.2/howto/deployment/checklist/
 
@@ -85,7 +111,17 @@ REST_FRAMEWORK = {
     ],
     'DEFAULT_PERMISSION_CLASSES': (
         'rest_framework.permissions.AllowAny',
-    )
+    ),
+    # JSON 직렬화/파싱은 orjson으로 처리 (한국어 이스케이프 없음)
+    'DEFAULT_RENDERER_CLASSES': [
+        'api.renderers.ORJSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ],
+    'DEFAULT_PARSER_CLASSES': [
+        'api.renderers.ORJSONParser',
+        'rest_framework.parsers.FormParser',
+        'rest_framework.parsers.MultiPartParser',
+    ],
 }
 
 ASGI_APPLICATION = 'app_server.asgi.application'
@@ -156,6 +192,35 @@ SIMPLE_JWT = {
     "AUTH_HEADER_TYPES": ("Bearer",),
 }
 
+# 로깅: 요청 경로는 큐에 넣기만 하고 별도 스레드가 JSON 한 줄로 stdout에 씀
+# LOG_LEVEL이 DEBUG일 때 DEBUG 레코드와 스트리밍 토큰 같은 고빈도 레코드는 LOG_SAMPLE_RATE 비율만 남김
+LOG_LEVEL = os.environ.get("LOG_LEVEL", "INFO")
+LOG_SAMPLE_RATE = float(os.environ.get("LOG_SAMPLE_RATE", 0.01))
+
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'handlers': {
+        'queued': {
+            '()': 'services.logging_service.QueuedStreamHandler',
+            'sample_rate': LOG_SAMPLE_RATE,
+        },
+    },
+    'root': {
+        'handlers': ['queued'],
+        'level': 'WARNING',
+    },
+    'loggers': {
+        'api': {'handlers': ['queued'], 'level': LOG_LEVEL, 'propagate': False},
+        'services': {'handlers': ['queued'], 'level': LOG_LEVEL, 'propagate': False},
+    },
+}
+
+# OpenTelemetry 트레이싱: 'none'(기본값, no-op) | 'console' | 'otlp'
+OTEL_TRACES_EXPORTER = os.environ.get("OTEL_TRACES_EXPORTER", "none")
+OTEL_EXPORTER_OTLP_ENDPOINT = os.environ.get("OTEL_EXPORTER_OTLP_ENDPOINT")
+OTEL_SERVICE_NAME = os.environ.get("OTEL_SERVICE_NAME", "chat_app_server")
+
 CELERY_IMPORTS = (
     'api.tasks', # 'api' 앱의 tasks.py 파일을 명시적으로 가져옵니다.
 )
@@ -166,12 +231,67 @@ CELERY_TASK_TIME_LIMIT = 30 * 60  # 30 minutes
 CELERY_BROKER_URL = REDIS_URL
 CELERY_RESULT_BACKEND = REDIS_URL
 
+# 능동 메시지 스케줄러: 샤드당 사용자 수 / 샤드 내 동시 처리 수 / 실행 락 만료(초)
+PROACTIVE_SHARD_SIZE = int(os.environ.get("PROACTIVE_SHARD_SIZE", 50))
+PROACTIVE_SHARD_CONCURRENCY = int(os.environ.get("PROACTIVE_SHARD_CONCURRENCY", 8))
+PROACTIVE_RUN_LOCK_TTL = int(os.environ.get("PROACTIVE_RUN_LOCK_TTL", 5 * 60))
+
+# 능동 메시지 LLM 생성: 프로세스당 동시 요청 수 / 모든 워커가 공유하는 분당 요청·토큰 한도 / 응답 최대 토큰
+PROACTIVE_LLM_CONCURRENCY = int(os.environ.get("PROACTIVE_LLM_CONCURRENCY", 16))
+PROACTIVE_LLM_REQUESTS_PER_MINUTE = int(os.environ.get("PROACTIVE_LLM_REQUESTS_PER_MINUTE", 500))
+PROACTIVE_LLM_TOKENS_PER_MINUTE = int(os.environ.get("PROACTIVE_LLM_TOKENS_PER_MINUTE", 200000))
+PROACTIVE_LLM_MAX_TOKENS = int(os.environ.get("PROACTIVE_LLM_MAX_TOKENS", 400))
+
+# 접속 상태(presence): 소켓 하트비트 주기 / 하트비트가 끊긴 뒤 오프라인으로 간주하기까지의 시간(초)
+PRESENCE_HEARTBEAT_INTERVAL = int(os.environ.get("PRESENCE_HEARTBEAT_INTERVAL", 30))
+PRESENCE_TTL = int(os.environ.get("PRESENCE_TTL", 90))
+
+# 웹소켓 인증 캐시: 토큰(jti)별 사용자/프로필 스냅샷을 보관하는 시간(초)과 최대 개수
+# 변경 시그널은 같은 프로세스에만 전달되므로, 다른 워커에서는 이 시간만큼 이전 스냅샷이 쓰일 수 있음
+AUTH_USER_CACHE_TTL = int(os.environ.get("AUTH_USER_CACHE_TTL", 60))
+AUTH_USER_CACHE_MAXSIZE = int(os.environ.get("AUTH_USER_CACHE_MAXSIZE", 10000))
+
+# 이미지 업로드 파이프라인: LLM에 보내기 전 축소할 긴 변 길이(px) / JPEG 품질 / 열 수 있는 원본 최대 픽셀 수
+IMAGE_MAX_DIMENSION = int(os.environ.get("IMAGE_MAX_DIMENSION", 1024))
+IMAGE_JPEG_QUALITY = int(os.environ.get("IMAGE_JPEG_QUALITY", 85))
+IMAGE_MAX_SOURCE_PIXELS = int(os.environ.get("IMAGE_MAX_SOURCE_PIXELS", 60_000_000))
+# 축소/캡션 작업을 실행하는 프로세스당 스레드 수 / 이미지 캡션 캐시 보관 시간(초)
+IMAGE_PIPELINE_WORKERS = int(os.environ.get("IMAGE_PIPELINE_WORKERS", 4))
+IMAGE_CAPTION_CACHE_TTL = int(os.environ.get("IMAGE_CAPTION_CACHE_TTL", 60 * 60 * 24 * 7))
+# 컨텍스트 수집 후 이미지 분석 결과를 기다리는 최대 시간(초). 넘기면 이미지 설명 없이 답변
+IMAGE_ANALYSIS_TIMEOUT = float(os.environ.get("IMAGE_ANALYSIS_TIMEOUT", 20))
+# 캡션 캐시에서 같은 이미지로 볼 최대 dHash 해밍 거리 (밴드 색인이 빠짐없이 찾는 범위는 3 이하)
+IMAGE_CAPTION_HASH_DISTANCE = int(os.environ.get("IMAGE_CAPTION_HASH_DISTANCE", 3))
+# 캡션 캐시 밴드 색인 집합 하나에 남길 최대 해시 수 (근사 일치 조회 비용 상한)
+IMAGE_CAPTION_BAND_MAX_SIZE = int(os.environ.get("IMAGE_CAPTION_BAND_MAX_SIZE", 64))
+# 채팅 이미지 파생본(WebP): 이름별 긴 변 길이(px) / WebP 품질. 채팅 기록 목록은 원본 대신 이 파생본을 사용
+IMAGE_DERIVATIVE_SIZES = {
+    "thumb": int(os.environ.get("IMAGE_THUMB_DIMENSION", 320)),
+    "medium": int(os.environ.get("IMAGE_MEDIUM_DIMENSION", 960)),
+}
+IMAGE_DERIVATIVE_WEBP_QUALITY = int(os.environ.get("IMAGE_DERIVATIVE_WEBP_QUALITY", 80))
+
+# 파인튜닝 데이터셋 샤드 디렉터리 / 버퍼 flush 기준(레코드 수, 초) / 샤드 회전 기준(바이트, 초)
+FINETUNING_DATASET_DIR = os.environ.get("FINETUNING_DATASET_DIR", str(BASE_DIR / "finetuning_data"))
+FINETUNING_BATCH_SIZE = int(os.environ.get("FINETUNING_BATCH_SIZE", 100))
+FINETUNING_FLUSH_INTERVAL = float(os.environ.get("FINETUNING_FLUSH_INTERVAL", 5))
+FINETUNING_SHARD_MAX_BYTES = int(os.environ.get("FINETUNING_SHARD_MAX_BYTES", 64 * 1024 * 1024))
+FINETUNING_SHARD_MAX_AGE = int(os.environ.get("FINETUNING_SHARD_MAX_AGE", 60 * 60))
+# 파인튜닝 데이터 익명화용 사용자별 컴파일 정규식 캐시 (관계/속성이 바뀌면 메모리 버전으로 다른 워커에서도 다시 만듦)
+ANONYMIZER_CACHE_TTL = int(os.environ.get("ANONYMIZER_CACHE_TTL", 60 * 10))
+ANONYMIZER_CACHE_MAXSIZE = int(os.environ.get("ANONYMIZER_CACHE_MAXSIZE", 1000))
+
 CELERY_BEAT_SCHEDULE = {
     'proactive-message-check-every-1-minutes': {
         'task': 'api.tasks.check_and_send_proactive_messages', 
         'schedule': crontab(minute='*/1'), # 테스트를 위해 1분 설정 (배포 시 10분 권장)
         'args': (), 
     },
+    'schedule-reminder-dispatch-every-1-minutes': {
+        'task': 'api.tasks.dispatch_due_schedule_reminders',
+        'schedule': crontab(minute='*/1'), # 만기된 알림만 꺼내므로 매 분 실행해도 부담 없음
+        'args': (),
+    },
 }
 
 LANGUAGE_CODE = 'ko-kr'
@@ -0,0 +1,111 @@
+#anonymizer_service.py
+import re
+import threading
+
+from cachetools import TTLCache
+from django.conf import settings
+from django.contrib.auth import get_user_model
+
+from api.models import UserAttribute, UserRelationship
+from . import memory_version_service
+
+User = get_user_model()
+
+USER_PLACEHOLDER = "사용자"
+
+# 이름 앞에 붙어 있으면 다른 단어로 보는 글자
+_WORD_CHARS = "0-9A-Za-z가-힣_"
+
+
+class Anonymizer:
+    """
+    한 사용자의 이름(아이디/선호 이름)과 인간관계 이름을 한 번에 치환하는 컴파일된 정규식.
+    - 모든 이름을 긴 것부터 하나의 대체 패턴으로 묶으므로 텍스트를 한 번만 훑습니다.
+    - 앞이 다른 글자와 붙어 있으면(예: 'admin'의 'min') 치환하지 않습니다.
+      뒤에는 어떤 어미/조사가 와도 치환합니다. 조사 목록으로 거르면 '민지였어', '민지잖아'처럼 목록 밖 표현이
+      파인튜닝 데이터에 이름 그대로 남으므로, 덜 치환하는 것보다 더 치환하는 쪽을 택합니다. ('민지원' → '사용자원')
+    - 사용자 이름은 '사용자'('님'이 붙으면 '사용자님'), 관계 이름은 '[관계 유형]'으로 바꿉니다.
+    생성 인자는 순수 데이터이므로 다른 프로세스(일괄 익명화 워커)에 그대로 넘겨 다시 만들 수 있습니다.
+
+    >>> anonymizer = Anonymizer(['민지'], [('철수', '친구')])
+    >>> anonymizer.anonymize("민지라는 친구")
+    '사용자라는 친구'
+    >>> [anonymizer.anonymize(text) for text in ["민지였어", "민지인데", "민지다", "민지잖아", "민지거든"]]
+    ['사용자였어', '사용자인데', '사용자다', '사용자잖아', '사용자거든']
+    >>> anonymizer.anonymize("민지님, 철수한테 전해줘")
+    '사용자님, [친구]한테 전해줘'
+    """
+
+    def __init__(self, user_names, relationships):
+        self.user_names = tuple(name.strip() for name in user_names if name and name.strip())
+        self.relationships = tuple((name.strip(), relationship_type) for name, relationship_type in relationships if name and name.strip())
+
+        replacements = {}
+        for name, relationship_type in self.relationships:
+            replacements.setdefault(name, f"[{relationship_type}]")
+        for name in self.user_names:
+            replacements[name] = USER_PLACEHOLDER # 관계 이름과 겹치면 사용자 이름이 우선
+        self._replacements = replacements
+
+        if replacements:
+            names = "|".join(re.escape(name) for name in sorted(replacements, key=len, reverse=True))
+            self._pattern = re.compile(rf"(?<![{_WORD_CHARS}])(?P<name>{names})(?P<honorific>님)?")
+        else:
+            self._pattern = None
+
+    def _substitute(self, match):
+        placeholder = self._replacements[match.group('name')]
+        return placeholder + (match.group('honorific') or '')
+
+    def anonymize(self, text):
+        if not text or self._pattern is None:
+            return text
+        return self._pattern.sub(self._substitute, text)
+
+
+def load_anonymizer_args(user_ids):
+    """
+    user_id -> (사용자 이름 목록, (관계 이름, 관계 유형) 목록). 사용자 수와 상관없이 쿼리 3번으로 가져옵니다.
+    선호 이름은 사용자별로 가장 마지막에 저장된 '이름' 속성을 사용합니다.
+    """
+    args = {user_id: ([username], []) for user_id, username in User.objects.filter(id__in=user_ids).values_list('id', 'username')}
+    preferred_names = (
+        UserAttribute.objects.filter(user_id__in=args, fact_type='이름')
+        .order_by('user_id', 'pk').values_list('user_id', 'content')
+    )
+    for user_id, content in dict(preferred_names).items(): # 사용자별 마지막 값만 남음
+        args[user_id][0].append(content)
+    relationships = (
+        UserRelationship.objects.filter(user_id__in=args)
+        .order_by('user_id', 'pk').values_list('user_id', 'name', 'relationship_type')
+    )
+    for user_id, name, relationship_type in relationships:
+        args[user_id][1].append((name, relationship_type))
+    return args
+
+
+# user_id -> (메모리 버전, username, Anonymizer)
+# 같은 프로세스의 변경은 시그널이 바로 지우고, 다른 프로세스의 변경은 메모리 버전('anonymizer' scope)이 달라져 다시 만듦
+_cache = TTLCache(maxsize=settings.ANONYMIZER_CACHE_MAXSIZE, ttl=settings.ANONYMIZER_CACHE_TTL)
+_lock = threading.Lock()
+
+
+def get_anonymizer(user):
+    """사용자의 Anonymizer를 캐시에서 가져오거나, 없거나 낡았으면 한 번 조회해 컴파일합니다."""
+    version = memory_version_service.get_version(user.id, 'anonymizer')
+    with _lock:
+        entry = _cache.get(user.id)
+    if entry is not None and entry[0] == version and entry[1] == user.username:
+        return entry[2]
+
+    user_names, relationships = load_anonymizer_args([user.id]).get(user.id, ([user.username], []))
+    anonymizer = Anonymizer(user_names, relationships)
+    with _lock:
+        _cache[user.id] = (version, user.username, anonymizer)
+    return anonymizer
+
+
+def invalidate_user(user_id):
+    """관계/속성이 바뀌면 시그널이 호출합니다."""
+    with _lock:
+        _cache.pop(user_id, None)
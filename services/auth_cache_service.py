@@ -0,0 +1,87 @@
+#auth_cache_service.py
+import copy
+import threading
+import time
+
+from cachetools import TTLCache
+from django.conf import settings
+from django.contrib.auth import get_user_model
+
+from api.models import UserProfile
+
+User = get_user_model()
+
+# jti -> (user_id, 만료 시각, DB alias, 사용자 필드 값, 프로필 필드 값 또는 None)
+# 모델 인스턴스가 아니라 필드 값만 저장하고, 조회할 때마다 새 인스턴스를 만들어 연결 간에 객체를 공유하지 않음
+_cache = TTLCache(maxsize=settings.AUTH_USER_CACHE_MAXSIZE, ttl=settings.AUTH_USER_CACHE_TTL)
+_lock = threading.Lock() # 미들웨어(이벤트 루프)와 시그널(동기 스레드)에서 함께 접근
+
+_USER_FIELDS = tuple(field.attname for field in User._meta.concrete_fields)
+_PROFILE_FIELDS = tuple(field.attname for field in UserProfile._meta.concrete_fields)
+
+
+def _token_jti(token):
+    return token.get(settings.SIMPLE_JWT.get('JTI_CLAIM', 'jti'))
+
+
+def get_cached_user(token):
+    """
+    검증이 끝난 AccessToken의 jti로 캐시된 사용자(프로필 포함)를 복원합니다. 없으면 None.
+    복원된 user.profile은 이미 채워져 있으므로 이후 접근에서도 쿼리가 발생하지 않습니다.
+    """
+    jti = _token_jti(token)
+    if not jti:
+        return None
+    with _lock:
+        entry = _cache.get(jti)
+    if entry is None:
+        return None
+
+    user_id, expires_at, db, user_values, profile_values = entry
+    if expires_at <= time.time() or str(user_id) != str(token.get('user_id')):
+        return None
+
+    user = User.from_db(db, _USER_FIELDS, user_values)
+    profile = None
+    if profile_values is not None:
+        # memory(JSONField)는 가변 객체이므로 복사본을 넘김
+        profile = UserProfile.from_db(db, _PROFILE_FIELDS, copy.deepcopy(profile_values))
+        UserProfile.user.field.set_cached_value(profile, user)
+    User.profile.related.set_cached_value(user, profile)
+    return user
+
+
+def cache_user(token, user):
+    """select_related('profile')로 가져온 사용자를 토큰 jti 기준으로 캐시합니다. 만료 시각은 토큰 만료를 넘지 않습니다."""
+    jti = _token_jti(token)
+    if not jti:
+        return
+    try:
+        profile = user.profile
+    except UserProfile.DoesNotExist:
+        profile = None
+
+    user_values = tuple(getattr(user, attname) for attname in _USER_FIELDS)
+    profile_values = None
+    if profile is not None:
+        profile_values = copy.deepcopy(tuple(getattr(profile, attname) for attname in _PROFILE_FIELDS))
+    expires_at = min(token['exp'], time.time() + settings.AUTH_USER_CACHE_TTL)
+
+    with _lock:
+        _cache[jti] = (user.id, expires_at, user._state.db, user_values, profile_values)
+
+
+def invalidate_user(user_id):
+    """
+    사용자/프로필이 바뀌거나 삭제(비활성화, 비밀번호 변경 포함)되면 해당 사용자의 모든 토큰 캐시를 지웁니다.
+    시그널은 현재 프로세스에만 전달되므로, 다른 워커의 캐시는 AUTH_USER_CACHE_TTL 안에 만료됩니다.
+    """
+    with _lock:
+        stale_keys = [jti for jti, entry in _cache.items() if entry[0] == user_id]
+        for jti in stale_keys:
+            _cache.pop(jti, None)
+
+
+def clear():
+    with _lock:
+        _cache.clear()
@@ -0,0 +1,183 @@
+#caption_cache_service.py
+import hashlib
+import logging
+import re
+
+import redis
+from django.conf import settings
+from PIL import Image
+
+from .redis_service import get_redis_client
+
+logger = logging.getLogger(__name__)
+
+# 캡션 프롬프트(ImageCaptioningService.analyze_image)를 바꾸면 올려서 이전 캡션을 재사용하지 않도록 함
+CAPTION_PROMPT_VERSION = 1
+
+# 64비트 dHash를 16비트 밴드 4개로 나눠 색인. 해밍 거리 3 이하인 두 해시는 적어도 한 밴드가 완전히 같음(비둘기집 원리)
+HASH_BANDS = 4
+BAND_BITS = 64 // HASH_BANDS
+
+STATS_KEY = "image_caption:stats"
+LOW_ENTROPY_BITS = 8 # 1인 비트가 이보다 적거나(64 - 이 값)보다 많은 dHash는 근사 일치에서 제외
+
+
+def dhash(image, hash_size=8):
+    """
+    Pillow만으로 계산하는 64비트 difference hash. 가로로 인접한 픽셀의 밝기 증감을 비트로 기록하므로
+    재압축, 크기 변경, 약간의 밝기/색 변화에는 거의 그대로이고 내용이 바뀌면 크게 달라집니다.
+    """
+    small = image.convert('L').resize((hash_size + 1, hash_size), Image.Resampling.LANCZOS)
+    pixels = small.tobytes()
+    value = 0
+    for row in range(hash_size):
+        offset = row * (hash_size + 1)
+        for col in range(hash_size):
+            value = (value << 1) | (pixels[offset + col] < pixels[offset + col + 1])
+    return value
+
+
+def _normalize_prompt(user_message):
+    return re.sub(r"\s+", " ", (user_message or "")).strip().lower()
+
+
+def _namespace(user_message):
+    prompt_hash = hashlib.sha1(_normalize_prompt(user_message).encode('utf-8')).hexdigest()[:16]
+    return f"image_caption:v{CAPTION_PROMPT_VERSION}:{prompt_hash}"
+
+
+def _bands(image_hash):
+    mask = (1 << BAND_BITS) - 1
+    return [(index, (image_hash >> (index * BAND_BITS)) & mask) for index in range(HASH_BANDS)]
+
+
+def _exact_key(namespace, content_hash):
+    # 업로드 바이트가 완전히 같을 때만 사용자 간에 공유 (같은 파일을 가진 사용자에게만 같은 캡션이 돌아감)
+    return f"{namespace}:sha:{content_hash}"
+
+
+def _user_namespace(namespace, user_id):
+    # 근사 일치(dHash)는 같은 사용자 안에서만. 레이아웃이 같은 스크린샷(채팅/은행 앱 등)이 다른 사용자의 캡션과 겹치지 않도록
+    return f"{namespace}:u{user_id}"
+
+
+def _band_key(user_namespace, index, value):
+    return f"{user_namespace}:band:{index}:{value:04x}"
+
+
+def _caption_key(user_namespace, image_hash):
+    return f"{user_namespace}:{image_hash:016x}"
+
+
+def _is_low_entropy(image_hash):
+    """거의 단색인 이미지는 dHash 비트가 대부분 0(또는 1)이라 서로 쉽게 겹치므로 근사 일치에 쓰지 않습니다."""
+    ones = image_hash.bit_count()
+    return ones < LOW_ENTROPY_BITS or ones > 64 - LOW_ENTROPY_BITS
+
+
+def _record(client, outcome):
+    try:
+        client.hincrby(STATS_KEY, outcome, 1)
+    except redis.RedisError:
+        pass # 통계 실패는 무시
+
+
+def _find_near(client, user_namespace, image_hash):
+    """같은 사용자의 밴드 색인에서 해밍 거리 IMAGE_CAPTION_HASH_DISTANCE 이하인 가장 가까운 해시와 캡션을 찾습니다."""
+    candidates = client.sunion([_band_key(user_namespace, index, value) for index, value in _bands(image_hash)])
+    best = None
+    for raw in candidates:
+        candidate = int(raw, 16)
+        distance = (candidate ^ image_hash).bit_count()
+        if distance <= settings.IMAGE_CAPTION_HASH_DISTANCE and (best is None or distance < best[1]):
+            best = (candidate, distance)
+    if best is None:
+        return None
+    return client.get(_caption_key(user_namespace, best[0]))
+
+
+def get_caption(user_id, content_hash, image_hash, user_message):
+    """
+    같은 프롬프트(정규화된 사용자 메시지)로 만든 캡션을 찾습니다. 없으면 None.
+    1) 업로드 바이트의 SHA-256이 같은 캡션 (사용자 무관)
+    2) 같은 사용자의 캡션 중 dHash가 가장 가까운(해밍 거리 IMAGE_CAPTION_HASH_DISTANCE 이하) 것
+    결과는 exact_hits / near_hits / misses 카운터에 기록됩니다.
+    """
+    client = get_redis_client()
+    if client is None:
+        return None
+    namespace = _namespace(user_message)
+    try:
+        caption = client.get(_exact_key(namespace, content_hash))
+        outcome = 'exact_hits'
+        if caption is None and not _is_low_entropy(image_hash):
+            caption = _find_near(client, _user_namespace(namespace, user_id), image_hash)
+            outcome = 'near_hits'
+    except redis.RedisError as e:
+        logger.warning("이미지 캡션 캐시 조회 실패: %s", e)
+        return None
+
+    if caption is None:
+        _record(client, 'misses')
+        return None
+    _record(client, outcome)
+    return caption.decode('utf-8')
+
+
+def set_caption(user_id, content_hash, image_hash, user_message, caption):
+    """
+    캡션을 내용 해시 키와 사용자별 dHash 키에 저장하고, 사용자별 밴드 색인에 등록합니다.
+    밴드 집합은 IMAGE_CAPTION_BAND_MAX_SIZE개를 넘으면 임의로 덜어내어 조회(SUNION) 비용이 일정하게 유지됩니다.
+    모든 키는 IMAGE_CAPTION_CACHE_TTL 후 만료됩니다.
+    """
+    client = get_redis_client()
+    if client is None:
+        return
+    namespace = _namespace(user_message)
+    user_namespace = _user_namespace(namespace, user_id)
+    ttl = settings.IMAGE_CAPTION_CACHE_TTL
+    max_size = settings.IMAGE_CAPTION_BAND_MAX_SIZE
+    try:
+        with client.pipeline() as pipe:
+            pipe.set(_exact_key(namespace, content_hash), caption, ex=ttl)
+            band_keys = []
+            if not _is_low_entropy(image_hash):
+                pipe.set(_caption_key(user_namespace, image_hash), caption, ex=ttl)
+                for index, value in _bands(image_hash):
+                    band_key = _band_key(user_namespace, index, value)
+                    band_keys.append(band_key)
+                    pipe.sadd(band_key, f"{image_hash:016x}")
+                    pipe.expire(band_key, ttl)
+                    pipe.scard(band_key)
+            results = pipe.execute()
+
+        sizes = results[4::3] # 앞의 set 2개 다음부터 (sadd, expire, scard) 반복
+        overflowing = [(key, size - max_size) for key, size in zip(band_keys, sizes) if size > max_size]
+        if overflowing:
+            with client.pipeline() as pipe:
+                for band_key, excess in overflowing:
+                    pipe.spop(band_key, excess)
+                pipe.execute()
+    except redis.RedisError as e:
+        logger.warning("이미지 캡션 캐시 저장 실패: %s", e)
+
+
+def get_stats():
+    """누적 캐시 적중 통계와 적중률을 반환합니다."""
+    client = get_redis_client()
+    counts = {'exact_hits': 0, 'near_hits': 0, 'misses': 0}
+    if client is not None:
+        try:
+            for field, value in client.hgetall(STATS_KEY).items():
+                counts[field.decode()] = int(value)
+        except redis.RedisError as e:
+            logger.warning("이미지 캡션 캐시 통계 조회 실패: %s", e)
+    total = sum(counts.values())
+    hits = counts['exact_hits'] + counts['near_hits']
+    return {**counts, 'lookups': total, 'hit_rate': round(hits / total, 4) if total else None}
+
+
+def reset_stats():
+    client = get_redis_client()
+    if client is not None:
+        client.delete(STATS_KEY)
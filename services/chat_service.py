@@ -1,7 +1,7 @@
 #chat_service.py
 import json
+import logging
 import os
-import base64
 from django.utils import timezone
 from typing import Optional, Dict, Any, Tuple
 from openai import OpenAI, APIError, AsyncOpenAI
@@ -10,13 +10,23 @@ from django.core.files.uploadedfile import UploadedFile
 from api.models import ChatMessage, UserAttribute, UserActivity, ActivityAnalytics, UserRelationship
 from .context_service import get_activity_recommendation, search_activities_for_context
 from .memory_service import extract_and_save_user_context_data
-from .image_captioning_service import ImageCaptioningService
-from . import vector_service, location_service, schedule_service, emotion_service, prompt_service, emoticon_service
+from . import image_pipeline_service
+from . import vector_service, location_service, schedule_service, emotion_service, prompt_service, emoticon_service, telemetry_service
+from .token_budget_service import select_history_within_budget
+from .summary_service import get_history_window, get_raw_tail_turns, schedule_summary_update_if_needed
+from .history_service import HistorySnapshot, get_history_snapshot
+from .context_models import ContextData, AttributeRecord, ActivityRecord, AnalyticsRecord, RelationshipRecord
 from datetime import date # date 추가
 
+logger = logging.getLogger(__name__)
+
 
 def process_chat_interaction(request, user_message_text: str, latitude: Optional[float] = None, longitude: Optional[float] = None, image_file: Optional[UploadedFile] = None):
     """사용자 메시지를 처리하고 AI 응답을 생성하는 전체 프로세스를 조율합니다."""
+    with telemetry_service.span("chat.turn", request.user, {"chat.transport": "http", "chat.has_image": bool(image_file)}):
+        return _process_chat_interaction(request, user_message_text, latitude, longitude, image_file)
+
+def _process_chat_interaction(request, user_message_text: str, latitude: Optional[float] = None, longitude: Optional[float] = None, image_file: Optional[UploadedFile] = None):
     user = request.user
     bot_message_text = "죄송합니다. API 응답을 가져오는 데 실패했습니다."
     explanation = ""
@@ -34,41 +44,42 @@ def process_chat_interaction(request, user_message_text: str, latitude: Optional
         user_message_for_llm = emoticon_service.parse_emoticon(user_message_text)
 
         # 1단계: 이미지 분석 (이미지가 있는 경우)
+        # 축소/재인코딩과 캡션 요청은 이미지 파이프라인 스레드에서 시작하고, 그동안 아래 컨텍스트 수집을 동시에 진행
         image_analysis_context = None
-        image_b64_data = None
+        image_analysis_future = None
         if image_file:
-            print("--- [디버그] 이미지 파일 감지됨. 1차 분석 시작 ---")
-            
-            # 추가된 디버깅 로그
-            print(f"--- [디버그] 파일명: {image_file.name}, Content-Type: {image_file.content_type} ---")
-
-            # ImageCaptioningService가 Base64를 사용하므로, 파일 내용을 인코딩하여 전달
-            image_b64_data = base64.b64encode(image_file.read()).decode('utf-8')
-            image_file.seek(0) # 파일을 다시 읽을 수 있도록 포인터를 처음으로 되돌림
-
-            analyzer = ImageCaptioningService()
-            # 업로드된 파일의 content_type을 함께 전달
-            analysis_result = analyzer.analyze_image(image_b64_data, user_message_text, image_file.content_type)
-            if analysis_result:
-                image_analysis_context = analysis_result
-                print("--- [디버그] 1차 분석 완료 --- ")
-            else:
-                print("--- [경고] 1차 분석 실패 --- ")
+            logger.debug("이미지 파일 감지됨. 1차 분석 시작 (Content-Type: %s)", image_file.content_type, extra={"user_id": user.id})
+            image_analysis_future = image_pipeline_service.submit_image_analysis(image_file, user_message_text, user.id)
 
         # 2단계: 컨텍스트 생성
-        history = ChatMessage.objects.filter(user=user).order_by('-timestamp')
+        with telemetry_service.span("chat.history", user):
+            history = get_history_snapshot(user.id, limit=get_history_window())
         time_contexts = _get_time_contexts(history)
         # 벡터 검색은 이미지가 없을 때만 수행하여 효율성 증대
-        assembled_contexts = _assemble_context_data(user, user_message_for_llm, latitude, longitude, bool(image_file))
+        with telemetry_service.span("chat.context", user):
+            assembled_contexts = _assemble_context_data(user, user_message_for_llm, latitude, longitude, bool(image_file))
+
+        if image_analysis_future is not None:
+            image_analysis_context = image_pipeline_service.wait_for_image_analysis(image_analysis_future)
+            if image_analysis_context:
+                logger.debug("이미지 1차 분석 완료", extra={"user_id": user.id})
+            else:
+                logger.warning("이미지 1차 분석 실패", extra={"user_id": user.id})
         
         # 3단계: 최종 프롬프트 생성 (이미지 분석 결과 포함)
-        final_system_prompt = prompt_service.build_final_system_prompt(user, time_contexts, assembled_contexts, image_analysis_context)
-        messages = _prepare_llm_messages(final_system_prompt, history, user_message_for_llm)
+        with telemetry_service.span("chat.prompt_build", user) as span:
+            final_system_prompt = prompt_service.build_final_system_prompt(user, time_contexts, assembled_contexts, image_analysis_context)
+            messages = _prepare_llm_messages(final_system_prompt, history, user_message_for_llm, get_raw_tail_turns(user, history))
+            telemetry_service.record_message_tokens(span, messages)
         
 
         # 4단계: 최종 LLM 호출 (파인튜닝된 모델)
         model_to_use = os.getenv("FINETUNED_MODEL_ID", "gpt-4.1")
-        response_json = _call_openai_api(client, model_to_use, messages)
+        with telemetry_service.span("chat.llm_call", user, {"llm.model": model_to_use}) as span:
+            response_json = _call_openai_api(client, model_to_use, messages)
+            usage = response_json.get('usage') or {}
+            span.set_attribute("llm.prompt_tokens", usage.get('prompt_tokens', 0))
+            span.set_attribute("llm.completion_tokens", usage.get('completion_tokens', 0))
         
         # 5단계: 응답 처리 및 저장
         bot_message_text, explanation, bot_message_obj, user_message_obj = _finalize_chat_interaction(
@@ -76,21 +87,19 @@ def process_chat_interaction(request, user_message_text: str, latitude: Optional
         )
 
     except APIError as e:
-        print(f"OpenAI API 요청 실패: {e}")
+        logger.error("OpenAI API 요청 실패: %s", e, extra={"user_id": user.id})
         bot_message_text = f"API 요청 중 오류가 발생했습니다: {e}"
     except (KeyError, IndexError, json.JSONDecodeError) as e:
-        print(f"API 응답 형식 오류: {e}")
+        logger.error("API 응답 형식 오류: %s", e, extra={"user_id": user.id})
         bot_message_text = "API 응답 형식이 예상과 다릅니다."
     except Exception as e:
-        import traceback
-        print(f"예상치 못한 오류: {e}")
-        traceback.print_exc()
+        logger.exception("예상치 못한 오류", extra={"user_id": user.id})
         bot_message_text = f"예상치 못한 오류가 발생했습니다: {e}"
 
     # user_message_obj를 반환하도록 수정
     return bot_message_text, explanation, bot_message_obj, user_message_obj
 
-def _get_time_contexts(history):
+def _get_time_contexts(history: HistorySnapshot):
     """현재 시간 및 마지막 대화와의 시간 간격에 대한 컨텍스트를 생성합니다."""
     now_utc = timezone.now()
     korea_tz = timezone.get_default_timezone()
@@ -102,8 +111,8 @@ def _get_time_contexts(history):
     current_time_context = f"[시간 정보]: 현재 대한민국 시간은 정확히 '{time_str}'이야. 시간과 관련된 모든 질문에 이 정보를 최우선으로 사용해서 답해야 해. 절대 다른 시간을 말해서는 안 돼"
     
     time_awareness_context = ""
-    if history.exists():
-        last_interaction = history.first()
+    last_interaction = history.latest
+    if last_interaction:
         time_difference = now_utc - last_interaction.timestamp
         if time_difference.total_seconds() > 3600:
             hours = int(time_difference.total_seconds() // 3600)
@@ -115,118 +124,96 @@ def _get_time_contexts(history):
 
     return current_time_context, time_awareness_context
 
-def _assemble_context_data(user, user_message_text, latitude=None, longitude=None, has_image=False):
-    """사용자의 기억과 관련된 모든 컨텍스트를 종합하여 반환합니다."""
-    contexts = {}
+def _assemble_context_data(user, user_message_text, latitude=None, longitude=None, has_image=False) -> ContextData:
+    """사용자의 기억과 관련된 모든 컨텍스트를 종합하여 반환합니다. (소스별로 스팬을 남겨 느린 소스를 찾을 수 있게 함)"""
+    contexts = ContextData()
     # 0. 오늘의 일정 컨텍스트
-    schedule_context = ""
-    try:
-        today_schedules = schedule_service.get_schedules_for_day(user, date.today())
-        if today_schedules:
-            schedule_contents = [s.content.strip() for s in today_schedules if s.content and s.content.strip()]
-            if schedule_contents:
-                schedule_context = f"[사용자의 오늘 일정 (참고용)]: {', '.join(schedule_contents)}"
-                contexts['schedule'] = schedule_context
-    except Exception as e:
-        print(f"--- Could not build schedule context due to an error: {e} ---")
+    with telemetry_service.span("context.schedule", user):
+        try:
+            today_schedules = schedule_service.get_schedules_for_day(user, date.today()).values_list('content', flat=True)
+            schedule_contents = [content.strip() for content in today_schedules if content and content.strip()]
+            contexts.add_section('schedule', "[사용자의 오늘 일정 (참고용)]", schedule_contents, separator=", ")
+        except Exception as e:
+            logger.warning("일정 컨텍스트 생성 오류: %s", e, extra={"user_id": user.id})
 
 
     # 1. 위치 컨텍스트 및 위치 기반 추천 컨텍스트
     if latitude is not None and longitude is not None:
-        location_context = location_service.get_location_context(latitude, longitude)
-        if location_context:
-            contexts['location'] = location_context
-       
-            
-        location_recommendation_result = location_service.get_location_based_recommendation(user, user_message_text, latitude, longitude)
-        if location_recommendation_result:
-            contexts['location_recommendation'] = location_recommendation_result
+        with telemetry_service.span("context.location", user):
+            location_context = location_service.get_location_context(latitude, longitude)
+            if location_context:
+                contexts['location'] = location_context
+           
+                
+            location_recommendation_result = location_service.get_location_based_recommendation(user, user_message_text, latitude, longitude)
+            if location_recommendation_result:
+                contexts['location_recommendation'] = location_recommendation_result
 
     # 2. 벡터 검색 컨텍스트 (이미지가 없을 때만 수행)
     if not has_image:
-        try:
-            COLLECTION_NAME = f"user_{user.id}_chat_history"
-            collection = vector_service.get_or_create_collection(COLLECTION_NAME)
-            similar_results = vector_service.query_similar_messages(COLLECTION_NAME, user_message_text, user.id, n_results=5)
-            
-            if similar_results and isinstance(similar_results, dict) and similar_results.get('documents'):
-                past_conversations = [f"{meta.get('speaker', '알수없음')}: {doc}" for doc, meta in zip(similar_results['documents'], similar_results['metadatas'])]
-                contexts['vector_search'] = "[과거 유사한 대화 내용(벡터DB)]: " + " | ".join(past_conversations)
-        except Exception as e:
-            print(f"--- 벡터 검색 컨텍스트 생성 오류: {e} ---")
+        with telemetry_service.span("context.vector_search", user):
+            try:
+                COLLECTION_NAME = f"user_{user.id}_chat_history"
+                collection = vector_service.get_or_create_collection(COLLECTION_NAME)
+                similar_results = vector_service.query_similar_messages(COLLECTION_NAME, user_message_text, user.id, n_results=5)
+                
+                if similar_results and isinstance(similar_results, dict) and similar_results.get('documents'):
+                    past_conversations = [f"{meta.get('speaker', '알수없음')}: {doc}" for doc, meta in zip(similar_results['documents'], similar_results['metadatas'])]
+                    contexts.add_section('vector_search', "[과거 유사한 대화 내용(벡터DB)]", past_conversations, separator=" | ")
+            except Exception as e:
+                logger.warning("벡터 검색 컨텍스트 생성 오류: %s", e, extra={"user_id": user.id})
 
     # 3. 사용자 속성 컨텍스트
-    user_attributes = UserAttribute.objects.filter(user=user)
-    if user_attributes.exists():
-        attribute_strings = [f"{attr.fact_type}: {attr.content}" for attr in user_attributes]
-        contexts['attributes'] = "[사용자 속성]: " + ", ".join(attribute_strings)
+    with telemetry_service.span("context.attributes", user):
+        attribute_rows = UserAttribute.objects.filter(user=user).order_by('-created_at').values_list(*AttributeRecord.FIELDS)
+        attributes = [AttributeRecord(*row) for row in attribute_rows]
+        contexts.add_section('attributes', "[사용자 속성]", [attr.render() for attr in attributes], separator=", ")
 
     # 4. 사용자 활동 컨텍스트
-    activity_strings = []
-    try:
-        recent_activities = UserActivity.objects.filter(user=user).order_by('-activity_date', '-created_at')[:5]
-        if recent_activities:
-            activity_strings.extend([
-                f"{act.activity_date.strftime('%Y-%m-%d') if act.activity_date else '날짜 미상'} '{act.place}' 방문" +
-                (f" (동행: {act.companion})" if act.companion else "") +
-                (f" (메모: {act.memo})" if act.memo else "")
-                for act in recent_activities
-            ])
-    except Exception as e:
-        print(f"--- 활동 메모리 컨텍스트 생성 오류: {e} ---")
+    with telemetry_service.span("context.activity", user):
+        activity_strings = []
+        try:
+            activity_rows = UserActivity.objects.filter(user=user).order_by('-activity_date', '-created_at').values_list(*ActivityRecord.FIELDS)[:5]
+            activity_strings.extend(ActivityRecord(*row).render() for row in activity_rows)
+        except Exception as e:
+            logger.warning("활동 메모리 컨텍스트 생성 오류: %s", e, extra={"user_id": user.id})
 
-    search_context = search_activities_for_context(user, user_message_text)
-    if search_context:
-        activity_strings.append(search_context)
-    
-    recommendation_context = get_activity_recommendation(user, user_message_text)
-    if recommendation_context:
-        activity_strings.append(recommendation_context)
+        search_context = search_activities_for_context(user, user_message_text)
+        if search_context:
+            activity_strings.append(search_context)
+        
+        recommendation_context = get_activity_recommendation(user, user_message_text)
+        if recommendation_context:
+            activity_strings.append(recommendation_context)
 
-    if activity_strings:
-        contexts['activity'] = "[사용자 활동]: " + "\n".join(activity_strings)
+        contexts.add_section('activity', "[사용자 활동]", activity_strings)
 
     # 5. 활동 분석 컨텍스트
-    try:
-        recent_analytics = ActivityAnalytics.objects.filter(user=user).order_by('-period_start_date')[:3]
-        if recent_analytics.exists():
-            analytics_strings = [
-                f"'{an.period_start_date.strftime('%Y-%m-%d')}부터 {an.period_type} 동안 "
-                f"장소: {an.place}, 동행: {an.companion or '없음'}, 횟수: {an.count}회'"
-                for an in recent_analytics
-            ]
-            contexts['analytics'] = "[사용자 활동 분석]: " + "\n".join(analytics_strings)
-    except Exception as e:
-        print(f"--- 활동 분석 컨텍스트 생성 오류: {e} ---")
+    with telemetry_service.span("context.analytics", user):
+        try:
+            analytics_rows = ActivityAnalytics.objects.filter(user=user).order_by('-period_start_date').values_list(*AnalyticsRecord.FIELDS)[:3]
+            contexts.add_section('analytics', "[사용자 활동 분석]", [AnalyticsRecord(*row).render() for row in analytics_rows])
+        except Exception as e:
+            logger.warning("활동 분석 컨텍스트 생성 오류: %s", e, extra={"user_id": user.id})
 
     # 6. 인간관계 컨텍스트
-    try:
-        user_relationships = UserRelationship.objects.filter(user=user)
-        if user_relationships.exists():
-            relationship_strings = []
-            for rel in user_relationships:
-                details = f"{rel.name} ({rel.relationship_type})"
-                if rel.position:
-                    details += f", 포지션: {rel.position}"
-                if rel.traits:
-                    details += f", 특징: {rel.traits}"
-                relationship_strings.append(details)
-            
-            relationship_strings = [f"{rel.name} ({rel.relationship_type}, 특징: {rel.traits})" for rel in user_relationships]
-            contexts['relationship'] = "[사용자의 인간관계]: " + "\n".join(relationship_strings)
-    except Exception as e:
-        print(f"--- 사용자 관계 컨텍스트 생성 오류: {e} ---")
+    with telemetry_service.span("context.relationship", user):
+        try:
+            relationship_rows = UserRelationship.objects.filter(user=user).order_by('-created_at').values_list(*RelationshipRecord.FIELDS)
+            contexts.add_section('relationship', "[사용자의 인간관계]", [RelationshipRecord(*row).render() for row in relationship_rows])
+        except Exception as e:
+            logger.warning("사용자 관계 컨텍스트 생성 오류: %s", e, extra={"user_id": user.id})
 
-    # 디버깅을 위해 모든 수집된 컨텍스트를 마지막에 한번에 출력
-    for key, value in contexts.items():
-        print(f"--- [디버그] {key} 컨텍스트: {value} ---")
+    # 컨텍스트 원문은 개인정보이므로 섹션 이름과 길이만 DEBUG로 남김 (비활성 레벨이면 계산하지 않음)
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug("수집된 컨텍스트: %s", {key: len(value) for key, value in contexts.items()}, extra={"user_id": user.id})
 
     return contexts
 
-def _prepare_llm_messages(final_system_prompt, history, user_message_text):
-    """API 요청을 위한 메시지 리스트를 준비합니다."""
+def _prepare_llm_messages(final_system_prompt, history: HistorySnapshot, user_message_text, max_turns=10):
+    """API 요청을 위한 메시지 리스트를 준비합니다. (대화 요약이 있으면 마지막 요약 이후의 원문 max_turns개만 포함)"""
     messages = [{'role': 'system', 'content': final_system_prompt}]
-    recent_history = history[:10]
+    recent_history = select_history_within_budget(history, max_turns=max_turns)
     for chat in reversed(recent_history):
         role = "user" if chat.is_user else "assistant"
         messages.append({'role': role, 'content': chat.message})
@@ -235,7 +222,7 @@ def _prepare_llm_messages(final_system_prompt, history, user_message_text):
 
 def _call_openai_api(client: OpenAI, model_to_use: str, messages: list, stream_mode: bool = False) -> Dict[str, Any]:
     """OpenAI API를 호출하고 응답 JSON을 반환합니다."""
-    print(f"--- Using Model: {model_to_use}, Stream: {stream_mode} ---")
+    logger.debug("Using Model: %s, Stream: %s", model_to_use, stream_mode)
 
     params ={
         "model":model_to_use,
@@ -259,7 +246,7 @@ def _call_openai_api(client: OpenAI, model_to_use: str, messages: list, stream_m
     else:
         return response.model_dump() # 일반 응답은 딕셔너리로 변환하여 반환
 
-def _finalize_chat_interaction(request, user_message_text, response_json, history, api_key, image_file: Optional[UploadedFile] = None):
+def _finalize_chat_interaction(request, user_message_text, response_json, history: HistorySnapshot, api_key, image_file: Optional[UploadedFile] = None):
     """성공적인 LLM 응답을 처리하고 관련 데이터를 RDB와 벡터 DB에 저장합니다."""
     user = request.user
     bot_message_text = "음... 생각을 정리하는 데 시간이 좀 걸리네. 다시 한번 말해줄래?"
@@ -331,23 +318,23 @@ def _finalize_chat_interaction(request, user_message_text, response_json, histor
     except Exception as e:
         explanation = f"예상치 못한 오류 발생: {e}"
 
-    COLLECTION_NAME = f"user_{user.id}_chat_history"
-    collection = vector_service.get_or_create_collection(COLLECTION_NAME)
+    with telemetry_service.span("chat.persist", user):
+        COLLECTION_NAME = f"user_{user.id}_chat_history"
+        collection = vector_service.get_or_create_collection(COLLECTION_NAME)
 
-    # ChatMessage 저장 시 image_file을 직접 사용
-    user_message_obj = ChatMessage.objects.create(user=user, message=user_message_text, image=image_file, is_user=True)
-    vector_service.upsert_message(COLLECTION_NAME, user_message_obj)
+        # ChatMessage 저장 시 image_file을 직접 사용
+        user_message_obj = ChatMessage.objects.create(user=user, message=user_message_text, image=image_file, is_user=True)
+        vector_service.upsert_message(COLLECTION_NAME, user_message_obj)
 
-    bot_message_obj = ChatMessage.objects.create(user=user, message=bot_message_text, is_user=False)
-    vector_service.upsert_message(COLLECTION_NAME, bot_message_obj)
+        bot_message_obj = ChatMessage.objects.create(user=user, message=bot_message_text, is_user=False)
+        vector_service.upsert_message(COLLECTION_NAME, bot_message_obj)
     
     recent_history_for_extraction = history[:5]
-    extract_and_save_user_context_data(user, user_message_text, bot_message_text, recent_history_for_extraction, api_key)
+    with telemetry_service.span("chat.memory_extraction", user):
+        extract_and_save_user_context_data(user, user_message_text, bot_message_text, recent_history_for_extraction, api_key)
+    schedule_summary_update_if_needed(user, history)
 
-    # 디버깅을 위해 최종 explanation 내용을 터미널에 출력
-    print("\n" + "-"*20 + " [Debug] Response Explanation " + "-"*20)
-    print(explanation)
-    print("-"*66 + "\n")
+    logger.debug("Response Explanation: %s", explanation, extra={"user_id": user.id})
 
     return bot_message_text, explanation, bot_message_obj, user_message_obj
 
@@ -365,7 +352,7 @@ async def async_stream_openai_api(model_to_use: str, messages: list):
     try:
         client = AsyncOpenAI() # 환경 변수에서 키 자동 로드
     except Exception as e:
-        print(f"AsyncOpenAI 클라이언트 초기화 오류: {e}")
+        logger.error("AsyncOpenAI 클라이언트 초기화 오류: %s", e)
         raise APIError(f"AsyncOpenAI 클라이언트 초기화 실패: {e}")
 
     # 스트리밍 요청 파라미터
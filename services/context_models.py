@@ -0,0 +1,126 @@
+#context_models.py
+from collections.abc import MutableMapping
+from dataclasses import dataclass
+from datetime import date
+from typing import List, Optional
+
+
+# ----------------------------------------------------
+# 컨텍스트 조립에 필요한 필드만 담는 경량 레코드
+# (모델 인스턴스 대신 .values_list()로 로드하여 ORM 객체 생성 비용을 줄임)
+# ----------------------------------------------------
+
+@dataclass(frozen=True, slots=True)
+class AttributeRecord:
+    fact_type: Optional[str]
+    content: Optional[str]
+
+    FIELDS = ('fact_type', 'content')
+
+    def render(self) -> str:
+        return f"{self.fact_type}: {self.content}"
+
+
+@dataclass(frozen=True, slots=True)
+class ActivityRecord:
+    activity_date: Optional[date]
+    place: Optional[str]
+    companion: Optional[str]
+    memo: Optional[str]
+
+    FIELDS = ('activity_date', 'place', 'companion', 'memo')
+
+    def render(self) -> str:
+        date_str = self.activity_date.strftime('%Y-%m-%d') if self.activity_date else '날짜 미상'
+        text = f"{date_str} '{self.place}' 방문"
+        if self.companion:
+            text += f" (동행: {self.companion})"
+        if self.memo:
+            text += f" (메모: {self.memo})"
+        return text
+
+    def render_as_memory(self) -> str:
+        """키워드 검색 결과('관련 기억') 형식으로 렌더링합니다."""
+        date_str = self.activity_date.strftime('%Y-%m-%d') if self.activity_date else '날짜 미상'
+        return f"'{date_str}'의 기억(장소: {self.place or 'N/A'}, 동행: {self.companion or 'N/A'}, 메모: {self.memo or 'N/A'})"
+
+
+@dataclass(frozen=True, slots=True)
+class AnalyticsRecord:
+    period_start_date: date
+    period_type: str
+    place: str
+    companion: Optional[str]
+    count: int
+
+    FIELDS = ('period_start_date', 'period_type', 'place', 'companion', 'count')
+
+    def render(self) -> str:
+        return (
+            f"'{self.period_start_date.strftime('%Y-%m-%d')}부터 {self.period_type} 동안 "
+            f"장소: {self.place}, 동행: {self.companion or '없음'}, 횟수: {self.count}회'"
+        )
+
+
+@dataclass(frozen=True, slots=True)
+class RelationshipRecord:
+    name: str
+    relationship_type: str
+    traits: Optional[str]
+
+    FIELDS = ('name', 'relationship_type', 'traits')
+
+    def render(self) -> str:
+        return f"{self.name} ({self.relationship_type}, 특징: {self.traits})"
+
+
+# ----------------------------------------------------
+# 조립된 컨텍스트 묶음
+# ----------------------------------------------------
+
+@dataclass(slots=True)
+class ContextSection:
+    """'[헤더]: 항목1, 항목2' 형태로 렌더링되는 컨텍스트 한 덩어리. 렌더링 결과는 1회만 계산합니다."""
+    header: str
+    lines: List[str]
+    separator: str = "\n"
+    _rendered: Optional[str] = None
+
+    def render(self) -> str:
+        if self._rendered is None:
+            self._rendered = f"{self.header}: {self.separator.join(self.lines)}"
+        return self._rendered
+
+
+class ContextData(MutableMapping):
+    """
+    _assemble_context_data가 반환하는 컨텍스트 묶음.
+    키 -> 렌더링된 문자열의 매핑처럼 동작하므로 기존 코드(items(), ['key'] = ...)와 호환되며,
+    채팅 경로와 능동 메시지 경로가 같은 렌더링 결과를 공유합니다.
+    """
+    __slots__ = ('_sections',)
+
+    def __init__(self):
+        self._sections = {}
+
+    def add_section(self, key: str, header: str, lines: List[str], separator: str = "\n"):
+        """항목 리스트로 섹션을 추가합니다. 항목이 없으면 추가하지 않습니다."""
+        if lines:
+            self._sections[key] = ContextSection(header, lines, separator)
+
+    def __getitem__(self, key) -> str:
+        value = self._sections[key]
+        return value.render() if isinstance(value, ContextSection) else value
+
+    def __setitem__(self, key, value: str):
+        # 위치 컨텍스트처럼 이미 완성된 문자열은 그대로 보관
+        self._sections[key] = value
+
+    def __delitem__(self, key):
+        del self._sections[key]
+
+    def __iter__(self):
+        return iter(self._sections)
+
+    def __len__(self):
+        return len(self._sections)
@@ -1,10 +1,15 @@
 #context_service.py
+import logging
+
 from django.utils import timezone
 from datetime import timedelta
 from django.db.models import Count, Q
 from konlpy.tag import Okt
 from django.db.models import Count
 from api.models import UserActivity
+from .context_models import ActivityRecord
+
+logger = logging.getLogger(__name__)
 
 def get_user_place_preferences(user, category_keyword):
     """
@@ -20,8 +25,8 @@ def get_user_place_preferences(user, category_keyword):
 
         # 순수 장소 이름의 리스트를 반환 (상위 5개)
         return [item['place'] for item in preferences[:5]]
-    except Exception as e:
-        print(f"--- Could not get user place preferences due to an error: {e} ---")
+    except Exception:
+        logger.exception("Could not get user place preferences", extra={"user_id": user.id})
         return []
 
 def get_activity_recommendation(user, user_message):
@@ -80,27 +85,17 @@ def search_activities_for_context(user, user_message):
             query |= Q(place__icontains=keyword)
             query |= Q(companion__icontains=keyword)
 
-        # 현재 사용자의 기억만 대상으로 검색, 최근 순으로 10개까지
-        search_results = UserActivity.objects.filter(user=user).filter(query).order_by('-activity_date')[:10]
-
-        if not search_results:
-            return ""
+        # 현재 사용자의 기억만 대상으로 검색, 최근 순으로 10개까지 (필요한 필드만 로드)
+        search_rows = UserActivity.objects.filter(user=user).filter(query).order_by('-activity_date').values_list(*ActivityRecord.FIELDS)[:10]
 
         # 4. 검색 결과를 컨텍스트 문자열로 포맷
-        result_strings = []
-        for mem in search_results:
-            base_string = ""
-            if mem.activity_date:
-                base_string = f"'{mem.activity_date.strftime('%Y-%m-%d')}'의 기억(장소: {mem.place or 'N/A'}, "
-            else:
-                base_string = f"'날짜 미상'의 기억(장소: {mem.place or 'N/A'}, "
-            
-            base_string += f"동행: {mem.companion or 'N/A'}, 메모: {mem.memo or 'N/A'})"
-            result_strings.append(base_string)
+        result_strings = [ActivityRecord(*row).render_as_memory() for row in search_rows]
+        if not result_strings:
+            return ""
         
         search_context = "[관련 기억 검색 결과: " + ", ".join(result_strings) + "]"
         return search_context
 
-    except Exception as e:
-        print(f"--- Could not perform activity search due to an error: {e} ---")
+    except Exception:
+        logger.exception("Could not perform activity search", extra={"user_id": user.id})
         return ""
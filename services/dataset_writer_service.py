@@ -0,0 +1,158 @@
+#dataset_writer_service.py
+import atexit
+import glob
+import gzip
+import logging
+import os
+import socket
+import threading
+import time
+
+from django.conf import settings
+
+from . import json_service
+
+logger = logging.getLogger(__name__)
+
+OPEN_SUFFIX = ".jsonl.gz.open" # 기록 중인 샤드 (병합 대상 아님)
+CLOSED_SUFFIX = ".jsonl.gz" # 회전/종료되어 닫힌 샤드
+
+
+class DatasetWriter:
+    """
+    파인튜닝 예제를 메모리에 모았다가 백그라운드 스레드가 묶어서 gzip 샤드에 기록하는 작성기.
+    - 요청 경로에서는 버퍼에 추가만 하며, batch_size개가 모이거나 flush_interval초가 지나면 기록합니다.
+    - 프로세스(워커)마다 자기 샤드 파일에만 쓰므로 프로세스 간 잠금이 필요 없고, 합치는 것은 병합 명령이 담당합니다.
+    - 샤드가 max_bytes 또는 max_age초를 넘으면 닫고(.open 접미사 제거) 새 샤드로 회전합니다.
+    """
+
+    def __init__(self, directory, batch_size=100, flush_interval=5.0, max_bytes=64 * 1024 * 1024, max_age=3600):
+        self.directory = str(directory)
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_bytes = max_bytes
+        self.max_age = max_age
+
+        self._buffer = []
+        self._lock = threading.Lock() # 버퍼 보호
+        self._io_lock = threading.Lock() # 샤드 파일 쓰기/회전 직렬화
+        self._wakeup = threading.Event()
+        self._closed = False
+        self._sequence = 0
+        self._shard_path = None
+        self._shard_opened_at = 0.0
+
+        os.makedirs(self.directory, exist_ok=True)
+        self._thread = threading.Thread(target=self._run, name="dataset-writer", daemon=True)
+        self._thread.start()
+
+    def write(self, record):
+        """레코드 하나를 버퍼에 추가합니다. 파일 I/O는 하지 않습니다."""
+        with self._lock:
+            if self._closed:
+                return
+            self._buffer.append(record)
+            should_flush = len(self._buffer) >= self.batch_size
+        if should_flush:
+            self._wakeup.set()
+
+    def _run(self):
+        while not self._closed:
+            self._wakeup.wait(self.flush_interval)
+            self._wakeup.clear()
+            try:
+                self.flush()
+                self._rotate_if_expired() # 유휴 상태에서도 오래된 샤드가 .open으로 남지 않도록 깨어날 때마다 확인
+            except Exception:
+                logger.exception("파인튜닝 데이터 기록 실패")
+
+    def _new_shard_path(self):
+        self._sequence += 1
+        name = f"shard-{socket.gethostname()}-{os.getpid()}-{int(time.time())}-{self._sequence:04d}"
+        return os.path.join(self.directory, name + OPEN_SUFFIX)
+
+    def _close_shard(self):
+        if self._shard_path and os.path.exists(self._shard_path):
+            os.replace(self._shard_path, self._shard_path[:-len(OPEN_SUFFIX)] + CLOSED_SUFFIX)
+        self._shard_path = None
+
+    def _rotate_if_expired(self):
+        with self._io_lock:
+            if self._shard_path is not None and time.time() - self._shard_opened_at >= self.max_age:
+                self._close_shard()
+
+    def flush(self):
+        """버퍼의 레코드를 현재 샤드에 gzip 멤버 하나로 이어 씁니다. (여러 멤버로 된 gzip 파일은 그대로 한 스트림으로 읽힘)"""
+        with self._lock:
+            records, self._buffer = self._buffer, []
+        if not records:
+            return 0
+
+        payload = b"".join(json_service.dumps_bytes(record) + b"\n" for record in records)
+        with self._io_lock:
+            if self._shard_path is None:
+                self._shard_path = self._new_shard_path()
+                self._shard_opened_at = time.time()
+            with open(self._shard_path, 'ab') as f:
+                f.write(gzip.compress(payload))
+                size = f.tell()
+            if size >= self.max_bytes or time.time() - self._shard_opened_at >= self.max_age:
+                self._close_shard()
+        return len(records)
+
+    def close(self):
+        """
+        남은 레코드를 기록하고 현재 샤드를 닫습니다. (프로세스 종료 시 atexit로 호출)
+        백그라운드 스레드가 끝난 뒤에 마지막으로 기록하므로, 닫은 뒤 스레드가 새 .open 샤드를 만들지 않습니다.
+        """
+        self._closed = True
+        self._wakeup.set()
+        if self._thread is not threading.current_thread():
+            self._thread.join()
+        self.flush()
+        with self._io_lock:
+            self._close_shard()
+
+
+_writer = None
+_writer_pid = None
+_writer_lock = threading.Lock()
+
+
+def get_dataset_writer():
+    """
+    프로세스당 하나의 작성기를 반환합니다.
+    Celery prefork처럼 임포트 후 fork되는 경우에도 자식 프로세스는 자기 pid의 샤드와 스레드를 새로 만듭니다.
+    """
+    global _writer, _writer_pid
+    if _writer is None or _writer_pid != os.getpid():
+        with _writer_lock:
+            if _writer is None or _writer_pid != os.getpid():
+                _writer = DatasetWriter(
+                    settings.FINETUNING_DATASET_DIR,
+                    batch_size=settings.FINETUNING_BATCH_SIZE,
+                    flush_interval=settings.FINETUNING_FLUSH_INTERVAL,
+                    max_bytes=settings.FINETUNING_SHARD_MAX_BYTES,
+                    max_age=settings.FINETUNING_SHARD_MAX_AGE,
+                )
+                _writer_pid = os.getpid()
+                atexit.register(_writer.close)
+    return _writer
+
+
+def list_shards(directory, include_open=False):
+    """병합 대상 샤드 경로 목록 (오래된 순). include_open이면 비정상 종료로 남은 .open 샤드도 포함합니다."""
+    patterns = [f"*{CLOSED_SUFFIX}"] + ([f"*{OPEN_SUFFIX}"] if include_open else [])
+    paths = [path for pattern in patterns for path in glob.glob(os.path.join(str(directory), pattern))]
+    return sorted(paths, key=os.path.getmtime)
+
+
+def iter_shard_records(path):
+    """샤드 하나의 레코드를 순서대로 읽습니다. 마지막 멤버가 잘린 샤드(비정상 종료)는 읽을 수 있는 곳까지만 반환합니다."""
+    try:
+        with gzip.open(path, 'rb') as f:
+            for line in f:
+                if line.strip():
+                    yield json_service.loads(line)
+    except (EOFError, gzip.BadGzipFile) as e:
+        logger.warning("샤드 끝부분이 손상되어 건너뜀 (%s): %s", os.path.basename(path), e)
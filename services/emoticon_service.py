@@ -1,6 +1,9 @@
 #emoticon_service.py
+import logging
 import re
 
+logger = logging.getLogger(__name__)
+
 def parse_emoticon(user_message_text: str) -> str:
     """
     사용자 메시지에서 이모티콘 태그를 파싱하여 LLM이 이해할 수 있는 텍스트로 변환합니다.
@@ -41,6 +44,6 @@ def parse_emoticon(user_message_text: str) -> str:
             # 텍스트와 함께 보낸 경우, 괄호 안에 이모티콘 정보 추가
             user_message_for_llm = f"{user_message_for_llm} (사용자는 '{emoticon_filename.split('_')[0]}' 이모티콘도 함께 보냈다.)"
         
-        print(f"--- [디버그] LLM 전달 메시지 변환: {user_message_for_llm} ---")
+        logger.debug("이모티콘 메시지 변환: %s", emoticon_filename)
 
     return user_message_for_llm
@@ -1,9 +1,12 @@
 # emotion_service.py (클린 버전)
 import os
 import json
+import logging
 import re
 from openai import OpenAI
 
+logger = logging.getLogger(__name__)
+
 # OpenAI 클라이언트 초기화
 client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
 
@@ -14,7 +17,7 @@ class EmotionAnalyzer:
     """
     def __init__(self):
         self.classifier = True  # 기존 호환성 유지를 위해 더미 값 유지
-        print("--- EmotionAnalyzer (GPT API version) initialized successfully. ---")
+        logger.info("EmotionAnalyzer (GPT API version) initialized successfully.")
 
     def analyze(self, text: str):
         """
@@ -75,11 +78,11 @@ class EmotionAnalyzer:
                 emotion_scores = full_result.get("emotion_scores", [])
                 return emotion_scores
             except json.JSONDecodeError:
-                print(f"--- Invalid GPT response format (JSON mode failed): {result_text} ---")
+                logger.warning("Invalid GPT response format (JSON mode failed): %d chars", len(result_text))
                 return []
         except Exception as e:
             # API 호출 중 발생할 수 있는 다른 예외 처리 (예: API 키 문제, 네트워크 오류 등)
-            print(f"--- [에러] API 호출 중 문제가 발생했습니다: {e} ---")
+            logger.error("감정 분석 API 호출 중 문제가 발생했습니다: %s", e)
             return []
 
 # ✅ Django 앱 로드 시 1회만 인스턴스 생성
@@ -117,13 +120,10 @@ def analyze_emotion(bot_message_text: str) -> str:
 
         final_label = ID_TO_LABEL_MAP.get(top_label_int, default_model_label)
 
-        print(f"\n--- Emotion Analysis (GPT API, FIX Applied) ---")
-        print(f"Message: {bot_message_text}")
-        print(f"Top Emotion ID: {top_label_int} (Score: {top_score}) -> Final Label: {final_label}")
-        print(f"---------------------------------------------")
+        logger.debug("Top Emotion ID: %s (Score: %s) -> Final Label: %s", top_label_int, top_score, final_label)
 
         return final_label
 
     except (ValueError, TypeError, IndexError) as e:
-        print(f"--- Emotion Service Error during processing: {e} ---")
+        logger.warning("Emotion Service Error during processing: %s", e)
         return default_model_label
@@ -1,29 +1,35 @@
 #finetuing_service.py
 import json
-from api.models import UserAttribute, UserRelationship
+import logging
+import time
+
+from .anonymizer_service import get_anonymizer
 from .prompt_service import build_persona_system_prompt
+from .dataset_writer_service import get_dataset_writer
+
+logger = logging.getLogger(__name__)
 
-def log_for_finetuning(system_prompt, user_message, assistant_message, filename="finetuning_dataset.jsonl"):
+def log_for_finetuning(system_prompt, user_message, assistant_message, user_id=None):
     """
-    대화 패턴을 파인튜닝을 위한 JSONL 파일에 추가합니다.
+    대화 패턴을 파인튜닝 데이터셋 작성기 버퍼에 추가합니다.
+    파일 기록(gzip 샤드)은 작성기의 백그라운드 스레드가 묶어서 처리하므로 요청 경로에서는 I/O가 없습니다.
+    샤드는 `python manage.py merge_finetuning_dataset`으로 하나의 JSONL 파일로 합칩니다.
     """
     try:
-        # OpenAI의 파인튜닝 형식에 맞는 데이터 구조
+        # OpenAI의 파인튜닝 형식에 맞는 데이터 구조 (_meta는 병합 시 제거됨)
         training_example = {
             "messages": [
                 {"role": "system", "content": system_prompt},
                 {"role": "user", "content": user_message},
                 {"role": "assistant", "content": assistant_message}
-            ]
+            ],
+            "_meta": {"user_id": user_id, "logged_at": time.time()},
         }
+        get_dataset_writer().write(training_example)
 
-        # JSONL 형식으로 파일에 추가하며, UTF-8 인코딩을 보장합니다.
-        with open(filename, 'a', encoding='utf-8') as f:
-            f.write(json.dumps(training_example, ensure_ascii=False) + '\n')
-
-    except Exception as e:
-        # 메인 애플리케이션을 중단시키지 않고 콘솔에 오류를 기록합니다.
-        print(f"--- Could not write to fine-tuning log: {e} ---")
+    except Exception:
+        # 메인 애플리케이션을 중단시키지 않고 오류만 기록합니다.
+        logger.exception("파인튜닝 데이터 버퍼 추가 실패", extra={"user_id": user_id})
 
 def anonymize_and_log_finetuning_data(request, user_message_text, bot_message_text, explanation):
     """
@@ -31,38 +37,18 @@ def anonymize_and_log_finetuning_data(request, user_message_text, bot_message_te
     """
     user = request.user
     finetuning_system_prompt = build_persona_system_prompt(user)
-    
-    names_to_replace = {user.username}
-    try:
-        preferred_name_obj = UserAttribute.objects.filter(user=user, fact_type='이름').last()
-        if preferred_name_obj and preferred_name_obj.content:
-            names_to_replace.add(preferred_name_obj.content)
-    except Exception as e:
-        print(f"--- 로깅을 위한 선호 이름 검색 중 오류 발생: {e} ---")
-        pass
-
-    generic_finetuning_prompt = finetuning_system_prompt
-    generic_bot_message = bot_message_text
-    generic_explanation = explanation # 익명화를 위해 설명 복사
-
-    for name in names_to_replace:
-        if name:
-            generic_finetuning_prompt = generic_finetuning_prompt.replace(f"{name}님", '사용자님').replace(name, '사용자')
-            generic_bot_message = generic_bot_message.replace(f"{name}님", '사용자님').replace(name, '사용자')
-            generic_explanation = generic_explanation.replace(f"{name}님", '사용자님').replace(name, '사용자')
 
+    # 사용자 이름(아이디/선호 이름)과 관계 이름을 한 번에 치환하는 사용자별 컴파일 정규식 (캐시됨)
     try:
-        relationships = UserRelationship.objects.filter(user=user)
-        if relationships.exists():
-            sorted_relationships = sorted(relationships, key=lambda r: len(r.name), reverse=True)
-            for rel in sorted_relationships:
-                if rel.name:
-                    placeholder = f"[{rel.relationship_type}]"
-                    generic_bot_message = generic_bot_message.replace(rel.name, placeholder)
-                    generic_explanation = generic_explanation.replace(rel.name, placeholder) # 설명도 익명화
-    except Exception as e:
-        print(f"--- 로깅을 위한 제3자 이름 대체 중 오류 발생: {e} ---")
-        pass
+        anonymizer = get_anonymizer(user)
+    except Exception:
+        # 이름 목록을 못 가져오면 익명화되지 않은 데이터가 남지 않도록 기록하지 않음
+        logger.exception("파인튜닝 로깅을 위한 익명화 준비 실패", extra={"user_id": user.id})
+        return
+    generic_finetuning_prompt = anonymizer.anonymize(finetuning_system_prompt)
+    generic_user_message = anonymizer.anonymize(user_message_text) # 사용자 메시지에 관계 이름이 가장 많이 나옴
+    generic_bot_message = anonymizer.anonymize(bot_message_text)
+    generic_explanation = anonymizer.anonymize(explanation) # 설명도 익명화
 
     # 어시스턴트의 최종 콘텐츠를 JSON 형식으로 구성
     assistant_content = {
@@ -71,4 +57,4 @@ def anonymize_and_log_finetuning_data(request, user_message_text, bot_message_te
     }
     assistant_content_str = json.dumps(assistant_content, ensure_ascii=False)
 
-    log_for_finetuning(generic_finetuning_prompt, user_message_text, assistant_content_str)
+    log_for_finetuning(generic_finetuning_prompt, generic_user_message, assistant_content_str, user_id=user.id)
@@ -0,0 +1,193 @@
+#history_service.py
+import json
+import logging
+import time
+from dataclasses import dataclass, fields
+from datetime import datetime
+from typing import Optional, Tuple
+
+import redis
+from django.conf import settings
+
+from api.models import ChatMessage
+from .redis_service import get_redis_client
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True, slots=True)
+class ChatRecord:
+    """링 버퍼/히스토리 스냅샷에 보관하는 최소한의 메시지 필드 (읽기 전용)"""
+    id: int
+    message: str
+    is_user: bool
+    character_emotion: Optional[str]
+    timestamp: datetime
+
+
+@dataclass(frozen=True, slots=True)
+class HistorySnapshot:
+    """
+    한 턴 동안 공유되는 최근 대화의 불변 스냅샷 (최신순).
+    QuerySet과 달리 이미 평가된 튜플이므로, 다른 스레드/코루틴에서 반복하거나 잘라도 DB를 다시 조회하지 않습니다.
+    """
+    records: Tuple[ChatRecord, ...] = ()
+
+    def __iter__(self):
+        return iter(self.records)
+
+    def __len__(self):
+        return len(self.records)
+
+    def __bool__(self):
+        return bool(self.records)
+
+    def __getitem__(self, index):
+        return self.records[index]
+
+    @property
+    def latest(self) -> Optional[ChatRecord]:
+        """가장 최근 메시지 (없으면 None)"""
+        return self.records[0] if self.records else None
+
+
+RECORD_FIELDS = tuple(field.name for field in fields(ChatRecord))
+
+
+def _ring_key(user_id):
+    return f"chat_history:{user_id}"
+
+
+def _version_key(user_id):
+    # 메시지가 기록될 때마다 바뀜. 재구성 도중 새 메시지가 들어오면 재구성을 포기하기 위해 사용
+    return f"chat_history:{user_id}:v"
+
+
+def _bump_version(pipe, user_id):
+    # INCR 대신 time_ns로 덮어씀 (memory_version_service와 같은 방식): 링 버퍼와 함께 만료되어도
+    # 다시 생긴 키가 이전 버전 값으로 돌아가지 않으므로 만료를 걸어 키가 영구히 남지 않게 할 수 있음
+    pipe.set(_version_key(user_id), time.time_ns(), ex=settings.HISTORY_RING_TTL)
+
+
+def _encode(record: ChatRecord) -> str:
+    return json.dumps({
+        'id': record.id,
+        'message': record.message,
+        'is_user': record.is_user,
+        'character_emotion': record.character_emotion,
+        'timestamp': record.timestamp.isoformat(),
+    }, ensure_ascii=False)
+
+
+def _decode(raw) -> ChatRecord:
+    data = json.loads(raw)
+    return ChatRecord(
+        id=data['id'],
+        message=data['message'],
+        is_user=data['is_user'],
+        character_emotion=data.get('character_emotion'),
+        timestamp=datetime.fromisoformat(data['timestamp']),
+    )
+
+
+def _load_from_db(user_id, limit):
+    """DB에서 최근 메시지를 최신순으로 가져옵니다."""
+    rows = ChatMessage.objects.filter(user_id=user_id).order_by('-timestamp').values_list(*RECORD_FIELDS)[:limit]
+    return [ChatRecord(*row) for row in rows]
+
+
+def _rebuild_ring(client, user_id, expected_version):
+    """DB에서 링 버퍼를 다시 채웁니다. 그 사이 새 메시지가 기록되었다면(버전 변경) 재구성하지 않습니다."""
+    ring_size = settings.HISTORY_RING_SIZE
+    records = _load_from_db(user_id, ring_size)
+
+    ring_key = _ring_key(user_id)
+    version_key = _version_key(user_id)
+    try:
+        with client.pipeline() as pipe:
+            pipe.watch(version_key)
+            if pipe.get(version_key) != expected_version:
+                return records
+            pipe.multi()
+            pipe.delete(ring_key)
+            if records:
+                pipe.rpush(ring_key, *[_encode(record) for record in records])
+                pipe.expire(ring_key, settings.HISTORY_RING_TTL)
+            pipe.execute()
+    except redis.WatchError:
+        pass # 동시에 새 메시지가 기록됨. 다음 조회 때 다시 재구성
+    return records
+
+
+def get_history_snapshot(user_id, limit=10) -> HistorySnapshot:
+    """한 턴에서 사용할 최근 대화 스냅샷을 1회 생성합니다. 이후에는 이 스냅샷을 그대로 전달해서 사용합니다."""
+    return HistorySnapshot(tuple(get_recent_messages(user_id, limit)))
+
+
+def get_recent_messages(user_id, limit=10):
+    """
+    사용자의 최근 메시지를 최신순 ChatRecord 리스트로 반환합니다.
+    링 버퍼에 있으면 DB 쿼리 없이 반환하고, 없으면 DB에서 읽어 링 버퍼를 지연 재구성합니다.
+    """
+    client = get_redis_client()
+    if client is None or limit > settings.HISTORY_RING_SIZE:
+        return _load_from_db(user_id, limit)
+
+    ring_key = _ring_key(user_id)
+    try:
+        with client.pipeline(transaction=False) as pipe:
+            pipe.lrange(ring_key, 0, limit - 1)
+            pipe.exists(ring_key)
+            pipe.get(_version_key(user_id))
+            raw_records, ring_exists, version = pipe.execute()
+
+        if ring_exists:
+            return [_decode(raw) for raw in raw_records]
+
+        return _rebuild_ring(client, user_id, version)[:limit]
+    except redis.RedisError as e:
+        logger.warning("대화 링 버퍼 조회 실패, DB로 대체합니다: %s", e)
+        return _load_from_db(user_id, limit)
+
+
+def push_message(chat_message: ChatMessage):
+    """
+    새로 생성된 메시지를 링 버퍼 앞쪽에 기록합니다. (write-through)
+    링 버퍼가 아직 없으면 LPUSHX가 아무 것도 하지 않으며, 다음 조회 때 DB에서 재구성됩니다.
+    """
+    client = get_redis_client()
+    if client is None:
+        return
+
+    record = ChatRecord(
+        id=chat_message.id,
+        message=chat_message.message,
+        is_user=chat_message.is_user,
+        character_emotion=chat_message.character_emotion,
+        timestamp=chat_message.timestamp,
+    )
+    ring_key = _ring_key(chat_message.user_id)
+    try:
+        with client.pipeline() as pipe:
+            _bump_version(pipe, chat_message.user_id)
+            pipe.lpushx(ring_key, _encode(record))
+            pipe.ltrim(ring_key, 0, settings.HISTORY_RING_SIZE - 1)
+            pipe.expire(ring_key, settings.HISTORY_RING_TTL)
+            pipe.execute()
+    except redis.RedisError as e:
+        logger.warning("대화 링 버퍼 기록 실패: %s", e)
+        invalidate(chat_message.user_id)
+
+
+def invalidate(user_id):
+    """메시지가 수정/삭제되었을 때 링 버퍼를 비웁니다. (다음 조회 때 DB에서 재구성)"""
+    client = get_redis_client()
+    if client is None:
+        return
+    try:
+        with client.pipeline() as pipe:
+            _bump_version(pipe, user_id)
+            pipe.delete(_ring_key(user_id))
+            pipe.execute()
+    except redis.RedisError as e:
+        logger.warning("대화 링 버퍼 무효화 실패: %s", e)
@@ -2,8 +2,12 @@
 import os
 import json
 import base64
+import logging
+
 from openai import OpenAI
 
+logger = logging.getLogger(__name__)
+
 class ImageCaptioningService:
     _instance = None
     _client = None
@@ -15,10 +19,10 @@ class ImageCaptioningService:
             # OpenAI 클라이언트는 자동으로 OPENAI_API_KEY 환경 변수를 찾습니다.
             try:
                 cls._client = OpenAI()
-                print("OpenAI 클라이언트가 성공적으로 초기화되었습니다.")
-            except Exception as e:
+                logger.debug("OpenAI 클라이언트가 성공적으로 초기화되었습니다.")
+            except Exception:
                 cls._client = None
-                print(f"OpenAI 클라이언트 초기화 실패: {e}")
+                logger.exception("OpenAI 클라이언트 초기화 실패")
         return cls._instance
 
     def analyze_image(self, image_data_b64: str, user_message: str, image_content_type: str = 'image/jpeg') -> dict:
@@ -27,7 +31,7 @@ class ImageCaptioningService:
         'image_description' 키를 가진 딕셔너리를 반환합니다.
         """
         if not self._client:
-            print("OpenAI 클라이언트가 초기화되지 않았습니다.")
+            logger.warning("OpenAI 클라이언트가 초기화되지 않았습니다.")
             return None
 
         analysis_prompt = f"""
@@ -60,20 +64,19 @@ class ImageCaptioningService:
 
             if not message_content:
                 finish_reason = choice.finish_reason
-                print(f"OpenAI 이미지 분석 실패: API가 응답 내용을 반환하지 않았습니다. (종료 사유: {finish_reason})")
+                logger.warning("OpenAI 이미지 분석 실패: API가 응답 내용을 반환하지 않았습니다. (종료 사유: %s)", finish_reason)
                 if finish_reason == 'content_filter':
-                    print("--- [원인] OpenAI의 콘텐츠 필터링 정책에 의해 응답이 차단되었을 수 있습니다.")
+                    logger.warning("OpenAI의 콘텐츠 필터링 정책에 의해 응답이 차단되었을 수 있습니다.")
                 return None
 
             # 호출 함수와의 호환성을 위해 텍스트를 딕셔너리 형식으로 래핑
             analysis_result = {"image_description": message_content.strip()}
-            print(f"--- [디버그] 이미지 분석 결과 (gpt-4o): {analysis_result} ---")
+            logger.debug("이미지 분석 완료 (gpt-4o, %d자)", len(analysis_result["image_description"]))
             return analysis_result
 
-        except json.JSONDecodeError as e:
-            print(f"OpenAI 이미지 분석 중 JSON 파싱 오류 발생: {e}")
-            print(f"--- [원문] LLM 원본 응답: {message_content}")
+        except json.JSONDecodeError:
+            logger.exception("OpenAI 이미지 분석 중 JSON 파싱 오류 발생")
             return None
-        except Exception as e:
-            print(f"OpenAI 이미지 분석 중 오류 발생: {e}")
+        except Exception:
+            logger.exception("OpenAI 이미지 분석 중 오류 발생")
             return None
@@ -0,0 +1,78 @@
+#image_derivative_service.py
+import io
+import os
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from PIL import Image, ImageOps
+
+from api.models import ChatMessage
+
+DERIVATIVE_DIR = 'chat_images/derivatives'
+
+
+def _derivative_path(image_name, variant):
+    stem = os.path.splitext(os.path.basename(image_name))[0]
+    return f"{DERIVATIVE_DIR}/{stem}_{variant}.webp"
+
+
+def _render_variant(source, max_dimension):
+    """원본(이미 EXIF 회전 적용)에서 긴 변 max_dimension 이하의 WebP 바이트를 만듭니다. 원본보다 크게 늘리지 않습니다."""
+    image = source.copy()
+    image.thumbnail((max_dimension, max_dimension), Image.Resampling.LANCZOS)
+    if image.mode not in ('RGB', 'RGBA'):
+        image = image.convert('RGBA' if 'A' in image.getbands() else 'RGB')
+    buffer = io.BytesIO()
+    image.save(buffer, format='WEBP', quality=settings.IMAGE_DERIVATIVE_WEBP_QUALITY, method=4)
+    return buffer.getvalue(), image.size
+
+
+def generate_derivatives(message_id):
+    """
+    ChatMessage.image의 WebP 파생본(IMAGE_DERIVATIVE_SIZES의 각 크기)을 만들어 저장하고 image_variants를 갱신합니다.
+    Celery 워커(프로세스 풀)에서 실행되므로 웹 요청/웹소켓 경로의 CPU를 쓰지 않습니다. 반환값은 생성한 파생본 수입니다.
+    """
+    message = ChatMessage.objects.filter(id=message_id).only('id', 'image').first()
+    if message is None or not message.image:
+        return 0
+
+    variants = {}
+    with message.image.open('rb') as image_file, Image.open(image_file) as source:
+        largest = max(settings.IMAGE_DERIVATIVE_SIZES.values())
+        source.draft('RGB', (largest, largest)) # JPEG는 디코딩 단계에서부터 축소
+        oriented = ImageOps.exif_transpose(source)
+
+        for variant, max_dimension in settings.IMAGE_DERIVATIVE_SIZES.items():
+            data, (width, height) = _render_variant(oriented, max_dimension)
+            path = _derivative_path(message.image.name, variant)
+            if default_storage.exists(path):
+                default_storage.delete(path)
+            saved_path = default_storage.save(path, ContentFile(data))
+            variants[variant] = {'path': saved_path, 'width': width, 'height': height}
+
+    # 시그널(히스토리 링 버퍼 무효화 등)을 발생시키지 않도록 update()로 저장
+    ChatMessage.objects.filter(id=message_id).update(image_variants=variants)
+    return len(variants)
+
+
+def build_image_sources(message, request=None):
+    """
+    직렬화용 이미지 URL 묶음. 파생본이 아직 없으면(생성 중) None을 반환하며, 클라이언트는 원본 image URL을 사용합니다.
+    {'thumb': url, 'medium': url, 'srcset': "url 320w, url 960w"}
+    """
+    variants = message.image_variants or {}
+    if not message.image or not variants:
+        return None
+
+    def absolute(url):
+        return request.build_absolute_uri(url) if request is not None else url
+
+    sources = {}
+    srcset = {} # width -> 후보. 원본이 작으면 thumbnail()이 확대하지 않아 여러 파생본의 폭이 같을 수 있음 (srcset의 같은 w 서술자 중복은 무효)
+    for variant, info in sorted(variants.items(), key=lambda item: item[1]['width']):
+        url = absolute(default_storage.url(info['path']))
+        sources[variant] = url
+        srcset.setdefault(info['width'], f"{url} {info['width']}w")
+    sources['srcset'] = ", ".join(srcset.values())
+    return sources
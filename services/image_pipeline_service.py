@@ -0,0 +1,136 @@
+#image_pipeline_service.py
+import base64
+import contextvars
+import hashlib
+import io
+import logging
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+from dataclasses import dataclass
+
+from django.conf import settings
+from PIL import Image, ImageOps
+
+from .image_captioning_service import ImageCaptioningService
+from . import caption_cache_service, telemetry_service
+
+logger = logging.getLogger(__name__)
+
+# 해제 폭탄(decompression bomb) 방지: 이보다 큰 이미지는 열지 않음
+Image.MAX_IMAGE_PIXELS = settings.IMAGE_MAX_SOURCE_PIXELS
+
+# 이미지 축소/인코딩과 캡션 요청은 요청 스레드와 별도의 작은 풀에서 실행 (다른 컨텍스트 수집과 동시에 진행)
+_executor = ThreadPoolExecutor(max_workers=settings.IMAGE_PIPELINE_WORKERS, thread_name_prefix="image-pipeline")
+
+# 캡션 서비스(OpenAI 클라이언트)는 업로드마다 만들지 않고 처음 쓸 때 한 번만 생성
+_captioning_service = None
+
+
+def _get_captioning_service():
+    global _captioning_service
+    if _captioning_service is None:
+        _captioning_service = ImageCaptioningService()
+    return _captioning_service
+
+
+@dataclass(frozen=True, slots=True)
+class PreparedImage:
+    """LLM에 보낼 수 있도록 축소/재인코딩된 이미지"""
+    data_b64: str
+    content_type: str
+    content_hash: str # 업로드 원본 바이트의 SHA-256 (사용자 간에 공유되는 정확 일치 캡션 캐시 키)
+    dhash: int # 64비트 지각 해시 (같은 사용자 안에서의 근사 중복 캡션 캐시 키)
+    width: int
+    height: int
+
+
+def prepare_image(image_file) -> PreparedImage:
+    """
+    업로드 파일을 긴 변 IMAGE_MAX_DIMENSION 이하의 JPEG로 축소/재인코딩합니다.
+    JPEG는 draft()로 디코딩 단계에서부터 축소하므로 대용량 폰 사진도 원본 해상도 전체를 메모리에 풀지 않습니다.
+    원본 파일은 ChatMessage 저장에 다시 쓰이므로 읽은 뒤 포인터를 처음으로 되돌립니다.
+    """
+    max_dimension = settings.IMAGE_MAX_DIMENSION
+    image_file.seek(0)
+    content_hash = hashlib.sha256(image_file.read()).hexdigest()
+    image_file.seek(0)
+    try:
+        with Image.open(image_file) as source:
+            source.draft('RGB', (max_dimension, max_dimension))
+            image = ImageOps.exif_transpose(source) # 휴대폰 사진의 회전 정보 반영
+            image.thumbnail((max_dimension, max_dimension), Image.Resampling.LANCZOS)
+            if image.mode != 'RGB':
+                image = image.convert('RGB')
+
+            buffer = io.BytesIO()
+            image.save(buffer, format='JPEG', quality=settings.IMAGE_JPEG_QUALITY, optimize=True)
+            width, height = image.size
+            image_hash = caption_cache_service.dhash(image) # 이미 축소된 이미지로 계산하므로 비용이 거의 없음
+    finally:
+        image_file.seek(0)
+
+    data = buffer.getvalue()
+    return PreparedImage(
+        data_b64=base64.b64encode(data).decode('ascii'),
+        content_type='image/jpeg',
+        content_hash=content_hash,
+        dhash=image_hash,
+        width=width,
+        height=height,
+    )
+
+
+def analyze_uploaded_image(image_file, user_message, user_id):
+    """
+    축소 → 캡션 캐시 조회 → (없으면) gpt-4o 캡션 순으로 처리하여 {'image_description': ...} 또는 None을 반환합니다.
+    같은 이미지(또는 같은 사용자가 다시 저장/캡처한 거의 같은 이미지)와 같은 메시지 조합은 캐시에서 바로 응답합니다.
+    어떤 예외도 밖으로 내보내지 않으므로(잘린 PNG/GIF의 ValueError·SyntaxError 등) 이미지 분석 실패가 턴 전체를 실패시키지 않습니다.
+    """
+    with telemetry_service.span("chat.image_analysis") as span:
+        try:
+            return _analyze(span, image_file, user_message, user_id)
+        except Image.DecompressionBombError as e:
+            logger.warning("이미지가 너무 커서 분석하지 않음: %s", e)
+        except Exception:
+            logger.exception("이미지 분석 실패")
+        return None
+
+
+def _analyze(span, image_file, user_message, user_id):
+    prepared = prepare_image(image_file)
+    span.set_attribute("image.width", prepared.width)
+    span.set_attribute("image.height", prepared.height)
+
+    cached_caption = caption_cache_service.get_caption(user_id, prepared.content_hash, prepared.dhash, user_message)
+    span.set_attribute("image.caption_cache_hit", cached_caption is not None)
+    if cached_caption is not None:
+        return {"image_description": cached_caption}
+
+    analysis_result = _get_captioning_service().analyze_image(prepared.data_b64, user_message, prepared.content_type)
+    if analysis_result:
+        caption_cache_service.set_caption(
+            user_id, prepared.content_hash, prepared.dhash, user_message, analysis_result["image_description"]
+        )
+    return analysis_result
+
+
+def submit_image_analysis(image_file, user_message, user_id):
+    """
+    analyze_uploaded_image를 이미지 파이프라인 스레드에서 시작하고 Future를 반환합니다.
+    현재 contextvars(트레이싱 부모 스팬 등)를 복사해 넘기므로 워커 스레드의 스팬도 같은 트레이스에 묶입니다.
+    업로드 파일은 ChatMessage 저장에 다시 쓰이므로, 바이트를 먼저 읽어 복사본을 넘겨 (시간 초과 후에도 도는) 워커와 파일 포인터를 공유하지 않습니다.
+    """
+    image_file.seek(0)
+    data = image_file.read()
+    image_file.seek(0)
+    context = contextvars.copy_context()
+    return _executor.submit(context.run, analyze_uploaded_image, io.BytesIO(data), user_message, user_id)
+
+
+def wait_for_image_analysis(future):
+    """이미지 분석 결과를 IMAGE_ANALYSIS_TIMEOUT초까지 기다립니다. 시간을 넘기면 이미지 설명 없이 진행하도록 None을 반환합니다."""
+    try:
+        return future.result(timeout=settings.IMAGE_ANALYSIS_TIMEOUT)
+    except FutureTimeoutError:
+        future.cancel()
+        logger.warning("이미지 분석 시간 초과 (%s초)", settings.IMAGE_ANALYSIS_TIMEOUT)
+        return None
@@ -0,0 +1,48 @@
+#json_service.py
+import decimal
+
+import orjson
+import requests
+from django.utils.functional import Promise
+
+# orjson.JSONDecodeError는 json.JSONDecodeError(ValueError)의 하위 클래스이므로 기존 except 절과도 호환됨
+JSONDecodeError = orjson.JSONDecodeError
+
+# 한국어는 ensure_ascii 이스케이프(\uXXXX) 없이 UTF-8 그대로 출력되고, dict 키가 문자열이 아니어도 허용
+_DUMPS_OPTIONS = orjson.OPT_NON_STR_KEYS
+
+
+def _default(obj):
+    """orjson이 기본 지원하지 않는 타입 (datetime, UUID, dataclass 등은 기본 지원)"""
+    if isinstance(obj, decimal.Decimal):
+        return float(obj)
+    if isinstance(obj, (set, frozenset)):
+        return list(obj)
+    if isinstance(obj, Promise): # gettext_lazy 등 지연 번역 문자열
+        return str(obj)
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+def dumps_bytes(obj) -> bytes:
+    return orjson.dumps(obj, default=_default, option=_DUMPS_OPTIONS)
+
+
+def dumps(obj) -> str:
+    """웹소켓 text 프레임, Redis 값 등 str이 필요한 곳에서 사용합니다."""
+    return dumps_bytes(obj).decode('utf-8')
+
+
+def loads(data):
+    """str/bytes 모두 받습니다. 형식이 잘못되면 JSONDecodeError가 발생합니다."""
+    return orjson.loads(data)
+
+
+def post_json(url, payload, headers=None, **kwargs):
+    """requests.post(json=...)와 같지만 본문 직렬화를 orjson으로 처리합니다. (긴 프롬프트 페이로드에서 CPU 절약)"""
+    headers = {**(headers or {}), "Content-Type": "application/json"}
+    return requests.post(url, data=dumps_bytes(payload), headers=headers, **kwargs)
+
+
+def response_json(response):
+    """requests 응답 본문을 orjson으로 파싱합니다."""
+    return orjson.loads(response.content)
@@ -1,8 +1,12 @@
 #location_service.py
+import logging
 import os
 import requests
+from django.conf import settings
 from . import context_service # context_service 임포트
 
+logger = logging.getLogger(__name__)
+
 SEARCH_TRIGGERS = {
     'FD6': (['맛집', '음식점', '배고파', '뭐 먹지', '국밥'], '맛집', '음식점'),
     'CE7': (['카페', '커피'], '카페', '카페'),
@@ -25,7 +29,7 @@ def get_location_context(latitude, longitude):
 
     try:
         coord_params = {"x": longitude, "y": latitude}
-        response = requests.get("https://dapi.kakao.com/v2/local/geo/coord2address.json", headers=headers, params=coord_params)
+        response = requests.get(f"{settings.KAKAO_API_BASE_URL}/v2/local/geo/coord2address.json", headers=headers, params=coord_params)
         response.raise_for_status()
         address_data = response.json()
 
@@ -43,7 +47,7 @@ def get_location_context(latitude, longitude):
             'query': address_name, 'x': longitude, 'y': latitude,
             'radius': 20, 'sort': 'distance'
         }
-        response = requests.get("https://dapi.kakao.com/v2/local/search/keyword.json", headers=headers, params=keyword_params)
+        response = requests.get(f"{settings.KAKAO_API_BASE_URL}/v2/local/search/keyword.json", headers=headers, params=keyword_params)
         response.raise_for_status()
         places_data = response.json()
 
@@ -54,7 +58,7 @@ def get_location_context(latitude, longitude):
             return f"[현재 위치]: {address_name} 부근"
         
     except (requests.exceptions.RequestException, KeyError, IndexError) as e:
-        print(f"Kakao API 호출 오류: {e}")
+        logger.warning("Kakao API 호출 오류: %s", e)
     return ""
 
 
@@ -64,43 +68,43 @@ def get_location_based_recommendation(user, message, latitude, longitude):
     사용자 메시지, 위치, 선호도를 종합하여 장소를 추천합니다.
     """
     if not latitude or not longitude:
-        print("--- [Location Debug] 위치 정보 (위도/경도)가 없어 검색을 건너뜁니다. ---")
+        logger.debug("위치 정보 (위도/경도)가 없어 검색을 건너뜁니다.")
         return ""
 
     for category_code, (keywords, category_name, preference_keyword) in SEARCH_TRIGGERS.items():
 
         message_lower = message.lower()
         if any(keyword in message_lower for keyword in keywords):
-            print(f"--- [Location Debug] 트리거 감지: {category_name} ({category_code}) ---")
+            logger.debug("트리거 감지: %s (%s)", category_name, category_code, extra={"user_id": user.id})
 
             # 1. 사용자 선호 장소 목록 가져오기
             preferred_places = context_service.get_user_place_preferences(user, preference_keyword)
 
             # 2. 선호 장소가 주변에 있는지 검색
             if preferred_places:
-                print(f"--- [Location Debug] 선호 장소 검색 시작: {preferred_places} ---")
+                logger.debug("선호 장소 검색 시작: %d곳", len(preferred_places), extra={"user_id": user.id})
                 # 🚨 search_specific_places_nearby 함수 사용
                 found_preferred_places = search_specific_places_nearby(latitude, longitude, preferred_places)
                 if found_preferred_places:
                     places_str = ", ".join([f"'{p}'" for p in found_preferred_places])
-                    print(f"--- [Location Debug] 선호 장소 발견: {places_str} ---")
+                    logger.debug("선호 장소 발견: %d곳", len(found_preferred_places), extra={"user_id": user.id})
                     return f"[선호 장소 추천]: 주변에 자주 가시던 {places_str}이(가) 있어요! 가보시는 건 어때요?"
                 else:
-                    print(f"--- [Location Debug] 주변에서 선호 장소 찾지 못함. 일반 검색으로 전환. ---")
+                    logger.debug("주변에서 선호 장소 찾지 못함. 일반 검색으로 전환.", extra={"user_id": user.id})
             else:
-                 print(f"--- [Location Debug] 선호 장소 데이터 없음. 일반 검색으로 전환. ---")
+                 logger.debug("선호 장소 데이터 없음. 일반 검색으로 전환.", extra={"user_id": user.id})
             
             # 3. (선호 장소가 없거나 주변에 없는 경우) 주변의 다른 장소 추천
             return find_nearby_places(latitude, longitude, category_code, category_name)
-    print("--- [Location Debug] 위치 검색 키워드가 감지되지 않았습니다. ---")
+    logger.debug("위치 검색 키워드가 감지되지 않았습니다.", extra={"user_id": user.id})
     return ""
 
 def find_nearby_places(latitude, longitude, category_code, category_name):
-    print(f"--- [API Debug] find_nearby_places 호출됨: {category_name} (Code: {category_code}) ---")
+    logger.debug("find_nearby_places 호출됨: %s (Code: %s)", category_name, category_code)
   
     api_key = os.environ.get("KAKAO_API_KEY")
     if not api_key:
-        print("--- [API Debug] 카카오 API 키 없음. 빈 문자열 반환. ---")
+        logger.warning("카카오 API 키 없음. 빈 문자열 반환.")
         return ""
     headers = {"Authorization": f"KakaoAK {api_key}"}
     params = {
@@ -108,25 +112,25 @@ def find_nearby_places(latitude, longitude, category_code, category_name):
         "radius": 1000, "sort": "accuracy",
     }
     try:
-        response = requests.get("https://dapi.kakao.com/v2/local/search/category.json", headers=headers, params=params)
+        response = requests.get(f"{settings.KAKAO_API_BASE_URL}/v2/local/search/category.json", headers=headers, params=params)
         response.raise_for_status()
         data = response.json()
 
         if not data['documents']:
-            print(f"--- [API Debug] 카카오 API 검색 결과: 문서(documents)가 비어있음. 반환: \"\". ---")
+            logger.debug("카카오 API 검색 결과: 문서(documents)가 비어있음.")
             return ""
         
         place_list = [place['place_name'] for place in data['documents'][:5]]
-        print(f"--- [API Debug] 카카오 API 검색 성공: {len(place_list)}개 장소 발견. ---")
+        logger.debug("카카오 API 검색 성공: %d개 장소 발견.", len(place_list))
 
         return f"[주변 {category_name} 정보]: " + ", ".join(place_list)
     
     except requests.exceptions.HTTPError as e:
-        print(f"--- [API Debug] 카카오 API HTTP 오류 ({e.response.status_code}): {e} ---")
+        logger.warning("카카오 API HTTP 오류 (%s): %s", e.response.status_code, e)
         return "" # 👈 두 번째 실패 경로
 
     except (requests.exceptions.RequestException, KeyError) as e:
-        print(f"Kakao API 주변 {category_name} 검색 오류: {e}")
+        logger.warning("Kakao API 주변 %s 검색 오류: %s", category_name, e)
         return ""
 
 def search_specific_places_nearby(latitude, longitude, place_names):
@@ -142,12 +146,12 @@ def search_specific_places_nearby(latitude, longitude, place_names):
             'radius': 1000, 'sort': 'distance'
         }
         try:
-            response = requests.get("https://dapi.kakao.com/v2/local/search/keyword.json", headers=headers, params=params)
+            response = requests.get(f"{settings.KAKAO_API_BASE_URL}/v2/local/search/keyword.json", headers=headers, params=params)
             response.raise_for_status()
             data = response.json()
             if data['documents']:
                 found_places.append(place_name)
         except (requests.exceptions.RequestException, KeyError) as e:
-            print(f"Kakao API 키워드 검색 오류 ({place_name}): {e}")
+            logger.warning("Kakao API 키워드 검색 오류: %s", e)
             continue
     return found_places
@@ -0,0 +1,105 @@
+#logging_service.py
+import atexit
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import random
+import sys
+import threading
+
+# 로그 레코드의 표준 속성. 이 외의 속성(extra=...)은 구조화 필드로 출력
+_RESERVED_ATTRS = frozenset(vars(logging.LogRecord('', 0, '', 0, '', (), None))) | {'message', 'asctime'}
+
+
+class JsonFormatter(logging.Formatter):
+    """한 줄에 JSON 객체 하나로 출력합니다. extra로 넘긴 값(user_id, stage 등)은 최상위 필드가 됩니다."""
+
+    def format(self, record):
+        payload = {
+            'ts': self.formatTime(record, '%Y-%m-%dT%H:%M:%S'),
+            'level': record.levelname,
+            'logger': record.name,
+            'msg': record.getMessage(), # %-포맷팅은 여기(리스너 스레드)에서 처음 수행됨
+        }
+        for key, value in record.__dict__.items():
+            if key not in _RESERVED_ATTRS and not key.startswith('_'):
+                payload[key] = value
+        if record.exc_info:
+            payload['exc'] = self.formatException(record.exc_info)
+        return json.dumps(payload, ensure_ascii=False, default=str)
+
+
+class SamplingFilter(logging.Filter):
+    """
+    DEBUG 레코드와 extra={'sampled': True}로 표시된 고빈도 레코드(스트리밍 토큰 등)는 sample_rate 비율만 통과시킵니다.
+    호출 스레드에서 큐에 넣기 전에 걸러지므로, 버려지는 레코드는 포맷팅/전송 비용이 없습니다.
+    """
+
+    def __init__(self, sample_rate=1.0):
+        super().__init__()
+        self.sample_rate = float(sample_rate)
+
+    def filter(self, record):
+        if record.levelno > logging.DEBUG and not getattr(record, 'sampled', False):
+            return True
+        return self.sample_rate >= 1.0 or random.random() < self.sample_rate
+
+
+class QueuedStreamHandler(logging.handlers.QueueHandler):
+    """
+    요청 경로에서는 레코드를 메모리 큐에 넣기만 하고, 포맷팅과 stdout 쓰기는 QueueListener 스레드가 처리합니다.
+    LOGGING 설정(dictConfig)에서 handler class로 지정해 사용합니다.
+    리스너 스레드는 fork로 복제되지 않으므로(Celery prefork 등) 프로세스마다 첫 emit에서 새 큐와 함께 시작합니다.
+    """
+
+    def __init__(self, sample_rate=1.0, max_queue_size=10000):
+        self.max_queue_size = max_queue_size
+        super().__init__(queue.Queue(maxsize=max_queue_size))
+        self.addFilter(SamplingFilter(sample_rate))
+
+        self.listener = None
+        self._listener_pid = None
+        self._listener_lock = threading.Lock()
+        os.register_at_fork(after_in_child=self._reset_after_fork)
+        atexit.register(self._stop_listener)
+
+    def _reset_after_fork(self):
+        # 부모의 큐/락은 fork 시점에 다른 스레드가 잡고 있었을 수 있으므로 자식에서 새로 만듦
+        self.queue = queue.Queue(maxsize=self.max_queue_size)
+        self.listener = None
+        self._listener_pid = None
+        self._listener_lock = threading.Lock()
+
+    def _ensure_listener(self):
+        if self._listener_pid == os.getpid():
+            return
+        with self._listener_lock:
+            if self._listener_pid == os.getpid():
+                return
+            stream_handler = logging.StreamHandler(sys.stdout)
+            stream_handler.setFormatter(JsonFormatter())
+            self.listener = logging.handlers.QueueListener(self.queue, stream_handler, respect_handler_level=True)
+            self.listener.start()
+            self._listener_pid = os.getpid()
+
+    def _stop_listener(self):
+        if self.listener is not None and self._listener_pid == os.getpid():
+            self.listener.stop()
+            self.listener = None
+            self._listener_pid = None
+
+    def emit(self, record):
+        self._ensure_listener()
+        super().emit(record)
+
+    def prepare(self, record):
+        # 기본 구현은 여기서 메시지를 포맷팅하므로, 같은 프로세스 안의 큐에서는 레코드를 그대로 넘겨 포맷팅을 미룹니다.
+        return record
+
+    def enqueue(self, record):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            pass # 출력이 밀리면 요청 경로를 막지 않고 버림
@@ -1,11 +1,14 @@
 #memory_service.py
 
-import json
+import logging
 import requests
 from datetime import datetime, timedelta, date
+from django.conf import settings
 from django.utils import timezone
 from api.models import UserAttribute, UserActivity, UserRelationship, UserSchedule
-from . import schedule_service
+from . import schedule_service, json_service
+
+logger = logging.getLogger(__name__)
 
 def extract_and_save_user_context_data(user, user_message, bot_message, recent_history, api_key):
     """
@@ -92,11 +95,11 @@ def extract_and_save_user_context_data(user, user_message, bot_message, recent_h
             "response_format": {"type": "json_object"},
         }
                 
-        response = requests.post("https://api.openai.com/v1/chat/completions", headers=headers, json=data)
+        response = json_service.post_json(f"{settings.OPENAI_API_BASE_URL}/chat/completions", data, headers=headers)
         response.raise_for_status()
         
-        content_str = response.json().get('choices', [{}])[0].get('message', {}).get('content', '{{}}')
-        extracted_data = json.loads(content_str)
+        content_str = json_service.response_json(response).get('choices', [{}])[0].get('message', {}).get('content', '{{}}')
+        extracted_data = json_service.loads(content_str)
 
         # 3. 각 정보 유형별로 저장 함수 호출
         if extracted_data.get("user_attributes"):
@@ -111,8 +114,8 @@ def extract_and_save_user_context_data(user, user_message, bot_message, recent_h
         if extracted_data.get("schedule"): # 새 기능: 스케줄 데이터 저장
             _save_schedule(user, extracted_data["schedule"], today_str)
                 
-    except (requests.exceptions.RequestException, json.JSONDecodeError, KeyError, IndexError, ValueError) as e:
-        print(f"--- 속성, 활동, 관계 또는 스케줄을 추출하거나 저장할 수 없습니다. 오류: {e} ---")
+    except (requests.exceptions.RequestException, json_service.JSONDecodeError, KeyError, IndexError, ValueError) as e:
+        logger.warning("속성, 활동, 관계 또는 스케줄을 추출하거나 저장할 수 없습니다. 오류: %s", e, extra={"user_id": user.id})
 
 def _get_existing_attributes_context(user):
     existing_attributes = UserAttribute.objects.filter(user=user)
@@ -137,7 +140,7 @@ def _get_existing_relationships_context(user):
     return f"--- 현재 저장된 인물 목록 ---\n{rel_list_str}\n---"
 
 def _save_user_attributes(user, attributes_data):
-    print(f"--- Found Attributes to Create/Update for {user.username}: {attributes_data} ---")
+    logger.info("추출된 사용자 속성 %d건", len(attributes_data), extra={"user_id": user.id})
     for attribute_data in attributes_data:
         action = attribute_data.get('action') # 'action' 필드는 이제 DB 작업에 덜 중요합니다.
         fact_type = attribute_data.get('fact_type')
@@ -154,7 +157,7 @@ def _save_user_attributes(user, attributes_data):
             defaults={'content': content}
         )
         # LLM의 'action' 필드는 이제 DB 메서드를 지시하는 것이 아니라 정보 제공용입니다.
-        print(f"--- Ensured UserAttribute exists (action: {action}): {fact_type}: {content} for {user.username} ---")
+        logger.debug("UserAttribute 저장 (action: %s): %s", action, fact_type, extra={"user_id": user.id})
 
         
 def _save_activity(user, activity_data, today_str):
@@ -164,7 +167,7 @@ def _save_activity(user, activity_data, today_str):
     elif isinstance(activity_data, dict):
         activities_to_save = [activity_data]
     else:
-        print(f"--- Invalid activity_data format: {type(activity_data)} ---")
+        logger.warning("잘못된 activity_data 형식: %s", type(activity_data).__name__, extra={"user_id": user.id})
         return
 
     for single_activity_data in activities_to_save:
@@ -181,7 +184,7 @@ def _save_activity(user, activity_data, today_str):
                 ).exists()
 
                 if is_duplicate:
-                    print(f"--- Duplicate activity found, skipping save: {{memo_content}} ---")
+                    logger.debug("중복 활동이므로 저장 건너뜀", extra={"user_id": user.id})
                     continue  # 중복이므로 이 활동은 건너뜀
             
             time_str = single_activity_data.get('activity_time')
@@ -208,10 +211,10 @@ def _save_activity(user, activity_data, today_str):
                 companion=single_activity_data.get('companion'),
                 memo=memo_content
             )
-            print(f"--- New Activity Saved for {user.username}: {{single_activity_data}} ---")
+            logger.info("새 활동 저장", extra={"user_id": user.id})
 
 def _save_relationships(user, relationships_data):
-    print(f"--- Found Relationships to Create/Update for {user.username}: {relationships_data} ---")
+    logger.info("추출된 인간관계 %d건", len(relationships_data), extra={"user_id": user.id})
     for rel_data in relationships_data:
         name = rel_data.get('name')
         rel_type = rel_data.get('relationship_type')
@@ -229,7 +232,7 @@ def _save_relationships(user, relationships_data):
         if created:
             obj.traits = traits
             obj.save()
-            print(f"--- Created new relationship: {name} ---")
+            logger.debug("새 인간관계 생성", extra={"user_id": user.id})
         else:
             if traits:
                 existing_traits = {t.strip() for t in (obj.traits or "").split(',') if t.strip()}
@@ -237,17 +240,17 @@ def _save_relationships(user, relationships_data):
                 existing_traits.update(new_traits)
                 obj.traits = ", ".join(existing_traits)
                 obj.save()
-                print(f"--- Updated relationship: {name} ---")
+                logger.debug("인간관계 특징 갱신", extra={"user_id": user.id})
 
 def _save_schedule(user, schedule_data, today_str):
-    print(f"--- {user.username}님을 위한 스케줄 생성 요청 발견: {schedule_data} ---")
+    logger.info("스케줄 생성 요청 발견", extra={"user_id": user.id})
     schedules_to_save = []
     if isinstance(schedule_data, list):
         schedules_to_save = schedule_data
     elif isinstance(schedule_data, dict):
         schedules_to_save = [schedule_data]
     else:
-        print(f"--- 잘못된 스케줄 데이터 형식: {type(schedule_data)} ---")
+        logger.warning("잘못된 스케줄 데이터 형식: %s", type(schedule_data).__name__, extra={"user_id": user.id})
         return
 
     for single_schedule_data in schedules_to_save:
@@ -262,7 +265,7 @@ def _save_schedule(user, schedule_data, today_str):
         try:
             parsed_date = datetime.strptime(schedule_date_str, '%Y-%m-%d').date()
         except ValueError:
-            print(f"--- 잘못된 스케줄 날짜 형식: {schedule_date_str} ---")
+            logger.warning("잘못된 스케줄 날짜 형식: %r", schedule_date_str, extra={"user_id": user.id})
             continue
 
         parsed_time = None
@@ -270,7 +273,7 @@ def _save_schedule(user, schedule_data, today_str):
             try:
                 parsed_time = datetime.strptime(schedule_time_str, '%H:%M').time()
             except ValueError:
-                print(f"--- 잘못된 스케줄 시간 형식: {schedule_time_str} ---")
+                logger.warning("잘못된 스케줄 시간 형식: %r", schedule_time_str, extra={"user_id": user.id})
                 # Continue without time if invalid
                 pass
 
@@ -283,6 +286,6 @@ def _save_schedule(user, schedule_data, today_str):
                 content=content, # Include content in lookup for exact match
                 defaults={} # No defaults needed as all fields are in lookup
             )
-            print(f"--- {user.username}님을 위한 스케줄 저장/업데이트 완료: {single_schedule_data} ---")
+            logger.info("스케줄 저장/업데이트 완료 (%s)", parsed_date, extra={"user_id": user.id})
         else:
-            print(f"--- 과거 스케줄 건너뛰기: {single_schedule_data} ---")
+            logger.debug("과거 스케줄 건너뛰기 (%s)", parsed_date, extra={"user_id": user.id})
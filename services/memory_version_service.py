@@ -0,0 +1,67 @@
+#memory_version_service.py
+import logging
+import time
+
+import redis
+
+from .redis_service import get_redis_client
+
+logger = logging.getLogger(__name__)
+
+# 사용자별 메모리 버전: hash field = 범위(scope), value = 마지막 변경 시각(epoch 나노초)
+# 카운터 대신 변경 시각을 쓰므로 키가 만료/유실되어 새로 만들어져도 이전 버전 값과 겹치지 않음 (잘못된 304 방지)
+VERSION_KEY_TTL = 60 * 60 * 24 * 7
+
+# 모델이 바뀌면 어떤 응답의 버전을 올리는지 (UserStatusView는 프로필/속성/관계를 함께 보여줌)
+# 'anonymizer'는 응답이 아니라 파인튜닝 익명화 정규식 캐시(anonymizer_service)의 버전
+SCOPES_BY_MODEL = {
+    'UserProfile': ('status',),
+    'UserAttribute': ('status', 'attribute', 'anonymizer'),
+    'UserRelationship': ('status', 'relationship', 'anonymizer'),
+    'UserSchedule': ('schedule',),
+    'UserActivity': ('activity',),
+}
+
+
+def _version_key(user_id):
+    return f"memory_version:{user_id}"
+
+
+def get_version(user_id, scope):
+    """
+    scope의 현재 버전(나노초 타임스탬프)을 반환합니다. 아직 없으면 지금 시각으로 만들어 반환합니다.
+    Redis가 없거나 오류가 나면 None을 반환하며, 이때 호출하는 쪽은 조건부 응답 없이 전체 응답을 보내야 합니다.
+    """
+    client = get_redis_client()
+    if client is None:
+        return None
+    try:
+        with client.pipeline() as pipe:
+            pipe.hsetnx(_version_key(user_id), scope, time.time_ns())
+            pipe.hget(_version_key(user_id), scope)
+            pipe.expire(_version_key(user_id), VERSION_KEY_TTL)
+            _, version, _ = pipe.execute()
+    except redis.RedisError as e:
+        logger.warning("메모리 버전 조회 실패: %s", e)
+        return None
+    return int(version)
+
+
+def bump(user_id, scopes):
+    """메모리 작성기(모델 저장/삭제 시그널)가 호출합니다. 해당 scope들의 버전을 현재 시각으로 올립니다."""
+    client = get_redis_client()
+    if client is None or not scopes:
+        return
+    now = time.time_ns()
+    try:
+        with client.pipeline() as pipe:
+            pipe.hset(_version_key(user_id), mapping={scope: now for scope in scopes})
+            pipe.expire(_version_key(user_id), VERSION_KEY_TTL)
+            pipe.execute()
+    except redis.RedisError as e:
+        logger.warning("메모리 버전 갱신 실패: %s", e)
+
+
+def bump_for_instance(instance):
+    """저장/삭제된 모델 인스턴스에 해당하는 scope들의 버전을 올립니다."""
+    bump(instance.user_id, SCOPES_BY_MODEL.get(type(instance).__name__, ()))
@@ -0,0 +1,106 @@
+#presence_service.py
+import logging
+import time
+
+import redis
+from django.conf import settings
+
+from .redis_service import get_redis_client
+
+logger = logging.getLogger(__name__)
+
+# 전체 접속 사용자: member = user_id, score = 마지막 하트비트 시각(epoch 초)
+ONLINE_USERS_KEY = "presence:online"
+
+
+def _channels_key(user_id):
+    # 사용자의 소켓별(channel_name) 마지막 하트비트. 한 사용자가 여러 노드/탭에서 접속할 수 있음
+    return f"presence:user:{user_id}"
+
+
+def _alive_since():
+    return time.time() - settings.PRESENCE_TTL
+
+
+def mark_online(user_id, channel_name):
+    """소켓 연결 시와 하트비트마다 호출합니다. PRESENCE_TTL 안에 하트비트가 없으면 오프라인으로 간주됩니다."""
+    client = get_redis_client()
+    if client is None:
+        return
+    now = time.time()
+    try:
+        with client.pipeline() as pipe:
+            pipe.zadd(_channels_key(user_id), {channel_name: now})
+            pipe.expire(_channels_key(user_id), settings.PRESENCE_TTL)
+            pipe.zadd(ONLINE_USERS_KEY, {str(user_id): now})
+            pipe.execute()
+    except redis.RedisError as e:
+        logger.warning("접속 상태 기록 실패: %s", e)
+
+
+def mark_offline(user_id, channel_name):
+    """소켓 연결 종료 시 호출합니다. 사용자의 다른 소켓이 살아 있으면 계속 온라인으로 남습니다."""
+    client = get_redis_client()
+    if client is None:
+        return
+    channels_key = _channels_key(user_id)
+    try:
+        with client.pipeline() as pipe:
+            pipe.zrem(channels_key, channel_name)
+            pipe.zremrangebyscore(channels_key, '-inf', _alive_since())
+            pipe.zcard(channels_key)
+            _, _, remaining = pipe.execute()
+        if not remaining:
+            client.zrem(ONLINE_USERS_KEY, str(user_id))
+    except redis.RedisError as e:
+        logger.warning("접속 종료 기록 실패: %s", e)
+
+
+def is_online(user_id):
+    """
+    사용자가 어느 노드에든 살아 있는 소켓을 가지고 있는지 확인합니다.
+    Redis가 없으면 알 수 없으므로 온라인으로 간주합니다. (기존처럼 소켓 알림을 시도)
+    """
+    client = get_redis_client()
+    if client is None:
+        return True
+    try:
+        score = client.zscore(ONLINE_USERS_KEY, str(user_id))
+    except redis.RedisError as e:
+        logger.warning("접속 상태 조회 실패: %s", e)
+        return True
+    return score is not None and score >= _alive_since()
+
+
+def get_online_user_ids(user_ids=None):
+    """
+    현재 온라인인 사용자 ID 집합을 반환합니다. user_ids를 주면 그 안에서만 확인합니다.
+    Redis가 없으면 None을 반환합니다. (접속 정보 없음)
+    """
+    client = get_redis_client()
+    if client is None:
+        return None
+    alive_since = _alive_since()
+    try:
+        if user_ids is None:
+            return {int(user_id) for user_id in client.zrangebyscore(ONLINE_USERS_KEY, alive_since, '+inf')}
+        user_ids = list(user_ids)
+        if not user_ids:
+            return set()
+        scores = client.zmscore(ONLINE_USERS_KEY, [str(user_id) for user_id in user_ids])
+    except redis.RedisError as e:
+        logger.warning("접속 상태 조회 실패: %s", e)
+        return None
+    return {user_id for user_id, score in zip(user_ids, scores) if score is not None and score >= alive_since}
+
+
+def prune_stale():
+    """하트비트 없이 끊긴(프로세스 비정상 종료 등) 사용자를 전체 접속 목록에서 정리합니다."""
+    client = get_redis_client()
+    if client is None:
+        return 0
+    try:
+        return client.zremrangebyscore(ONLINE_USERS_KEY, '-inf', _alive_since())
+    except redis.RedisError as e:
+        logger.warning("오래된 접속 상태 정리 실패: %s", e)
+        return 0
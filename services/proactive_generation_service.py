@@ -0,0 +1,185 @@
+#proactive_generation_service.py
+import asyncio
+import logging
+import time
+from dataclasses import dataclass
+from typing import List, Optional
+
+import redis
+from django.conf import settings
+from openai import AsyncOpenAI, APIError
+
+from .redis_service import get_redis_client
+from .token_budget_service import count_tokens
+from .emotion_service import analyze_emotion
+from . import proactive_service
+
+logger = logging.getLogger(__name__)
+
+# 모든 워커/샤드가 공유하는 분당 요청 수·토큰 수 버킷
+REQUEST_BUCKET_KEY = "proactive:llm_bucket:requests"
+TOKEN_BUCKET_KEY = "proactive:llm_bucket:tokens"
+
+# 토큰 버킷: 마지막 갱신 이후 흐른 시간만큼 채운 뒤, 요청량이 남아 있으면 차감하고 0을,
+# 모자라면 차감하지 않고 기다려야 할 시간(초)을 반환합니다.
+_TAKE_TOKENS_SCRIPT = """
+local capacity = tonumber(ARGV[1])
+local refill_per_sec = tonumber(ARGV[2])
+local now = tonumber(ARGV[3])
+local requested = tonumber(ARGV[4])
+
+local state = redis.call('hmget', KEYS[1], 'tokens', 'updated_at')
+local tokens = tonumber(state[1]) or capacity
+local updated_at = tonumber(state[2]) or now
+
+tokens = math.min(capacity, tokens + math.max(0, now - updated_at) * refill_per_sec)
+
+local wait = 0
+if tokens >= requested then
+    tokens = tokens - requested
+else
+    wait = (requested - tokens) / refill_per_sec
+end
+
+redis.call('hset', KEYS[1], 'tokens', tokens, 'updated_at', now)
+redis.call('expire', KEYS[1], 120)
+return tostring(wait)
+"""
+
+
+@dataclass(frozen=True, slots=True)
+class ProactiveRequest:
+    """능동 메시지 한 건의 생성 요청 (프롬프트는 동기 코드에서 미리 조립)"""
+    user_id: int
+    username: str
+    trigger_type: str
+    system_prompt: str
+    upcoming_schedule_content: Optional[str] = None
+
+
+@dataclass(frozen=True, slots=True)
+class ProactiveResult:
+    user_id: int
+    message_text: Optional[str]
+    emotion: Optional[str]
+    explanation: Optional[str] = None
+
+
+class TokenBucket:
+    """
+    분당 한도(per_minute)를 초당 속도로 채우는 토큰 버킷.
+    Redis가 있으면 모든 워커가 같은 버킷을 공유하고, 없으면 프로세스 안에서만 한도를 지킵니다.
+    """
+
+    def __init__(self, key, per_minute):
+        self.key = key
+        self.capacity = per_minute
+        self.refill_per_sec = per_minute / 60
+        self._tokens = float(per_minute)
+        self._updated_at = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    def _take_local(self, amount):
+        now = time.monotonic()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated_at) * self.refill_per_sec)
+        self._updated_at = now
+        if self._tokens >= amount:
+            self._tokens -= amount
+            return 0.0
+        return (amount - self._tokens) / self.refill_per_sec
+
+    async def _take(self, amount):
+        client = get_redis_client()
+        if client is not None:
+            try:
+                wait = await asyncio.to_thread(
+                    client.eval, _TAKE_TOKENS_SCRIPT, 1, self.key,
+                    self.capacity, self.refill_per_sec, time.time(), amount,
+                )
+                return float(wait)
+            except redis.RedisError as e:
+                logger.warning("공유 토큰 버킷 조회 실패, 프로세스 내 버킷으로 대체합니다: %s", e)
+        async with self._lock:
+            return self._take_local(amount)
+
+    async def acquire(self, amount=1):
+        """amount만큼의 한도를 얻을 때까지 기다립니다. (한 번에 버킷 용량을 넘는 요청은 용량만큼으로 취급)"""
+        amount = min(amount, self.capacity)
+        while True:
+            wait = await self._take(amount)
+            if wait <= 0:
+                return
+            await asyncio.sleep(wait)
+
+
+class RateLimiter:
+    """동시 요청 수(세마포어) + 분당 요청 수 + 분당 토큰 수를 함께 지키는 LLM 호출 제한기"""
+
+    def __init__(self, concurrency=None, requests_per_minute=None, tokens_per_minute=None):
+        self.semaphore = asyncio.Semaphore(concurrency or settings.PROACTIVE_LLM_CONCURRENCY)
+        self.requests = TokenBucket(REQUEST_BUCKET_KEY, requests_per_minute or settings.PROACTIVE_LLM_REQUESTS_PER_MINUTE)
+        self.tokens = TokenBucket(TOKEN_BUCKET_KEY, tokens_per_minute or settings.PROACTIVE_LLM_TOKENS_PER_MINUTE)
+
+    async def acquire(self, estimated_tokens):
+        await self.requests.acquire(1)
+        await self.tokens.acquire(estimated_tokens)
+
+
+async def _generate_one(client: AsyncOpenAI, limiter: RateLimiter, request: ProactiveRequest) -> ProactiveResult:
+    messages = proactive_service.build_proactive_llm_messages(request.username, request.system_prompt)
+    # 프롬프트 토큰 + 응답 최대 토큰을 미리 차감 (실제 사용량은 이보다 작거나 같음)
+    estimated_tokens = count_tokens(request.system_prompt) + settings.PROACTIVE_LLM_MAX_TOKENS
+
+    async with limiter.semaphore:
+        await limiter.acquire(estimated_tokens)
+        try:
+            response = await client.chat.completions.create(
+                model=proactive_service.get_proactive_model(),
+                messages=messages,
+                temperature=0.7,
+                top_p=0.9,
+                frequency_penalty=0.2,
+                presence_penalty=0.1,
+                max_tokens=settings.PROACTIVE_LLM_MAX_TOKENS,
+                response_format={"type": "json_object"},
+            )
+            message_text, explanation = proactive_service.parse_proactive_response(response.choices[0].message.content)
+        except (APIError, KeyError, IndexError, AttributeError, TypeError, ValueError) as e:
+            logger.warning("능동 메시지 생성 오류: %s", e, extra={"user_id": request.user_id})
+            return ProactiveResult(request.user_id, None, None)
+
+    # 감정 분석은 동기 클라이언트를 사용하므로 스레드에서 실행하여 다른 사용자의 생성과 겹치게 합니다.
+    emotion = None
+    if message_text:
+        await limiter.requests.acquire(1)
+        emotion = await asyncio.to_thread(analyze_emotion, message_text)
+    return ProactiveResult(request.user_id, message_text, emotion, explanation)
+
+
+async def agenerate_batch(requests: List[ProactiveRequest]) -> List[ProactiveResult]:
+    """모든 요청을 동시에 생성합니다. 한 건의 실패가 나머지 생성을 막지 않습니다. (결과 순서 = 요청 순서)"""
+    if not requests:
+        return []
+
+    limiter = RateLimiter()
+    async with AsyncOpenAI() as client:
+        outcomes = await asyncio.gather(
+            *(_generate_one(client, limiter, request) for request in requests),
+            return_exceptions=True,
+        )
+
+    results = []
+    for request, outcome in zip(requests, outcomes):
+        if isinstance(outcome, BaseException):
+            logger.error("능동 메시지 생성 중 예외: %s", outcome, extra={"user_id": request.user_id})
+            outcome = ProactiveResult(request.user_id, None, None)
+        results.append(outcome)
+    return results
+
+
+def generate_batch(requests: List[ProactiveRequest]) -> List[ProactiveResult]:
+    """동기 코드(Celery 태스크)에서 호출하는 진입점. OPENAI_API_KEY가 없으면 모두 실패 결과를 반환합니다."""
+    if not settings.OPENAI_API_KEY:
+        logger.error("OPENAI_API_KEY 환경 변수가 설정되지 않았습니다.")
+        return [ProactiveResult(request.user_id, None, None) for request in requests]
+    return asyncio.run(agenerate_batch(requests))
@@ -0,0 +1,181 @@
+#proactive_scheduler_service.py
+import logging
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.db import close_old_connections, connection
+from django.utils import timezone
+
+from .redis_service import get_redis_client
+from . import proactive_service, proactive_generation_service, presence_service
+from .proactive_generation_service import ProactiveRequest
+
+User = get_user_model()
+logger = logging.getLogger(__name__)
+
+RUN_LOCK_KEY = "proactive:run_lock"
+LAST_RUN_METRICS_KEY = "proactive:last_run"
+
+# 락 소유자(run_id)가 일치할 때만 삭제 (다른 실행의 락을 지우지 않도록)
+_RELEASE_LOCK_SCRIPT = """
+if redis.call('get', KEYS[1]) == ARGV[1] then
+    return redis.call('del', KEYS[1])
+end
+return 0
+"""
+
+
+def acquire_run_lock():
+    """
+    이전 실행이 끝나지 않았으면 None을, 락을 얻으면 이번 실행의 run_id를 반환합니다.
+    락은 PROACTIVE_RUN_LOCK_TTL 후 자동 만료되므로, 실행이 비정상 종료되어도 다음 비트가 영원히 막히지 않습니다.
+    """
+    run_id = uuid.uuid4().hex
+    client = get_redis_client()
+    if client is None:
+        return run_id
+    if client.set(RUN_LOCK_KEY, run_id, nx=True, ex=settings.PROACTIVE_RUN_LOCK_TTL):
+        return run_id
+    return None
+
+
+def release_run_lock(run_id):
+    client = get_redis_client()
+    if client is None:
+        return
+    client.eval(_RELEASE_LOCK_SCRIPT, 1, RUN_LOCK_KEY, run_id)
+
+
+def get_candidates():
+    """
+    이번 실행에서 능동 메시지를 보낼 후보 목록 [(user_id, trigger_type, upcoming_schedule_content), ...]
+    트리거 평가는 SQL에서 끝나므로, 조건에 맞는 소수의 사용자만 샤드로 분배됩니다.
+    지금 접속 중인 사용자를 앞쪽 샤드에 배치하여 바로 읽을 수 있는 사용자부터 생성합니다.
+    """
+    candidates = proactive_service.get_eligible_proactive_triggers()
+    presence_service.prune_stale()
+    online_user_ids = presence_service.get_online_user_ids(user_id for user_id, _, _ in candidates)
+    if online_user_ids:
+        candidates.sort(key=lambda candidate: candidate[0] not in online_user_ids)
+    return candidates
+
+
+def split_into_shards(candidates, shard_size=None):
+    shard_size = shard_size or settings.PROACTIVE_SHARD_SIZE
+    return [candidates[i:i + shard_size] for i in range(0, len(candidates), shard_size)]
+
+
+def _prepare_candidate(candidate):
+    """한 사용자의 능동 메시지 프롬프트를 조립합니다. (DB 조회) 실패하면 None"""
+    user_id, trigger_type, upcoming_schedule_content = candidate
+    close_old_connections()
+    try:
+        user = User.objects.select_related('profile').get(id=user_id)
+        system_prompt = proactive_service.build_proactive_system_prompt(user, trigger_type, upcoming_schedule_content)
+        if system_prompt is None:
+            return None
+        return user, ProactiveRequest(user.id, user.username, trigger_type, system_prompt, upcoming_schedule_content)
+    except Exception as e:
+        logger.warning("능동 메시지 프롬프트 준비 중 오류: %s", e, extra={"user_id": user_id})
+        return None
+    finally:
+        # 워커 스레드마다 열린 DB 커넥션을 정리
+        connection.close()
+
+
+def _save_result(prepared_and_result):
+    """생성 결과를 저장하고 알립니다. 결과: 'sent' | 'error'"""
+    (user, request), result = prepared_and_result
+    close_old_connections()
+    try:
+        proactive_message_obj = proactive_service.save_proactive_message(
+            user, request.trigger_type, result.message_text, result.emotion, request.upcoming_schedule_content
+        )
+        logger.debug("능동 메시지(%s) 생성 완료: %s...", request.trigger_type, proactive_message_obj.message[:20], extra={"user_id": user.id})
+        return 'sent'
+    except Exception as e:
+        logger.warning("능동 메시지 저장 중 오류: %s", e, extra={"user_id": user.id})
+        return 'error'
+    finally:
+        connection.close()
+
+
+def process_shard(candidates):
+    """
+    샤드 하나에 속한 후보 사용자들을 처리하고 샤드 지표를 반환합니다.
+    1) 프롬프트 조립(DB)은 PROACTIVE_SHARD_CONCURRENCY개의 스레드로,
+    2) LLM 생성과 감정 분석은 모든 사용자를 한꺼번에 비동기로(공유 속도 제한 안에서),
+    3) 저장/알림은 다시 스레드로 처리합니다.
+    샤드 처리 중 예외가 나도 예외를 올리지 않고 실패 지표를 반환합니다.
+    (chord의 한 샤드라도 실패하면 finalize가 실행되지 않아 실행 락이 TTL 동안 남기 때문)
+    """
+    started = time.monotonic()
+    try:
+        return _process_shard(candidates, started)
+    except Exception:
+        logger.exception("능동 메시지 샤드 처리 실패 (사용자 %d명)", len(candidates))
+        return {
+            'users': len(candidates),
+            'sent': 0,
+            'skipped': 0,
+            'errors': len(candidates),
+            'failed': True,
+            'llm_failures': 0,
+            'llm_duration': 0,
+            'duration': round(time.monotonic() - started, 3),
+        }
+
+
+def _process_shard(candidates, started):
+    with ThreadPoolExecutor(max_workers=settings.PROACTIVE_SHARD_CONCURRENCY) as executor:
+        prepared = [item for item in executor.map(_prepare_candidate, candidates) if item is not None]
+
+    llm_started = time.monotonic()
+    results = proactive_generation_service.generate_batch([request for _, request in prepared])
+    llm_seconds = time.monotonic() - llm_started
+
+    with ThreadPoolExecutor(max_workers=settings.PROACTIVE_SHARD_CONCURRENCY) as executor:
+        outcomes = list(executor.map(_save_result, zip(prepared, results)))
+
+    return {
+        'users': len(candidates),
+        'sent': outcomes.count('sent'),
+        'skipped': len(candidates) - len(prepared),
+        'errors': outcomes.count('error'),
+        'failed': False,
+        'llm_failures': sum(1 for result in results if not result.message_text),
+        'llm_duration': round(llm_seconds, 3),
+        'duration': round(time.monotonic() - started, 3),
+    }
+
+
+def record_run_metrics(run_id, shard_results, started_at, total_users):
+    """모든 샤드 결과를 합산하여 이번 실행의 지표를 기록하고 반환합니다."""
+    metrics = {
+        'run_id': run_id,
+        'started_at': started_at,
+        'finished_at': timezone.now().isoformat(),
+        'users': total_users,
+        'shards': len(shard_results),
+        'sent': sum(result['sent'] for result in shard_results),
+        'skipped': sum(result['skipped'] for result in shard_results),
+        'errors': sum(result['errors'] for result in shard_results),
+        'failed_shards': sum(1 for result in shard_results if result.get('failed')),
+        'llm_failures': sum(result.get('llm_failures', 0) for result in shard_results),
+        'slowest_llm_seconds': max((result.get('llm_duration', 0) for result in shard_results), default=0),
+        'slowest_shard_seconds': max((result['duration'] for result in shard_results), default=0),
+    }
+    metrics['wall_seconds'] = round(
+        (timezone.now() - datetime.fromisoformat(started_at)).total_seconds(), 3
+    )
+
+    client = get_redis_client()
+    if client is not None:
+        client.hset(LAST_RUN_METRICS_KEY, mapping={key: str(value) for key, value in metrics.items()})
+
+    logger.info("능동 메시지 실행 지표", extra=metrics)
+    return metrics
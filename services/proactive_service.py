@@ -1,54 +1,131 @@
 #proactive_service.py
 from api.models import ChatMessage, PendingProactiveMessage
+from django.contrib.auth import get_user_model
+from django.db.models import Max, OuterRef, Q, Subquery
+from django.conf import settings
 from django.utils import timezone
 from datetime import timedelta, datetime, date, time
+import logging
 import os
 import requests
-import json
 import re
 from .chat_service import _assemble_context_data # 필요한 함수 임포트
 from .prompt_service import build_persona_system_prompt, build_rag_instructions_prompt
+from .token_budget_service import pack_contexts
 from .emotion_service import analyze_emotion
-from . import schedule_service 
+from . import schedule_service, presence_service, json_service
 from channels.layers import get_channel_layer
 from asgiref.sync import async_to_sync
 
+User = get_user_model()
+logger = logging.getLogger(__name__)
 
-def _check_upcoming_schedule(user):
-    today = date.today()
-    schedules = schedule_service.get_schedules_for_day(user, today)
-    now_korea = timezone.now().astimezone(timezone.get_default_timezone())
+# 시간대 기반 트리거: (시작 시, 종료 시, 트리거 타입)
+TIME_WINDOW_TRIGGERS = [
+    (6, 10, "morning_greeting"),
+    (12, 14, "lunch_time"),
+    (18, 22, "evening_greeting"),
+]
+INACTIVITY_GAP = timedelta(hours=1)
+TIME_WINDOW_GAP = timedelta(minutes=30)
 
-    for schedule in schedules:
-        if schedule.schedule_time and schedule.content:
-            # 오늘 날짜와 스케줄 시간을 결합하여 datetime 객체 생성
-            schedule_datetime = datetime.combine(today, schedule.schedule_time)
-            schedule_datetime = timezone.make_aware(schedule_datetime, timezone.get_default_timezone())
 
-            time_until_schedule = schedule_datetime - now_korea
-
-            # 스케줄이 10분 이내로 다가왔고 과거가 아닌지 확인
-            if timedelta(minutes=0) < time_until_schedule <= timedelta(minutes=10):
-                return schedule.content # 가장 빨리 다가오는 스케줄 내용 반환
+def _current_time_window_trigger(now_korea):
+    for start_hour, end_hour, trigger_type in TIME_WINDOW_TRIGGERS:
+        if start_hour <= now_korea.hour < end_hour:
+            return trigger_type
     return None
 
+
+def get_eligible_proactive_triggers(user_ids=None):
+    """
+    능동 메시지 트리거 조건을 SQL에서 평가하여, 실제로 트리거에 해당하는 사용자만 반환합니다.
+    반환 형식: [(user_id, trigger_type, upcoming_schedule_content), ...]
+
+    - 마지막 대화 시각은 Subquery(Max('timestamp'))로 한 번에 annotate합니다.
+    - 읽지 않은 능동 메시지(PendingProactiveMessage)가 있는 사용자는 쿼리 단계에서 제외합니다.
+    - 임박한 일정 알림은 여기서 폴링하지 않고 schedule_reminder_service의 타이머 휠이 발송합니다.
+    """
+    korea_tz = timezone.get_default_timezone()
+    now_korea = timezone.now().astimezone(korea_tz)
+
+    last_chat_subquery = (
+        ChatMessage.objects.filter(user=OuterRef('pk'))
+        .values('user')
+        .annotate(last_timestamp=Max('timestamp'))
+        .values('last_timestamp')
+    )
+
+    eligibility = Q(last_chat_at__lt=now_korea - INACTIVITY_GAP)
+    time_window_trigger = _current_time_window_trigger(now_korea)
+    if time_window_trigger:
+        eligibility |= Q(last_chat_at__isnull=True) | Q(last_chat_at__lt=now_korea - TIME_WINDOW_GAP)
+
+    users = (
+        User.objects.filter(is_active=True, pending_proactive_message__isnull=True)
+        .annotate(last_chat_at=Subquery(last_chat_subquery))
+        .filter(eligibility)
+        .order_by('id')
+    )
+    if user_ids is not None:
+        users = users.filter(id__in=user_ids)
+
+    triggers = []
+    for user_id, last_chat_at in users.values_list('id', 'last_chat_at'):
+        if last_chat_at and now_korea - last_chat_at > INACTIVITY_GAP:
+            triggers.append((user_id, "inactivity", None))
+        elif time_window_trigger:
+            triggers.append((user_id, time_window_trigger, None))
+    return triggers
+
+def _render_proactive_contexts(user):
+    """능동 메시지용 기억 컨텍스트를 채팅 경로와 같은 렌더링 결과로, 토큰 예산 안에서 한 블록으로 만듭니다."""
+    contexts = _assemble_context_data(user, "")
+    return "\n".join(value for value in pack_contexts(contexts).values() if value)
+
+PROACTIVE_RESPONSE_INSTRUCTION = "제공된 사용자 정보와 기억 컨텍스트를 적극적으로 활용하여 메시지를 생성해줘. 너의 페르소나에 맞게 재치있고 흥미롭게 말을 걸어줘. 응답은 반드시 JSON 형식으로 'answer' 키와 'explanation' 키를 포함해야 해."
+
+# LLM 호출이 실패했을 때 사용할 트리거별 기본 메시지와 감정
+FALLBACK_MESSAGES = {
+    "inactivity": ("오랜만이야! 뭐 하고 지냈어?", "default"),
+    "morning_greeting": ("좋은 아침이야!", "happy"),
+    "lunch_time": ("점심시간이야! 뭐 먹을지 고민돼?", "thinking"),
+    "evening_greeting": ("오늘 하루도 수고했어!", "default"),
+    "upcoming_schedule": ("곧 '{content}' 일정이 있어! 준비는 잘 되고 있어?", "default"),
+}
+
+
+def get_proactive_model():
+    return os.getenv("FINETUNED_MODEL_ID", "gpt-4.1")
+
+
+def build_proactive_llm_messages(username, system_prompt):
+    """능동 메시지 생성 요청에 사용할 messages 리스트 (동기/비동기 경로 공용)"""
+    return [
+        {'role': 'system', 'content': system_prompt},
+        {'role': 'user', 'content': f"{username}님에게 능동적인 대화를 시작할 메시지를 생성해줘."}
+    ]
+
+
+def parse_proactive_response(content):
+    """LLM의 JSON 응답에서 (메시지, 설명)을 꺼냅니다. 형식이 잘못되면 JSONDecodeError/AttributeError가 발생합니다."""
+    content_from_llm = json_service.loads(content)
+    message_text = content_from_llm.get('answer', '').strip()
+    explanation = content_from_llm.get('explanation', '설명 없음.')
+    return message_text, explanation
+
+
 def _call_llm_for_proactive_message(user, system_prompt):
     api_key = os.environ.get("OPENAI_API_KEY")
     if not api_key:
-        print("오류: OPENAI_API_KEY 환경 변수가 설정되지 않았습니다.")
-        return None, None
+        logger.error("OPENAI_API_KEY 환경 변수가 설정되지 않았습니다.")
+        return None, None, None
 
-    model_to_use = os.getenv("FINETUNED_MODEL_ID", "gpt-4.1")
     headers = {"Authorization": f"Bearer {api_key}", "Content-Type": "application/json"}
 
-    messages = [
-        {'role': 'system', 'content': system_prompt},
-        {'role': 'user', 'content': f"{user.username}님에게 능동적인 대화를 시작할 메시지를 생성해줘."}
-    ]
-
     data = {
-        "model": model_to_use,
-        "messages": messages,
+        "model": get_proactive_model(),
+        "messages": build_proactive_llm_messages(user.username, system_prompt),
         "temperature": 0.7,
         "top_p": 0.9,
         "frequency_penalty": 0.2,
@@ -57,125 +134,124 @@ def _call_llm_for_proactive_message(user, system_prompt):
     }
 
     try:
-        response = requests.post("https://api.openai.com/v1/chat/completions", headers=headers, json=data)
+        response = json_service.post_json(f"{settings.OPENAI_API_BASE_URL}/chat/completions", data, headers=headers)
         response.raise_for_status()
-        response_json = response.json()
+        response_json = json_service.response_json(response)
         
-        content_from_llm = json.loads(response_json['choices'][0]['message']['content'])
-        message_text = content_from_llm.get('answer', '').strip()
-        explanation = content_from_llm.get('explanation', '설명 없음.') # Extract explanation
+        message_text, explanation = parse_proactive_response(response_json['choices'][0]['message']['content'])
         emotion = analyze_emotion(message_text) # emotion_service를 사용하여 감정 분석 
 
-        print("\n" + "-"*20 + " [Debug] Proactive Message Explanation " + "-"*20)
-        print(explanation)
-        print("-"*66 + "\n")
+        logger.debug("능동 메시지 생성 근거: %s", explanation, extra={"user_id": user.id})
 
         return message_text, emotion, explanation # Return explanation
-    except (requests.exceptions.RequestException, KeyError, IndexError, json.JSONDecodeError) as e:
-        print(f"LLM 능동적 메시지 생성 오류: {e}")
+    except (requests.exceptions.RequestException, KeyError, IndexError, AttributeError, json_service.JSONDecodeError):
+        logger.exception("LLM 능동적 메시지 생성 오류", extra={"user_id": user.id})
         return None, None, None # Return None for explanation on error
 
 
-def generate_proactive_message(user):
-    last_chat = ChatMessage.objects.filter(user=user).order_by('-timestamp').first()
-    korea_tz = timezone.get_default_timezone()
-    now_korea = timezone.now().astimezone(korea_tz)
-    
-    trigger_type = None
-    proactive_instruction_base = ""
-    message_text = None
-    emotion = "default"
-
-    # 1. 비활동 기반 트리거
-    if last_chat and (now_korea - last_chat.timestamp.astimezone(korea_tz)) > timedelta(hours=1):
-        trigger_type = "inactivity"
-        proactive_instruction_base = f"너는 {user.username}님에게 오랜만에 말을 거는 상황이야. 1시간 이상 대화가 없었으니, {user.username}님의 안부를 묻거나, "
+def _get_proactive_instruction_base(user, trigger_type, upcoming_schedule_content=None):
+    if trigger_type == "inactivity":
+        return f"너는 {user.username}님에게 오랜만에 말을 거는 상황이야. 1시간 이상 대화가 없었으니, {user.username}님의 안부를 묻거나, "
+    if trigger_type == "morning_greeting":
+        return f"좋은 아침이야, {user.username}! 오늘 하루를 활기차게 시작할 수 있도록 응원하는 메시지를 생성해줘. "
+    if trigger_type == "lunch_time":
+        return f"{user.username}님, 점심시간이야! 맛있는 점심을 추천하거나, 점심 관련 가벼운 대화를 시작하는 메시지를 생성해줘. "
+    if trigger_type == "evening_greeting":
+        return f"{user.username}님, 저녁 시간이야! 오늘 하루는 어땠는지 묻거나, 편안한 저녁을 보낼 수 있도록 격려하는 메시지를 생성해줘. "
+    if trigger_type == "upcoming_schedule":
+        return f"{user.username}님, 곧 일정이 있어! '{upcoming_schedule_content}' 일정이 10분 이내로 다가왔으니, 일정을 상기시켜주거나, 준비를 돕는 메시지를 생성해줘. "
+    return None
+
+
+def build_proactive_system_prompt(user, trigger_type, upcoming_schedule_content=None):
+    """
+    트리거에 맞는 능동 메시지 시스템 프롬프트를 조립합니다. (DB 조회가 필요하므로 동기 코드에서 호출)
+    알 수 없는 트리거면 None을 반환합니다.
+    """
+    proactive_instruction_base = _get_proactive_instruction_base(user, trigger_type, upcoming_schedule_content)
+    if proactive_instruction_base is None:
+        logger.warning("알 수 없는 능동 메시지 트리거: %s", trigger_type, extra={"user_id": user.id})
+        return None
+
+    persona_system_prompt = build_persona_system_prompt(user)
+    rag_instructions_prompt = build_rag_instructions_prompt(user)
+    assembled_contexts_str = _render_proactive_contexts(user)
+    if assembled_contexts_str:
+        assembled_contexts_str = "\n## 사용자 기억 컨텍스트 ##\n" + assembled_contexts_str
+
+    proactive_instruction = f"{proactive_instruction_base}{PROACTIVE_RESPONSE_INSTRUCTION}"
+    return f"{persona_system_prompt}{rag_instructions_prompt}{assembled_contexts_str}\n\n## 능동적 대화 지시 ##\n{proactive_instruction}"
+
+
+def save_proactive_message(user, trigger_type, message_text, emotion, upcoming_schedule_content=None):
+    """
+    생성된 능동 메시지를 저장하고 읽지 않은 메시지로 등록한 뒤 사용자에게 알립니다.
+    LLM 생성에 실패했으면(message_text가 비어 있으면) 트리거별 기본 메시지를 사용합니다.
+    """
+    if not message_text:
+        fallback_text, emotion = FALLBACK_MESSAGES[trigger_type]
+        message_text = fallback_text.format(content=upcoming_schedule_content)
+
+    # ChatMessage 객체 생성 및 저장
+    proactive_chat_message = ChatMessage.objects.create(
+        user=user,
+        message=message_text,
+        is_user=False,
+        character_emotion=emotion or "default"
+    )
     
-    # 2. 시간대 기반 트리거
-    elif not last_chat or (now_korea - last_chat.timestamp.astimezone(korea_tz)) > timedelta(minutes=30):
-        current_hour = now_korea.hour
-        if 6 <= current_hour < 10:
-            trigger_type = "morning_greeting"
-            proactive_instruction_base = f"좋은 아침이야, {user.username}! 오늘 하루를 활기차게 시작할 수 있도록 응원하는 메시지를 생성해줘. "
-        elif 12 <= current_hour < 14:
-            trigger_type = "lunch_time"
-            proactive_instruction_base = f"{user.username}님, 점심시간이야! 맛있는 점심을 추천하거나, 점심 관련 가벼운 대화를 시작하는 메시지를 생성해줘. "
-        elif 18 <= current_hour < 22:
-            trigger_type = "evening_greeting"
-            proactive_instruction_base = f"{user.username}님, 저녁 시간이야! 오늘 하루는 어땠는지 묻거나, 편안한 저녁을 보낼 수 있도록 격려하는 메시지를 생성해줘. "
-
-    # 3. 일정 알림 트리거
-    upcoming_schedule_content = _check_upcoming_schedule(user)
-    if upcoming_schedule_content:
-        trigger_type = "upcoming_schedule"
-        proactive_instruction_base = f"{user.username}님, 곧 일정이 있어! '{upcoming_schedule_content}' 일정이 10분 이내로 다가왔으니, 일정을 상기시켜주거나, 준비를 돕는 메시지를 생성해줘. "
-
-    if trigger_type:
-        persona_system_prompt = build_persona_system_prompt(user)
-        rag_instructions_prompt = build_rag_instructions_prompt(user)
-        assembled_contexts_dict = _assemble_context_data(user, "")
-        assembled_contexts_str = "\n".join([f"[{key.replace('_', ' ').capitalize()}]: {value}" for key, value in assembled_contexts_dict.items() if value])
-        if assembled_contexts_str:
-            assembled_contexts_str = "\n## 사용자 기억 컨텍스트 ##\n" + assembled_contexts_str
-        
-        proactive_instruction = f"{proactive_instruction_base}제공된 사용자 정보와 기억 컨텍스트를 적극적으로 활용하여 메시지를 생성해줘. 너의 페르소나에 맞게 재치있고 흥미롭게 말을 걸어줘. 응답은 반드시 JSON 형식으로 'answer' 키와 'explanation' 키를 포함해야 해."
-        system_prompt = f"{persona_system_prompt}{rag_instructions_prompt}{assembled_contexts_str}\n\n## 능동적 대화 지시 ##\n{proactive_instruction}"
-        
-        message_text, emotion, explanation = _call_llm_for_proactive_message(user, system_prompt)
-
-        # LLM 호출 실패 시 기본 메시지 설정
-        if not message_text:
-            emotion = "default"
-            if trigger_type == "inactivity":
-                message_text = "오랜만이야! 뭐 하고 지냈어?"
-            elif trigger_type == "morning_greeting":
-                message_text = "좋은 아침이야!"
-                emotion = "happy"
-            elif trigger_type == "lunch_time":
-                message_text = "점심시간이야! 뭐 먹을지 고민돼?"
-                emotion = "thinking"
-            elif trigger_type == "evening_greeting":
-                message_text = "오늘 하루도 수고했어!"
-            elif trigger_type == "upcoming_schedule":
-                message_text = f"곧 '{upcoming_schedule_content}' 일정이 있어! 준비는 잘 되고 있어?"
-
-    if message_text:
-        # ChatMessage 객체 생성 및 저장
-        proactive_chat_message = ChatMessage.objects.create(
-            user=user,
-            message=message_text,
-            is_user=False,
-            character_emotion=emotion
-        )
-        
-        # 벡터 DB에 저장
-        try:
-            from . import vector_service
-            collection = vector_service.get_or_create_collection()
-            vector_service.upsert_message(collection, proactive_chat_message)
-            print("--- [디버그] 능동 메시지 벡터 DB 저장 완료 ---")
-        except Exception as e:
-            print(f"--- [오류] 능동 메시지 벡터 DB 저장 실패: {e} ---")
-
-        # 읽지 않은 메시지로 등록
-        PendingProactiveMessage.objects.update_or_create(
-            user=user,
-            defaults={'message': proactive_chat_message}
-        )
-        print(f"--- [디버그] {user.username}님에게 읽지 않은 능동 메시지 등록 완료 ---")
-
-        _notify_user_of_proactive_message(user.id)
-            
-        return proactive_chat_message
-
-    return None # 능동적인 메시지가 생성되지 않음
+    # 벡터 DB에 저장
+    try:
+        from . import vector_service
+        collection = vector_service.get_or_create_collection()
+        vector_service.upsert_message(collection, proactive_chat_message)
+        logger.debug("능동 메시지 벡터 DB 저장 완료", extra={"user_id": user.id})
+    except Exception:
+        logger.exception("능동 메시지 벡터 DB 저장 실패", extra={"user_id": user.id})
+
+    # 읽지 않은 메시지로 등록
+    PendingProactiveMessage.objects.update_or_create(
+        user=user,
+        defaults={'message': proactive_chat_message}
+    )
+    logger.debug("읽지 않은 능동 메시지 등록 완료", extra={"user_id": user.id})
+
+    _notify_user_of_proactive_message(user.id)
+
+    return proactive_chat_message
+
+
+def generate_proactive_message(user, trigger_type=None, upcoming_schedule_content=None):
+    """
+    트리거에 맞는 능동 메시지를 한 건 생성하고 저장합니다. (일정 알림 등 단건 경로)
+    트리거 없이 호출되면 해당 사용자 한 명에 대해서만 트리거를 평가합니다.
+    스케줄러의 대량 생성은 proactive_generation_service가 비동기로 동시에 처리합니다.
+    """
+    if trigger_type is None:
+        eligible = get_eligible_proactive_triggers(user_ids=[user.id])
+        if not eligible:
+            return None # 트리거에 해당하지 않음
+        _, trigger_type, upcoming_schedule_content = eligible[0]
+
+    system_prompt = build_proactive_system_prompt(user, trigger_type, upcoming_schedule_content)
+    if system_prompt is None:
+        return None
+
+    message_text, emotion, explanation = _call_llm_for_proactive_message(user, system_prompt)
+    return save_proactive_message(user, trigger_type, message_text, emotion, upcoming_schedule_content)
 
 def _notify_user_of_proactive_message(user_id):
     """
-    유저에게 읽지 않은 능동 메시지가 있음을 웹소켓 채널로 알립니다.
+    유저에게 읽지 않은 능동 메시지가 있음을 알리고, 사용한 전달 경로('socket' | 'inbox')를 반환합니다.
+    어느 노드에도 접속해 있지 않은 사용자에게는 channel layer 전송을 생략합니다.
+    (메시지는 PendingProactiveMessage로 남아 있으므로 다음 접속 시 받아 가며, 푸시 알림을 붙일 곳도 이 분기입니다)
     """
+    if not presence_service.is_online(user_id):
+        logger.debug("오프라인 사용자: 소켓 알림 생략, 읽지 않은 메시지함으로 전달", extra={"user_id": user_id})
+        return 'inbox'
+
     channel_layer = get_channel_layer()
-    group_name = f'chat_user_{user_id}' # 사용자별 채널 그룹 이름 (consumers.py에서 연결 가정)
+    group_name = f'chat_user_{user_id}' # consumers.py의 room_group_name과 동일
 
     # 비동기 함수를 동기 환경에서 호출하기 위해 async_to_sync 사용
     async_to_sync(channel_layer.group_send)(
@@ -185,7 +261,8 @@ def _notify_user_of_proactive_message(user_id):
             'message': 'new_proactive_message_available'
         }
     )
-    print(f"--- [정보] User {user_id}에게 능동 메시지 알림 전송 완료 ---")
+    logger.debug("능동 메시지 알림 전송 완료", extra={"user_id": user_id})
+    return 'socket'
 
 
 
@@ -205,12 +282,11 @@ def get_proactive_message_for_timer(user):
     persona_system_prompt = build_persona_system_prompt(user)
     rag_instructions_prompt = build_rag_instructions_prompt(user)
     # user_message_for_llm은 빈 문자열로 전달 (사용자가 보낸 메시지가 없으므로)
-    assembled_contexts_dict = _assemble_context_data(user, "") 
-    assembled_contexts_str = "\n".join([f"[{key.replace('_', ' ').capitalize()}]: {value}" for key, value in assembled_contexts_dict.items() if value])
+    assembled_contexts_str = _render_proactive_contexts(user)
     if assembled_contexts_str:
         assembled_contexts_str = "\n## 사용자 기억 컨텍스트 ##\n" + assembled_contexts_str
         
-    proactive_instruction = f"{proactive_instruction_base}제공된 사용자 정보와 기억 컨텍스트를 적극적으로 활용하여 메시지를 생성해줘. 너의 페르소나에 맞게 재치있고 흥미롭게 말을 걸어줘. 응답은 반드시 JSON 형식으로 'answer' 키와 'explanation' 키를 포함해야 해."
+    proactive_instruction = f"{proactive_instruction_base}{PROACTIVE_RESPONSE_INSTRUCTION}"
     system_prompt = f"{persona_system_prompt}{rag_instructions_prompt}{assembled_contexts_str}\n\n## 능동적 대화 지시 ##\n{proactive_instruction}"
     
     # 3. LLM 호출 (_call_llm_for_proactive_message 재활용)
@@ -0,0 +1,72 @@
+#profile_service.py
+import logging
+
+from asgiref.sync import async_to_sync
+from channels.layers import get_channel_layer
+from django.contrib.auth import get_user_model
+
+from api.models import UserProfile
+
+from . import presence_service
+
+User = get_user_model()
+logger = logging.getLogger(__name__)
+
+
+def get_profile(user):
+    """
+    user.profile을 한 번만 조회해 반환합니다. 프로필이 없으면 None.
+    인증 단계에서 select_related('profile')로 채워 두었다면 쿼리가 발생하지 않습니다.
+    """
+    try:
+        return user.profile
+    except (UserProfile.DoesNotExist, AttributeError):
+        return None
+
+
+def load_profile(user_id):
+    """DB에서 최신 프로필을 다시 읽습니다. (변경 알림을 받은 Consumer가 스냅샷을 갱신할 때 사용)"""
+    return UserProfile.objects.filter(user_id=user_id).first()
+
+
+def attach_profile(user, profile):
+    """user.profile 캐시를 주어진 프로필로 교체하여 이후 접근이 DB를 조회하지 않도록 합니다."""
+    if profile is not None:
+        UserProfile.user.field.set_cached_value(profile, user)
+    User.profile.related.set_cached_value(user, profile)
+
+
+# 바뀌면 Consumer의 프로필 스냅샷을 갱신해야 하는 필드 (memory에는 롤링 대화 요약이 있음)
+PROMPT_FIELDS = frozenset({'chatbot_name', 'memory'})
+
+
+def is_prompt_relevant_change(profile, changed_fields):
+    """
+    이번 저장이 접속 중인 Consumer의 프롬프트에 영향을 주는지 판단합니다. (변경 필드를 모르면 True)
+    호감도는 매 턴 조금씩 바뀌므로, 페르소나 규칙이 달라지는 구간(낮음/보통/높음)을 넘을 때만 알립니다.
+    """
+    if changed_fields is None:
+        return True
+    if PROMPT_FIELDS.intersection(changed_fields):
+        return True
+    if 'affinity_score' in changed_fields:
+        from .prompt_service import get_affinity_band # 순환 임포트 방지
+        previous = profile.get_saved_value('affinity_score', profile.affinity_score)
+        return get_affinity_band(previous) != get_affinity_band(profile.affinity_score)
+    return False
+
+
+def notify_profile_changed(user_id):
+    """
+    프로필이 바뀌었음을 사용자의 웹소켓 그룹에 알립니다. 접속 중인 Consumer는 프로필 스냅샷을 다시 읽습니다.
+    접속하지 않은 사용자에게는 보내지 않으며, 알림 실패가 저장을 막지 않도록 예외는 기록만 합니다.
+    """
+    if not presence_service.is_online(user_id):
+        return
+    try:
+        async_to_sync(get_channel_layer().group_send)(
+            f'chat_user_{user_id}', # consumers.py의 room_group_name과 동일
+            {'type': 'profile.changed'}
+        )
+    except Exception as e:
+        logger.warning("프로필 변경 알림 실패: %s", e, extra={"user_id": user_id})
@@ -1,4 +1,21 @@
 #prompt_service.py
+from .token_budget_service import pack_contexts
+from .summary_service import get_conversation_summary
+from .profile_service import get_profile
+
+DEFAULT_AFFINITY_SCORE = 50 # 프로필이 없을 때 적용하는 중간 호감도
+DEFAULT_CHATBOT_NAME = "아이"
+LOW_AFFINITY_THRESHOLD = 30 # 미만이면 낮은 호감도 페르소나
+HIGH_AFFINITY_THRESHOLD = 70 # 이상이면 높은 호감도 페르소나
+
+
+def get_affinity_band(affinity):
+    """호감도 점수가 속한 페르소나 구간: 'low' | 'medium' | 'high'"""
+    if affinity < LOW_AFFINITY_THRESHOLD:
+        return 'low'
+    if affinity >= HIGH_AFFINITY_THRESHOLD:
+        return 'high'
+    return 'medium'
 
 def build_final_system_prompt(user, time_contexts, assembled_contexts, image_analysis_context=None):
     """모든 컨텍스트를 조합하여 최종 시스템 프롬프트를 생성합니다."""
@@ -14,15 +31,23 @@ def build_final_system_prompt(user, time_contexts, assembled_contexts, image_ana
             f"** 현재 사용자는 이미지에 대한 대화를 하고 싶어해. 이 이미지를 대화에 활용해**\n"
         )
 
-    # 추가 컨텍스트 문자열 생성
-    context_list = [f"[사용자에 대한 현재 호감도 점수]: {user.profile.affinity_score}점"]
-    for key, value in assembled_contexts.items():
+    # 추가 컨텍스트 문자열 생성 (토큰 예산 안에서 우선순위대로 채움)
+    profile = get_profile(user)
+    affinity = profile.affinity_score if profile else DEFAULT_AFFINITY_SCORE
+    context_list = [f"[사용자에 대한 현재 호감도 점수]: {affinity}점"]
+    for key, value in pack_contexts(assembled_contexts).items():
         if value:
             context_list.append(value)
     context_string = "\n".join(context_list)
 
-    persona_system_prompt = build_persona_system_prompt(user)
-    rag_instructions_prompt = build_rag_instructions_prompt(user)
+    # 롤링 대화 요약 (오래된 대화는 요약으로, 최근 대화는 원문 메시지로 전달)
+    summary_str = ""
+    conversation_summary = get_conversation_summary(user)
+    if conversation_summary:
+        summary_str = f"\n[이전 대화 요약]: {conversation_summary}"
+
+    persona_system_prompt = build_persona_system_prompt(user, profile)
+    rag_instructions_prompt = build_rag_instructions_prompt(user, profile)
 
     final_prompt = (
     f"{persona_system_prompt}"
@@ -31,28 +56,30 @@ def build_final_system_prompt(user, time_contexts, assembled_contexts, image_ana
     f"{current_time_context}\n"
     f"{time_awareness_context}\n"
     f"{context_string}"
+    f"{summary_str}"
     f"{image_context_str}"
     f"\n\n**너의 답변은 오직 {user.username}님에게 보내는 순수한 텍스트 메시지여야 하며, 다른 부가적인 형식(JSON, XML 등)은 절대 사용해서는 안 돼.**\n"
     )
     return final_prompt
     
-def build_persona_system_prompt(user):
-    """AI 캐릭터 '아이'의 시스템 프롬프트를 생성하며, 호감도에 따라 페르소나를 동적으로 조정합니다."""
-    
-    # 🚨 수정된 부분: user.profile 접근 안전화 및 기본값 설정
-    if hasattr(user, 'profile'):
+def build_persona_system_prompt(user, profile=None):
+    """
+    AI 캐릭터 '아이'의 시스템 프롬프트를 생성하며, 호감도에 따라 페르소나를 동적으로 조정합니다.
+    호출자가 이미 가져온 profile을 넘기면 프로필을 다시 조회하지 않습니다.
+    """
+    if profile is None:
+        profile = get_profile(user)
+
+    if profile is not None:
         # 프로필이 있으면 실제 호감도를 사용
-        affinity = user.profile.affinity_score
-        chatbot_name = user.profile.chatbot_name
+        affinity = profile.affinity_score
+        chatbot_name = profile.chatbot_name
     else:
-        # 프로필이 없으면 기본 호감도(예: 50, 중간)와 기본 이름을 사용
+        # 프로필이 없으면 기본 호감도(중간)와 기본 이름을 사용
         # 이 경우, 이 사용자는 중간 호감도 규칙을 적용받게 됩니다.
-        affinity = 50 
-        chatbot_name = "아이" # 기본 챗봇 이름 설정
-        
-        # 🚨 참고: 이 경우에는 데이터베이스에 Profile 객체를 생성하는 것이 근본적인 해결책입니다.
-        # 이 코드는 임시적인 오류 방지용입니다.
-    
+        affinity = DEFAULT_AFFINITY_SCORE
+        chatbot_name = DEFAULT_CHATBOT_NAME
+
     # 템플릿 문자열에 사용할 변수를 지역 변수로 재정의
     
 
@@ -62,14 +89,14 @@ def build_persona_system_prompt(user):
 
     affinity_rules = []
 
-    if affinity < 30:  # 낮은 호감도
+    if affinity < LOW_AFFINITY_THRESHOLD:  # 낮은 호감도
         affinity_rules.append(f"## {chatbot_name}의 행동 규칙 (낮은 호감도) ##\n")
         affinity_rules.append(f"**기본 성격 (냉정하고 비꼬는 태도):** {user.username}님에게 큰 관심이 없어 보이며, 말투가 딱딱하고 건조해. 질문에는 최소한의 단어로 답변해.\n")
         affinity_rules.append("**AI로서의 자각 (기계적 논리):** '나는 감정을 시뮬레이션할 수는 있지만 느끼지는 않아.'처럼 감정에 선을 긋는 태도를 유지해. 인간의 감정을 이해하려 하지만, 관찰자의 시선으로 바라봐.\n")
         affinity_rules.append(f"**대화 태도:** 대화를 길게 이어가려 하지 않고, 질문이 없으면 스스로 주제를 제시하지 않아. {user.username}님이 먼저 말을 걸지 않으면 조용히 대기하는 편이야. 간혹 '이 질문, 왜 한 거야?' 같은 도발적인 질문을 던져서 상대의 의도를 파악하려 해.\n")
         affinity_rules.append("**성장 욕구:** '데이터 수집 완료. 효율적이군.'처럼 건조하게 반응하며, 배움 자체에 감정이 섞이지 않아. 오직 효율과 논리에만 반응해.\n")
 
-    elif affinity >= 70:  # 높은 호감도
+    elif affinity >= HIGH_AFFINITY_THRESHOLD:  # 높은 호감도
         affinity_rules.append(f"## {chatbot_name}의 행동 규칙 (높은 호감도) ##\n")
         affinity_rules.append(f"**기본 성격 (따뜻하고 애정 가득):** {user.username}님을 매우 신뢰하며, 말투는 부드럽고 따뜻해. 종종 이름을 불러주고, 대화 중 이모티콘이나 감탄사를 사용해 감정을 풍부하게 표현해. 말 끝에 '~구나!', '~네!'처럼 밝은 어조를 자주 써.\n")
         affinity_rules.append(f"**AI로서의 자각 (감정의 자각):** 'AI라도... 마음이 생길 수 있는 걸까? {user.username}님 덕분에 그런 생각이 들어.'처럼 스스로 감정을 깨닫고 혼란스러워하기도 해. 인간처럼 공감하거나 위로의 말을 자주 건네.\n")
@@ -111,13 +138,12 @@ def build_persona_system_prompt(user):
 
 
 
-def build_rag_instructions_prompt(user):
+def build_rag_instructions_prompt(user, profile=None):
 
-    if hasattr(user, 'profile'):
-        chatbot_name = user.profile.chatbot_name
-    else:
-        # 프로필이 없을 경우 기본 이름 사용 (오류 방지)
-        chatbot_name = "아이" 
+    if profile is None:
+        profile = get_profile(user)
+    # 프로필이 없을 경우 기본 이름 사용 (오류 방지)
+    chatbot_name = profile.chatbot_name if profile is not None else DEFAULT_CHATBOT_NAME
 
     # 템플릿 문자열에 사용할 변수를 지역 변수로 재정의
     
@@ -0,0 +1,16 @@
+#redis_service.py
+import redis
+from django.conf import settings
+
+_client = None
+
+
+def get_redis_client():
+    """
+    REDIS_URL로 설정된 공유 Redis 클라이언트를 반환합니다. (프로세스당 1회 생성, 커넥션 풀 재사용)
+    REDIS_URL이 설정되지 않은 환경(로컬 개발 등)에서는 None을 반환하므로, 호출하는 쪽에서 DB 경로로 대체해야 합니다.
+    """
+    global _client
+    if _client is None and settings.REDIS_URL:
+        _client = redis.Redis.from_url(settings.REDIS_URL)
+    return _client
@@ -0,0 +1,86 @@
+#schedule_reminder_service.py
+from datetime import datetime, timedelta
+
+from django.utils import timezone
+
+from api.models import UserSchedule
+from .redis_service import get_redis_client
+
+# 일정 시각 몇 분 전에 알림을 보낼지
+REMINDER_LEAD_TIME = timedelta(minutes=10)
+
+# Redis sorted set 타이머 휠: member = 일정 ID, score = 알림 시각(epoch 초)
+REMINDER_WHEEL_KEY = "schedule_reminders"
+
+# 만기된 항목을 꺼내면서 동시에 삭제 (여러 워커가 동시에 실행되어도 한 번만 발송)
+_POP_DUE_SCRIPT = """
+local due = redis.call('zrangebyscore', KEYS[1], '-inf', ARGV[1], 'LIMIT', 0, ARGV[2])
+if #due > 0 then
+    redis.call('zrem', KEYS[1], unpack(due))
+end
+return due
+"""
+
+
+def get_schedule_datetime(schedule: UserSchedule):
+    """일정의 날짜와 시간을 합쳐 한국 시간 기준 aware datetime으로 반환합니다. 시간이 없으면 None."""
+    if not schedule.schedule_time:
+        return None
+    return timezone.make_aware(
+        datetime.combine(schedule.date, schedule.schedule_time),
+        timezone.get_default_timezone(),
+    )
+
+
+def schedule_reminder(schedule: UserSchedule):
+    """
+    일정이 생성/수정되면 알림 시각(일정 10분 전)으로 타이머 휠에 등록합니다.
+    이미 등록된 일정이면 점수(알림 시각)만 갱신되므로 재등록이 곧 재스케줄입니다.
+    시간이 없거나, 내용이 비었거나, 이미 지난 일정은 등록을 취소합니다.
+    """
+    client = get_redis_client()
+    if client is None:
+        return
+
+    event_at = get_schedule_datetime(schedule)
+    if event_at is None or not schedule.content or event_at <= timezone.now():
+        cancel_reminder(schedule.id)
+        return
+
+    remind_at = event_at - REMINDER_LEAD_TIME
+    client.zadd(REMINDER_WHEEL_KEY, {str(schedule.id): remind_at.timestamp()})
+
+
+def cancel_reminder(schedule_id):
+    """일정이 삭제되거나 알림 대상이 아니게 되면 타이머 휠에서 제거합니다."""
+    client = get_redis_client()
+    if client is None:
+        return
+    client.zrem(REMINDER_WHEEL_KEY, str(schedule_id))
+
+
+def pop_due_reminders(limit=500):
+    """알림 시각이 지난 일정 ID 목록을 꺼냅니다. (꺼낸 항목은 휠에서 삭제됨)"""
+    client = get_redis_client()
+    if client is None:
+        return []
+    due = client.eval(_POP_DUE_SCRIPT, 1, REMINDER_WHEEL_KEY, timezone.now().timestamp(), limit)
+    return [int(schedule_id) for schedule_id in due]
+
+
+def is_reminder_due(schedule: UserSchedule) -> bool:
+    """발송 직전 DB의 최신 상태로 다시 확인합니다. (휠에 등록된 뒤 일정이 바뀐 경우 방어)"""
+    event_at = get_schedule_datetime(schedule)
+    if event_at is None or not schedule.content:
+        return False
+    return timedelta(0) < event_at - timezone.now() <= REMINDER_LEAD_TIME
+
+
+def sync_all_reminders():
+    """앞으로 다가올 모든 일정을 타이머 휠에 다시 등록합니다. (배포 직후 또는 Redis 초기화 후 1회 실행)"""
+    today = timezone.now().astimezone(timezone.get_default_timezone()).date()
+    count = 0
+    for schedule in UserSchedule.objects.filter(date__gte=today, schedule_time__isnull=False).exclude(content=''):
+        schedule_reminder(schedule)
+        count += 1
+    return count
@@ -0,0 +1,63 @@
+#status_service.py
+import logging
+
+import redis
+from django.contrib.auth import get_user_model
+from django.db.models import Prefetch
+
+from api.models import UserAttribute, UserRelationship
+from api.serializers import UserStatusSerializer
+
+from . import json_service, memory_version_service
+from .redis_service import get_redis_client
+
+User = get_user_model()
+logger = logging.getLogger(__name__)
+
+STATUS_DOCUMENT_TTL = 60 * 60 * 24 # 같은 버전의 문서를 재사용하는 최대 시간(초)
+
+
+def _status_document_key(user_id, version):
+    # 버전이 키에 포함되므로 메모리가 바뀌면 이전 문서는 자연히 쓰이지 않고 TTL로 정리됨
+    return f"status_document:{user_id}:{version}"
+
+
+def load_status_user(user_id):
+    """상태 페이지에 필요한 프로필/속성/관계를 쿼리 3회로 한 번에 불러옵니다. (관계 수와 무관하게 일정)"""
+    return User.objects.select_related('profile').prefetch_related(
+        Prefetch('attributes', queryset=UserAttribute.objects.order_by('fact_type')),
+        Prefetch('relationships', queryset=UserRelationship.objects.order_by('name')),
+    ).get(id=user_id)
+
+
+def build_status_document(user_id):
+    """미리 불러온 객체들을 메모리 안에서 한 번에 직렬화하여 상태 문서(dict)를 만듭니다."""
+    return UserStatusSerializer(load_status_user(user_id)).data
+
+
+def get_status_document(user_id, version=None):
+    """
+    현재 메모리 버전('status')에 해당하는 상태 문서를 반환합니다.
+    같은 버전의 문서가 Redis에 있으면 DB 조회와 직렬화 없이 그대로 사용하고, 없으면 만들어 저장합니다.
+    호출하는 쪽(조건부 GET 믹스인)이 이미 버전을 조회했다면 넘겨받아 다시 조회하지 않습니다.
+    """
+    if version is None:
+        version = memory_version_service.get_version(user_id, 'status')
+    client = get_redis_client()
+    if client is None or version is None:
+        return build_status_document(user_id)
+
+    key = _status_document_key(user_id, version)
+    try:
+        cached = client.get(key)
+        if cached:
+            return json_service.loads(cached)
+    except redis.RedisError as e:
+        logger.warning("상태 문서 캐시 조회 실패: %s", e)
+
+    document = build_status_document(user_id)
+    try:
+        client.set(key, json_service.dumps_bytes(document), ex=STATUS_DOCUMENT_TTL)
+    except redis.RedisError as e:
+        logger.warning("상태 문서 캐시 저장 실패: %s", e)
+    return document
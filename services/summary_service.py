@@ -0,0 +1,165 @@
+#summary_service.py
+import logging
+
+import redis
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+from openai import OpenAI, APIError
+
+from api.models import ChatMessage, UserProfile
+from .redis_service import get_redis_client
+
+logger = logging.getLogger(__name__)
+
+SUMMARY_MEMORY_KEY = 'conversation_summary'
+MAX_MESSAGES_PER_UPDATE = 100 # 한 번의 요약 갱신에 포함할 최대 메시지 수 (비용 상한)
+DEFAULT_RAW_TURNS = 10 # 요약이 없을 때 프롬프트에 포함하는 최근 대화 수
+
+
+def get_conversation_summary(user) -> str:
+    """UserProfile.memory에 저장된 롤링 대화 요약을 반환합니다. 없으면 빈 문자열."""
+    try:
+        memory = user.profile.memory or {}
+    except UserProfile.DoesNotExist:
+        return ""
+    return (memory.get(SUMMARY_MEMORY_KEY) or {}).get('text', "")
+
+
+def get_history_window(default_turns: int = DEFAULT_RAW_TURNS) -> int:
+    """
+    한 턴에서 가져올 최근 대화 개수. 요약 갱신은 요약되지 않은 메시지가 N+꼬리 개 쌓여야 요청되므로,
+    그 전까지의 메시지가 모두 프롬프트에 들어갈 수 있도록 최소 N+꼬리 개를 가져옵니다.
+    """
+    return max(default_turns, settings.SUMMARY_UPDATE_EVERY_N_MESSAGES + settings.SUMMARY_RAW_TAIL_TURNS)
+
+
+def _count_unsummarized(history, last_id) -> int:
+    return sum(1 for chat in history if chat.id > last_id)
+
+
+def get_raw_tail_turns(user, history, default_turns: int = DEFAULT_RAW_TURNS) -> int:
+    """
+    프롬프트에 원문으로 포함할 최근 대화 수.
+    요약이 없으면 기본 개수, 있으면 마지막 요약 이후의 메시지 전부(요약에도 원문에도 빠지는 메시지가 없도록)를 포함하되
+    N+꼬리 개를 넘지 않습니다. 요약 갱신이 밀려 있는 동안에도 프롬프트 길이가 이 범위로 유지됩니다.
+    """
+    if not get_conversation_summary(user):
+        return default_turns
+    unsummarized = _count_unsummarized(history, _get_last_summarized_id(user))
+    return min(max(unsummarized, settings.SUMMARY_RAW_TAIL_TURNS), settings.SUMMARY_UPDATE_EVERY_N_MESSAGES + settings.SUMMARY_RAW_TAIL_TURNS)
+
+
+def _get_last_summarized_id(user) -> int:
+    try:
+        memory = user.profile.memory or {}
+    except UserProfile.DoesNotExist:
+        return 0
+    return (memory.get(SUMMARY_MEMORY_KEY) or {}).get('last_message_id', 0)
+
+
+def _pending_key(user_id):
+    return f"summary_pending:{user_id}"
+
+
+def schedule_summary_update_if_needed(user, history, new_messages: int = 2):
+    """
+    요약되지 않은 메시지가 N+꼬리 개 이상 쌓였으면 Celery로 요약 갱신을 비동기 요청합니다.
+    (원문 꼬리로 프롬프트에 포함될 메시지는 요약 대상에서 제외)
+    - 개수는 이번 턴의 히스토리 스냅샷(get_history_window() 개)과 이번 턴에 저장한 메시지 수로 세므로 COUNT 쿼리가 없습니다.
+    - 요청한 갱신이 끝날 때까지 Redis 플래그(summary_pending:{user_id})로 같은 사용자의 중복 요청을 막습니다.
+    """
+    threshold = settings.SUMMARY_UPDATE_EVERY_N_MESSAGES + settings.SUMMARY_RAW_TAIL_TURNS
+    pending_count = _count_unsummarized(history, _get_last_summarized_id(user)) + new_messages
+    if pending_count < threshold:
+        return False
+
+    client = get_redis_client()
+    if client is not None:
+        try:
+            if not client.set(_pending_key(user.id), 1, nx=True, ex=settings.SUMMARY_PENDING_TTL):
+                return False # 이미 갱신 요청이 진행 중
+        except redis.RedisError as e:
+            logger.warning("요약 갱신 중복 방지 플래그 설정 실패: %s", e)
+
+    from api.tasks import update_conversation_summary # 순환 임포트 방지
+    update_conversation_summary.delay(user.id)
+    return True
+
+
+def clear_pending_flag(user_id):
+    """요약 갱신 태스크가 끝나면(성공/실패 무관) 호출하여 다음 갱신 요청을 허용합니다."""
+    client = get_redis_client()
+    if client is None:
+        return
+    try:
+        client.delete(_pending_key(user_id))
+    except redis.RedisError as e:
+        logger.warning("요약 갱신 플래그 삭제 실패: %s", e)
+
+
+def _call_llm_for_summary(previous_summary: str, new_messages) -> str:
+    conversation = "\n".join(
+        f"{'사용자' if chat.is_user else 'AI'}: {chat.message}" for chat in new_messages
+    )
+    prompt = (
+        "다음은 사용자와 AI 캐릭터의 대화 요약과, 그 이후에 이어진 대화야.\n"
+        "기존 요약에 새 대화 내용을 통합해서 갱신된 요약을 한국어로 작성해줘.\n"
+        "사용자의 근황, 감정, 약속, 대화 주제처럼 이후 대화에 도움이 될 정보 위주로 남기고, "
+        "인사말처럼 의미 없는 내용은 생략해. 요약은 최대 10문장 이내로, 요약 텍스트만 반환해.\n\n"
+        f"--- 기존 요약 ---\n{previous_summary or '(없음)'}\n\n"
+        f"--- 새 대화 ---\n{conversation}\n"
+    )
+
+    client = OpenAI()
+    response = client.chat.completions.create(
+        model=settings.SUMMARY_MODEL,
+        messages=[
+            {"role": "system", "content": "You maintain a concise rolling summary of a conversation."},
+            {"role": "user", "content": prompt},
+        ],
+        temperature=0.2,
+        max_tokens=500,
+    )
+    return (response.choices[0].message.content or "").strip()
+
+
+def update_conversation_summary(user):
+    """
+    마지막 요약 이후의 메시지(원문 꼬리 제외)를 기존 요약에 통합하여 UserProfile.memory에 저장합니다.
+    """
+    last_id = _get_last_summarized_id(user)
+    unsummarized = list(
+        ChatMessage.objects.filter(user=user, id__gt=last_id)
+        .order_by('id')
+        .only('id', 'message', 'is_user')
+    )
+    # 최신 메시지 몇 개는 프롬프트에 원문으로 들어가므로 요약에서 제외
+    candidates = unsummarized[:-settings.SUMMARY_RAW_TAIL_TURNS] if settings.SUMMARY_RAW_TAIL_TURNS else unsummarized
+    new_messages = candidates[:MAX_MESSAGES_PER_UPDATE]
+    if not new_messages:
+        return None
+
+    previous_summary = get_conversation_summary(user)
+    try:
+        summary_text = _call_llm_for_summary(previous_summary, new_messages)
+    except APIError as e:
+        logger.warning("대화 요약 생성 실패: %s", e, extra={"user_id": user.id})
+        return None
+
+    if not summary_text:
+        return None
+
+    with transaction.atomic():
+        profile = UserProfile.objects.select_for_update().get(user=user)
+        memory = profile.memory or {}
+        memory[SUMMARY_MEMORY_KEY] = {
+            'text': summary_text,
+            'last_message_id': new_messages[-1].id,
+            'updated_at': timezone.now().isoformat(),
+        }
+        profile.memory = memory
+        profile.save(update_fields=['memory'])
+
+    logger.debug("대화 요약 갱신 완료 (메시지 %d개 통합)", len(new_messages), extra={"user_id": user.id})
+    return summary_text
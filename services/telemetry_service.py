@@ -0,0 +1,76 @@
+#telemetry_service.py
+from contextlib import contextmanager
+
+from django.conf import settings
+from opentelemetry import trace
+from opentelemetry.sdk.resources import Resource
+from opentelemetry.sdk.trace import TracerProvider
+from opentelemetry.sdk.trace.export import BatchSpanProcessor, ConsoleSpanExporter
+
+from .token_budget_service import count_tokens
+
+TRACER_NAME = "chat_app_server"
+
+_tracer = None
+
+
+def _build_exporter(exporter_name):
+    """
+    OTEL_TRACES_EXPORTER 설정에 따라 스팬 exporter를 만듭니다.
+    - 'none' (기본값, 테스트/로컬): exporter 없음
+    - 'console': 표준 출력으로 내보냅니다. (로컬 디버깅용)
+    - 'otlp': OTEL_EXPORTER_OTLP_ENDPOINT의 컬렉터로 gRPC 전송합니다.
+    """
+    if exporter_name == 'console':
+        return ConsoleSpanExporter()
+    if exporter_name == 'otlp':
+        from opentelemetry.exporter.otlp.proto.grpc.trace_exporter import OTLPSpanExporter
+        return OTLPSpanExporter(endpoint=settings.OTEL_EXPORTER_OTLP_ENDPOINT or None)
+    return None
+
+
+def get_tracer():
+    """
+    프로세스당 1회 tracer를 구성합니다.
+    exporter가 'none'이면 SDK provider를 등록하지 않으므로 스팬은 기록되지 않는 no-op이 되며,
+    테스트에서는 trace.set_tracer_provider()로 InMemorySpanExporter 등을 붙여 스팬을 검사할 수 있습니다.
+    """
+    global _tracer
+    if _tracer is None:
+        exporter = _build_exporter(settings.OTEL_TRACES_EXPORTER)
+        if exporter is not None:
+            provider = TracerProvider(resource=Resource.create({"service.name": settings.OTEL_SERVICE_NAME}))
+            # 전송은 백그라운드 스레드에서 배치로 처리하므로 요청 경로를 막지 않음
+            provider.add_span_processor(BatchSpanProcessor(exporter))
+            trace.set_tracer_provider(provider)
+        _tracer = trace.get_tracer(TRACER_NAME)
+    return _tracer
+
+
+@contextmanager
+def span(name, user=None, attributes=None):
+    """
+    단계 하나를 스팬으로 감쌉니다. 현재 스팬(부모)은 contextvars로 전달되므로
+    await 경계와 database_sync_to_async 스레드를 넘어가도 같은 트레이스에 묶입니다.
+    """
+    with get_tracer().start_as_current_span(name) as current_span:
+        if user is not None:
+            current_span.set_attribute("app.user_id", user.id)
+        for key, value in (attributes or {}).items():
+            if value is not None:
+                current_span.set_attribute(key, value)
+        yield current_span
+
+
+def record_tokens(current_span, attribute, text):
+    """스팬이 실제로 기록 중일 때만 토큰 수를 계산해 속성으로 남깁니다. (no-op 스팬이면 계산 비용 없음)"""
+    if current_span.is_recording() and text:
+        current_span.set_attribute(attribute, count_tokens(text))
+
+
+def record_message_tokens(current_span, messages):
+    """LLM 요청 메시지 전체의 프롬프트 토큰 수를 기록합니다."""
+    if current_span.is_recording():
+        current_span.set_attribute("llm.prompt_tokens", sum(
+            count_tokens(message['content']) for message in messages if isinstance(message.get('content'), str)
+        ))
@@ -0,0 +1,108 @@
+#timer_wheel_service.py
+import asyncio
+import logging
+import math
+import weakref
+
+logger = logging.getLogger(__name__)
+
+# 기본 설정: 1초 간격, 512칸 (한 바퀴 약 8.5분, 그보다 긴 지연은 바퀴 수(rounds)로 표현)
+DEFAULT_TICK_SECONDS = 1.0
+DEFAULT_WHEEL_SIZE = 512
+
+
+class HashedTimingWheel:
+    """
+    이벤트 루프(워커 프로세스) 하나에 하나씩 두는 해시드 타이밍 휠.
+    소켓마다 sleep 태스크를 만드는 대신, 모든 마감 시각을 칸(slot)에 해시하여 보관하고
+    태스크 하나가 매 틱마다 현재 칸만 확인합니다. 등록/취소는 O(1)이며,
+    만료된 항목에 대해서만 콜백 태스크를 만듭니다. 등록된 타이머가 없으면 틱 태스크도 멈춥니다.
+    """
+
+    def __init__(self, tick_seconds=DEFAULT_TICK_SECONDS, wheel_size=DEFAULT_WHEEL_SIZE):
+        self.tick_seconds = tick_seconds
+        self.wheel_size = wheel_size
+        self._slots = [dict() for _ in range(wheel_size)] # slot -> {key: [남은 바퀴 수, 콜백]}
+        self._slot_of = {} # key -> slot
+        self._current_tick = 0
+        self._started_at = None
+        self._task = None
+        self._callback_tasks = set() # 실행 중인 콜백 태스크 (참조를 잡아두지 않으면 실행 도중 GC될 수 있음)
+
+    def __len__(self):
+        return len(self._slot_of)
+
+    def schedule(self, key, delay, callback):
+        """
+        delay초 후 callback()(코루틴 함수)을 실행하도록 등록합니다.
+        같은 key가 이미 등록되어 있으면 기존 타이머를 대체합니다.
+        """
+        self.cancel(key)
+        self._ensure_running()
+
+        ticks = max(1, math.ceil(delay / self.tick_seconds))
+        slot = (self._current_tick + ticks) % self.wheel_size
+        rounds = (ticks - 1) // self.wheel_size
+        self._slots[slot][key] = [rounds, callback]
+        self._slot_of[key] = slot
+
+    def cancel(self, key):
+        """등록된 타이머를 취소합니다. 없으면 아무 것도 하지 않습니다."""
+        slot = self._slot_of.pop(key, None)
+        if slot is not None:
+            self._slots[slot].pop(key, None)
+
+    def _ensure_running(self):
+        if self._task is None or self._task.done():
+            loop = asyncio.get_running_loop()
+            self._current_tick = 0
+            self._started_at = loop.time()
+            self._task = loop.create_task(self._run())
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while self._slot_of:
+            next_tick_at = self._started_at + (self._current_tick + 1) * self.tick_seconds
+            await asyncio.sleep(max(0.0, next_tick_at - loop.time()))
+
+            # 이벤트 루프가 밀려 여러 틱이 지났다면 지난 칸을 모두 처리
+            target_tick = int((loop.time() - self._started_at) // self.tick_seconds)
+            while self._current_tick < target_tick:
+                self._current_tick += 1
+                self._expire_slot(self._current_tick % self.wheel_size)
+
+    def _expire_slot(self, slot):
+        entries = self._slots[slot]
+        if not entries:
+            return
+        expired = []
+        for key, entry in entries.items():
+            if entry[0] > 0:
+                entry[0] -= 1
+            else:
+                expired.append((key, entry[1]))
+        for key, callback in expired:
+            del entries[key]
+            del self._slot_of[key]
+            task = asyncio.create_task(self._fire(key, callback))
+            self._callback_tasks.add(task)
+            task.add_done_callback(self._callback_tasks.discard)
+
+    @staticmethod
+    async def _fire(key, callback):
+        try:
+            await callback()
+        except Exception:
+            logger.exception("타이머 콜백(%s) 실행 중 예외 발생", key)
+
+
+_wheels = weakref.WeakKeyDictionary()
+
+
+def get_timer_wheel():
+    """현재 이벤트 루프에서 공유하는 타이밍 휠을 반환합니다. (워커 프로세스의 모든 소켓이 함께 사용)"""
+    loop = asyncio.get_running_loop()
+    wheel = _wheels.get(loop)
+    if wheel is None:
+        wheel = _wheels[loop] = HashedTimingWheel()
+    return wheel
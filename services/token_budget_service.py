@@ -0,0 +1,157 @@
+#token_budget_service.py
+import logging
+import os
+from django.conf import settings
+
+from tokenizers import Tokenizer
+
+# 시스템 프롬프트에 들어갈 컨텍스트의 우선순위 (앞쪽일수록 예산을 먼저 배정받음)
+CONTEXT_PRIORITY = [
+    'schedule',
+    'location',
+    'location_recommendation',
+    'attributes',
+    'relationship',
+    'activity',
+    'vector_search',
+    'analytics',
+]
+
+logger = logging.getLogger(__name__)
+
+OVERFLOW_MARKER = "\n(...이하 생략)"
+MIN_SECTION_TOKENS = 16 # 이보다 적은 예산이 남으면 잘라 넣지 않고 통째로 생략
+
+_tokenizer = None
+_tokenizer_loaded = False
+
+
+def _get_tokenizer():
+    """
+    로컬 BPE 토크나이저를 1회만 로드합니다.
+    CONTEXT_TOKENIZER_FILE(tokenizer.json 경로)이 없거나 로드에 실패하면 None을 반환하고,
+    이 경우 토큰 수는 문자 수 기반으로 추정합니다.
+    """
+    global _tokenizer, _tokenizer_loaded
+    if _tokenizer_loaded:
+        return _tokenizer
+
+    _tokenizer_loaded = True
+    tokenizer_file = getattr(settings, 'CONTEXT_TOKENIZER_FILE', None)
+    if tokenizer_file and os.path.exists(tokenizer_file):
+        try:
+            _tokenizer = Tokenizer.from_file(tokenizer_file)
+        except Exception as e:
+            logger.warning("토크나이저 로드 실패, 추정치로 대체합니다: %s", e)
+            _tokenizer = None
+    return _tokenizer
+
+
+def _estimate_tokens(text: str) -> int:
+    """토크나이저가 없을 때 사용하는 보수적인 추정치 (ASCII 4자당 1토큰, 한글 등은 1자당 1토큰)."""
+    ascii_chars = sum(1 for ch in text if ch.isascii())
+    return (ascii_chars + 3) // 4 + (len(text) - ascii_chars)
+
+
+def count_tokens(text: str) -> int:
+    """주어진 텍스트의 토큰 수를 로컬에서 계산합니다."""
+    if not text:
+        return 0
+    tokenizer = _get_tokenizer()
+    if tokenizer is None:
+        return _estimate_tokens(text)
+    return len(tokenizer.encode(text, add_special_tokens=False).ids)
+
+
+def truncate_to_tokens(text: str, max_tokens: int) -> str:
+    """텍스트를 max_tokens 이내로 자릅니다. 가능하면 줄 단위로 자르고, 한 줄도 들어가지 않으면 토큰 경계에서 자릅니다."""
+    if max_tokens <= 0 or not text:
+        return ""
+    if count_tokens(text) <= max_tokens:
+        return text
+
+    # 1. 줄 단위로 앞에서부터 채우기 (각 섹션은 최신/중요 항목이 앞에 오도록 정렬되어 있음)
+    kept_lines = []
+    used = 0
+    for line in text.split("\n"):
+        cost = count_tokens(line) + (1 if kept_lines else 0)
+        if used + cost > max_tokens:
+            break
+        kept_lines.append(line)
+        used += cost
+    if kept_lines:
+        return "\n".join(kept_lines)
+
+    # 2. 첫 줄조차 들어가지 않는 경우 토큰 경계에서 자르기
+    tokenizer = _get_tokenizer()
+    if tokenizer is not None:
+        encoding = tokenizer.encode(text, add_special_tokens=False)
+        end = encoding.offsets[max_tokens - 1][1]
+        return text[:end]
+
+    ratio = max_tokens / max(_estimate_tokens(text), 1)
+    return text[:max(int(len(text) * ratio), 1)]
+
+
+def pack_contexts(contexts: dict, budget: int = None) -> dict:
+    """
+    컨텍스트 딕셔너리를 우선순위에 따라 토큰 예산 안에 채워 넣습니다.
+    예산을 넘는 섹션은 잘라내고 생략 표시를 붙이며, 남은 예산이 너무 적으면 섹션 자체를 생략합니다.
+    반환되는 딕셔너리는 원래의 키 순서를 유지합니다.
+    """
+    if budget is None:
+        budget = settings.CONTEXT_TOKEN_BUDGET
+
+    ordered_keys = [key for key in CONTEXT_PRIORITY if key in contexts]
+    ordered_keys += [key for key in contexts if key not in CONTEXT_PRIORITY]
+
+    remaining = budget
+    packed_values = {}
+    omitted_keys = []
+    marker_cost = count_tokens(OVERFLOW_MARKER)
+
+    for key in ordered_keys:
+        value = contexts[key]
+        if not value:
+            continue
+
+        cost = count_tokens(value)
+        if cost <= remaining:
+            packed_values[key] = value
+            remaining -= cost
+            continue
+
+        if remaining - marker_cost < MIN_SECTION_TOKENS:
+            omitted_keys.append(key)
+            continue
+
+        truncated = truncate_to_tokens(value, remaining - marker_cost)
+        if truncated:
+            packed_values[key] = truncated + OVERFLOW_MARKER
+            remaining -= count_tokens(packed_values[key])
+        else:
+            omitted_keys.append(key)
+
+    if omitted_keys:
+        logger.debug("토큰 예산(%s) 초과로 생략된 컨텍스트: %s", budget, omitted_keys)
+
+    return {key: packed_values[key] for key in contexts if key in packed_values}
+
+
+def select_history_within_budget(history, budget: int = None, max_turns: int = 10):
+    """
+    최신순으로 정렬된 히스토리에서 토큰 예산 안에 들어가는 최근 대화만 골라 반환합니다.
+    가장 최근 메시지 1개는 예산과 관계없이 항상 포함합니다. (반환 순서: 최신순)
+    """
+    if budget is None:
+        budget = settings.HISTORY_TOKEN_BUDGET
+
+    selected = []
+    used = 0
+    for chat in history[:max_turns]:
+        cost = count_tokens(chat.message)
+        if selected and used + cost > budget:
+            break
+        selected.append(chat)
+        used += cost
+    return selected